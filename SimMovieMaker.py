@@ -1089,6 +1089,8 @@ def cli_mode():
     parser.add_argument('--format', choices=['mp4', 'avi', 'mov'], default='mp4', help='Output format (default: mp4)')
     parser.add_argument('--codec', choices=['H264', 'MJPG', 'XVID'], default='H264', help='Video codec (default: H264)')
     parser.add_argument('--pattern', help='Filename pattern for image sequence (e.g. "frame_*.png")')
+    parser.add_argument('--workers', type=int, default=None, help='Image decoder workers (default: CPU count, max 8)')
+    parser.add_argument('--prefetch', type=int, default=None, help='Frames decoded ahead of the encoder (default: 2 x workers)')
     
     args = parser.parse_args()
     
@@ -1119,42 +1121,31 @@ def cli_mode():
     
     # Create video
     try:
-        # Get first image to determine dimensions
-        first_img = cv2.imread(input_files[0])
-        if first_img is None:
-            print(f"Error: Could not read first image: {input_files[0]}")
-            return 1
-            
-        height, width = first_img.shape[:2]
-        
-        # Determine codec
-        if args.format == "mp4":
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        elif args.format == "avi":
-            if args.codec == "MJPG":
-                fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-            else:
-                fourcc = cv2.VideoWriter_fourcc(*'XVID')
-        elif args.format == "mov":
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        else:  # default
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        
-        # Create video writer
-        out = cv2.VideoWriter(args.output, fourcc, args.fps, (width, height))
-        
-        # Process each image
-        for i, img_path in enumerate(input_files):
+        from simmovimaker.encoder import open_frame_writer
+        from simmovimaker.prefetch import prefetch_frames
+        
+        # Frames are decoded ahead on a worker pool and streamed into
+        # ffmpeg when available (falls back to OpenCV)
+        out = None
+        frames = prefetch_frames(input_files, workers=args.workers, depth=args.prefetch)
+        for i, img_path, img in frames:
             print(f"Processing image {i+1}/{len(input_files)}: {os.path.basename(img_path)}")
             
-            img = cv2.imread(img_path)
             if img is None:
+                if out is None:
+                    print(f"Error: Could not read first image: {img_path}")
+                    frames.close()
+                    return 1
                 print(f"Warning: Could not read image: {img_path}")
                 continue
-                
+            
+            if out is None:
+                height, width = img.shape[:2]
+                out = open_frame_writer(args.output, width, height, args.fps,
+                                        codec=args.codec)
             out.write(img)
         
-        out.release()
+        out.close()
         print(f"Video created successfully: {args.output}")
         return 0
         
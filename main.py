@@ -1,5 +1,10 @@
 #!/usr/bin/env python
 """Entry point for SimMovieMaker - used by Nuitka for compilation."""
+import multiprocessing
 import sys
 from simmovimaker.__main__ import main
-sys.exit(main())
+
+if __name__ == "__main__":
+    # Required for the filter process pool in frozen Windows builds.
+    multiprocessing.freeze_support()
+    sys.exit(main())
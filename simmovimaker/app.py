@@ -15,19 +15,28 @@ from tkinter import filedialog, ttk, messagebox, simpledialog
 from PIL import Image, ImageTk
 import json
 import threading
-import queue
+import heapq
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from .ffmpeg_utils import (
     check_ffmpeg, get_ffmpeg_help_text, FFmpegNotFoundError, find_ffplay,
+    find_ffprobe, invalidate_capabilities,
 )
-from . import video_ops
+from . import edits, filters, frame_cache, frame_stack, probe_cache, video_ops
+from .colormap import Colormap, colormap_names, to_scalar
+from .stats import compute_stats
+from .encoder import open_frame_writer
+from .prefetch import prefetch_frames, default_workers
+from .thumb_cache import ThumbnailAtlas, thumb_key
+from .playback import FrameDecoder
+from .jobs import JobManager, PENDING, RUNNING, DONE, FAILED
 from .dialogs import (
     ProgressDialog, VideoInfoDialog, MetadataDialog, SplitVideoDialog,
     TrimDialog, SpeedDialog, ExtractFramesDialog, FFmpegHelpDialog,
-    MergeOptionsDialog, format_duration,
+    MergeOptionsDialog, JobPanel, format_duration,
 )
 
 
@@ -41,12 +50,22 @@ _VIDEO_EXTENSIONS = (
     ".mpg", ".mpeg", ".ts",
 )
 
+# Media types that hold a single still frame (an image file or one frame of
+# a .npy stack); everything that renders frames accepts both.
+_FRAME_TYPES = ("image", "stack")
+
 _PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 THUMB_W = 80
 THUMB_H = 60
 THUMB_PAD = 4
 
+# Background threads generating thumbnails for the strip.
+THUMB_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# Slideshow frames decoded ahead of the one on screen.
+PLAYBACK_READ_AHEAD = 4
+
 
 # ---------------------------------------------------------------------------
 # Icon helpers
@@ -97,14 +116,61 @@ def _is_image_file(path):
     return os.path.splitext(path)[1].lower() in _IMAGE_EXTENSIONS
 
 
+def _video_entry_info(info, path):
+    """Return the probe summary stored on a video entry as ``entry["info"]``."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return {
+        "duration": info["duration"],
+        "width": info["width"],
+        "height": info["height"],
+        "fps": info["fps"],
+        "codec": info["codec"],
+        "keyframes": info.get("keyframes"),
+        "mtime_ns": mtime_ns,
+    }
+
+
+def _has_current_info(media_entry):
+    """True if the entry's stored probe summary matches the file on disk."""
+    info = media_entry.get("info")
+    if not info:
+        return False
+    try:
+        return info.get("mtime_ns") == os.stat(media_entry["path"]).st_mtime_ns
+    except OSError:
+        return False
+
+
 def _listbox_display(media_entry):
     """Return the display string for a media_files entry."""
     basename = os.path.basename(media_entry["path"])
     if media_entry["type"] == "video":
+        info = media_entry.get("info")
+        if info:
+            return (f"[V] {basename}  ({info['width']}x{info['height']}, "
+                    f"{_format_time_short(info['duration'])})")
         return f"[V] {basename}"
+    if media_entry["type"] == "stack":
+        basename = f"[S] {basename} #{media_entry['frame'] + 1}"
+    n_edits = len(edits.entry_ops(media_entry))
+    if n_edits:
+        return f"{basename}  [{n_edits} edit{'s' if n_edits > 1 else ''}]"
     return basename
 
 
+def _video_info_text(info):
+    """Return the one-line summary shown under the file list for a video."""
+    txt = (f"Video: {info['width']}x{info['height']}  |  "
+           f"{info['fps']:.1f} fps  |  {format_duration(info['duration'])}  |  "
+           f"Codec: {info['codec']}")
+    if info.get("keyframes"):
+        txt += f"  |  {info['keyframes']} keyframes"
+    return txt
+
+
 def _format_time_short(seconds):
     """Format seconds as M:SS or H:MM:SS."""
     if seconds is None or seconds < 0:
@@ -126,11 +192,18 @@ class ThumbnailStrip:
 
     def __init__(self, parent, on_select_callback):
         self._on_select = on_select_callback
-        self._thumb_cache = {}          # key -> ImageTk.PhotoImage
+        self._thumb_cache = {}          # thumb key -> ImageTk.PhotoImage
         self._items = []                # list of dicts describing each thumb slot
+        self._keys = []                 # thumb key of each slot
+        self._atlas = None              # persistent ThumbnailAtlas, if any
         self._current_index = -1
         self._generation = 0            # incremented on rebuild to cancel stale work
-        self._work_queue = queue.Queue()
+        # Pending work: key -> (priority, gen, idx, item), served lowest
+        # priority first from a heap with lazy deletion.
+        self._pending = {}
+        self._heap = []
+        self._in_progress = set()
+        self._work_cond = threading.Condition()
         self._placeholder = None        # gray placeholder PhotoImage
 
         # -- widgets --
@@ -141,7 +214,7 @@ class ThumbnailStrip:
         self.canvas.pack(side=tk.TOP, fill=tk.X, expand=True)
 
         self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL,
-                                       command=self.canvas.xview)
+                                       command=self._on_scroll)
         self.scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.canvas.config(xscrollcommand=self.scrollbar.set)
 
@@ -150,28 +223,48 @@ class ThumbnailStrip:
         self.canvas.bind("<Shift-MouseWheel>", self._on_mousewheel)
         self.canvas.bind("<Configure>", lambda e: self._load_visible())
 
-        # Start the background worker
-        self._worker_thread = threading.Thread(target=self._thumb_worker,
-                                               daemon=True)
-        self._worker_thread.start()
+        # Start the background workers
+        self._worker_threads = []
+        for _ in range(THUMB_WORKERS):
+            worker = threading.Thread(target=self._thumb_worker, daemon=True)
+            worker.start()
+            self._worker_threads.append(worker)
 
     # -- public API --
 
     def set_items(self, items):
-        """items: list of dicts with 'path', 'type', and optionally 'time' (seconds)."""
+        """items: list of dicts with 'path', 'type', and optionally 'time'
+        (seconds) and 'ops' (edit list).
+
+        Thumbnails already generated for an item are kept across rebuilds,
+        so reordering, deleting or re-selecting does not regenerate them.
+        """
         self._generation += 1
-        self._thumb_cache.clear()
         self._items = list(items)
+        self._keys = [self._item_key(item) for item in self._items]
+        live = set(self._keys)
+        self._thumb_cache = {k: v for k, v in self._thumb_cache.items()
+                             if k in live}
         self._current_index = -1
-        # drain queue
-        while not self._work_queue.empty():
-            try:
-                self._work_queue.get_nowait()
-            except queue.Empty:
-                break
+        self._schedule([])
         self._redraw_placeholders()
+        for i, key in enumerate(self._keys):
+            photo = self._thumb_cache.get(key)
+            if photo is not None:
+                self._place_thumb(self._generation, i, photo)
         self._load_visible()
 
+    def set_atlas(self, atlas):
+        """Use *atlas* (a :class:`ThumbnailAtlas`) as the persistent
+        thumbnail store, flushing and closing the previous one."""
+        old, self._atlas = self._atlas, atlas
+        if old is not None and old is not atlas:
+            old.close()
+
+    def flush(self):
+        if self._atlas is not None:
+            self._atlas.flush()
+
     def set_current(self, index):
         if index == self._current_index:
             return
@@ -185,11 +278,14 @@ class ThumbnailStrip:
             if total_w > 0:
                 frac = (index * (THUMB_W + THUMB_PAD)) / total_w
                 self.canvas.xview_moveto(max(0, frac - 0.1))
+                self._load_visible()
 
     def clear(self):
         self._generation += 1
         self._items = []
+        self._keys = []
         self._thumb_cache.clear()
+        self._schedule([])
         self._current_index = -1
         self.canvas.delete("all")
         self.canvas.config(scrollregion=(0, 0, 0, 0))
@@ -242,8 +338,17 @@ class ThumbnailStrip:
         self.canvas.xview_scroll(-1 * (event.delta // 120), "units")
         self.canvas.after(50, self._load_visible)
 
+    def _on_scroll(self, *args):
+        self.canvas.xview(*args)
+        self._load_visible()
+
     def _load_visible(self):
-        """Enqueue thumbnail generation for items currently in view."""
+        """Schedule thumbnail generation for the items in view.
+
+        Visible slots come first, then a margin of one viewport on either
+        side ordered by distance from the viewport.  Anything previously
+        queued that is no longer in that window is cancelled.
+        """
         if not self._items:
             return
         # figure out visible range
@@ -252,39 +357,104 @@ class ThumbnailStrip:
             right = self.canvas.canvasx(self.canvas.winfo_width())
         except Exception:
             return
-        first = max(0, int(left // (THUMB_W + THUMB_PAD)) - 1)
-        last = min(len(self._items) - 1, int(right // (THUMB_W + THUMB_PAD)) + 1)
+        slot = THUMB_W + THUMB_PAD
+        first = max(0, int(left // slot))
+        last = min(len(self._items) - 1, int(right // slot))
+        margin = last - first + 1
+        center = (first + last) / 2.0
 
         gen = self._generation
-        for i in range(first, last + 1):
-            key = (gen, i)
-            if key not in self._thumb_cache:
-                item = self._items[i]
-                self._work_queue.put((gen, i, item))
+        requests = []
+        for i in range(max(0, first - margin),
+                       min(len(self._items) - 1, last + margin) + 1):
+            if self._keys[i] in self._thumb_cache:
+                continue
+            outside = first - i if i < first else max(0, i - last)
+            priority = (outside, abs(i - center))
+            requests.append((priority, gen, i, self._items[i], self._keys[i]))
+        self._schedule(requests)
+
+    def _schedule(self, requests):
+        """Replace the pending work with *requests* and wake the workers."""
+        with self._work_cond:
+            self._pending = {}
+            for priority, gen, idx, item, key in requests:
+                if key in self._in_progress:
+                    continue
+                old = self._pending.get(key)
+                if old is None or priority < old[0]:
+                    self._pending[key] = (priority, gen, idx, item)
+            self._heap = [(entry[0], key) for key, entry in self._pending.items()]
+            heapq.heapify(self._heap)
+            self._work_cond.notify_all()
+
+    def _next_request(self, timeout):
+        """Pop the most urgent pending request (``None`` after *timeout*)."""
+        with self._work_cond:
+            while True:
+                while self._heap:
+                    priority, key = heapq.heappop(self._heap)
+                    entry = self._pending.get(key)
+                    if entry is None or entry[0] != priority:
+                        continue  # cancelled or re-prioritised
+                    del self._pending[key]
+                    self._in_progress.add(key)
+                    return key, entry
+                if not self._work_cond.wait(timeout):
+                    return None
+
+    @staticmethod
+    def _item_key(item):
+        path = item.get("path", "")
+        time = item.get("time")
+        if item.get("type") == "video" or _is_video_file(path):
+            time = time or 0
+        return thumb_key(path, (THUMB_W, THUMB_H), time, item.get("ops"),
+                         item.get("frame"))
 
     def _thumb_worker(self):
-        """Background thread that generates thumbnails from the queue."""
+        """Background thread that generates the most urgent thumbnails."""
         while True:
-            try:
-                gen, idx, item = self._work_queue.get(timeout=1.0)
-            except queue.Empty:
+            request = self._next_request(timeout=1.0)
+            if request is None:
+                # Idle: persist newly generated thumbnails.
+                atlas = self._atlas
+                if atlas is not None:
+                    atlas.flush()
                 continue
-            if gen != self._generation:
-                continue  # stale request
-            key = (gen, idx)
-            if key in self._thumb_cache:
-                continue  # already done
-
+            key, (_, gen, idx, item) = request
             try:
+                if gen == self._generation and key not in self._thumb_cache:
+                    self._load_thumb(gen, idx, item, key)
+            finally:
+                with self._work_cond:
+                    self._in_progress.discard(key)
+
+    def _load_thumb(self, gen, idx, item, key):
+        """Fetch one thumbnail from the atlas (or generate it) and hand it
+        to the main thread.  Runs on a worker thread, so it only produces
+        PIL images; Tk objects are created in :meth:`_show_thumb`."""
+        try:
+            atlas = self._atlas
+            path = item.get("path", "")
+            pil_img = atlas.get(key, path) if atlas is not None else None
+            if pil_img is None:
                 pil_img = self._generate_thumbnail(item)
-                if gen != self._generation:
-                    continue
-                photo = ImageTk.PhotoImage(pil_img)
-                self._thumb_cache[key] = photo
-                # schedule canvas update on main thread
-                self.canvas.after(0, self._place_thumb, gen, idx, photo)
-            except Exception:
-                pass  # skip broken files silently
+                if atlas is not None:
+                    atlas.put(key, path, pil_img)
+            if gen != self._generation:
+                return
+            self.canvas.after(0, self._show_thumb, gen, idx, key, pil_img)
+        except Exception:
+            pass  # skip broken files silently
+
+    def _show_thumb(self, gen, idx, key, pil_img):
+        """Main thread: turn *pil_img* into a PhotoImage, cache and place it."""
+        if gen != self._generation:
+            return
+        photo = ImageTk.PhotoImage(pil_img)
+        self._thumb_cache[key] = photo
+        self._place_thumb(gen, idx, photo)
 
     def _generate_thumbnail(self, item):
         """Return a PIL Image thumbnail for the given item."""
@@ -292,20 +462,18 @@ class ThumbnailStrip:
         t = item.get("time")  # optional seek time for video
 
         if item.get("type") == "video" or _is_video_file(path):
-            cap = cv2.VideoCapture(path)
-            if t is not None and t > 0:
-                cap.set(cv2.CAP_PROP_POS_MSEC, t * 1000)
-            ret, frame = cap.read()
-            cap.release()
-            if not ret or frame is None:
-                return Image.new("RGB", (THUMB_W, THUMB_H), (68, 68, 68))
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
+            t = t or 0
         else:
-            img = Image.open(path)
-            img = img.convert("RGB")
+            t = None
+        try:
+            img, _ = frame_cache.load_image(path, (THUMB_W, THUMB_H),
+                                            ops=item.get("ops"), time=t,
+                                            upscale=False,
+                                            resample=Image.NEAREST,
+                                            frame=item.get("frame"))
+        except ValueError:
+            return Image.new("RGB", (THUMB_W, THUMB_H), (68, 68, 68))
 
-        img.thumbnail((THUMB_W, THUMB_H), Image.NEAREST)
         # Paste onto exact-size canvas to keep uniform sizing
         canvas_img = Image.new("RGB", (THUMB_W, THUMB_H), (43, 43, 43))
         offset_x = (THUMB_W - img.width) // 2
@@ -360,15 +528,27 @@ class SimMovieMaker:
             "fps": 30,
             "codec": "H264",
             "quality": 80,
+            "decode_workers": default_workers(),
+            "prefetch_depth": 2 * default_workers(),
         }
 
         # FFmpeg status
         self.ffmpeg_status = None
 
+        # Queued ffmpeg operations
+        self.job_manager = JobManager(
+            on_change=lambda job: self.root.after(0, self._on_job_change, job))
+        self._job_dialogs = {}              # job id -> (ProgressDialog, done_msg)
+        self._job_panel = None
+
+        # ffprobe results persist between sessions
+        probe_cache.shared_probe_cache().open_store(probe_cache.DEFAULT_STORE)
+
         # Playback state
         self._playback_active = False
         self._playback_after_id = None
         self._playback_cap = None           # cv2.VideoCapture for frame stepping
+        self._playback_decoder = None       # FrameDecoder while a video plays
         self._playback_process = None       # ffplay subprocess for audio playback
         self._playback_fps = 30.0
         self._playback_frame_idx = 0
@@ -377,6 +557,11 @@ class SimMovieMaker:
         self._playback_start_time = 0.0     # wall-clock time when playback started
         self._playback_start_frame = 0      # frame index at playback start
         self._slider_dragging = False
+        self._preview_pool = None           # read-ahead decoder for slideshows
+        self._preview_requested = set()
+
+        # Filters queued for a single fused pass (see Filters > Filter Chain)
+        self.filter_chain = filters.FilterChain()
 
         # Crop-region drawing state
         self._crop_start = None
@@ -395,7 +580,11 @@ class SimMovieMaker:
 
     @property
     def image_files(self):
-        return [m["path"] for m in self.media_files if m["type"] == "image"]
+        return [m["path"] for m in self.media_files if m["type"] in _FRAME_TYPES]
+
+    @property
+    def image_entries(self):
+        return [m for m in self.media_files if m["type"] in _FRAME_TYPES]
 
     # ------------------------------------------------------------------
     # FFmpeg background check
@@ -435,6 +624,7 @@ class SimMovieMaker:
         file_menu.add_separator()
         file_menu.add_command(label="Import Images", command=self.import_images)
         file_menu.add_command(label="Import Sequence", command=self.import_sequence)
+        file_menu.add_command(label="Import Frame Stack", command=self.import_stack)
         file_menu.add_command(label="Import Video Files", command=self.import_videos)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
@@ -449,6 +639,9 @@ class SimMovieMaker:
         edit_menu.add_separator()
         edit_menu.add_command(label="Move Up", command=lambda: self.move_selected(-1))
         edit_menu.add_command(label="Move Down", command=lambda: self.move_selected(1))
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Undo Last Filter", command=self.undo_last_edit)
+        edit_menu.add_command(label="Clear Filters", command=self.clear_edits)
         menubar.add_cascade(label="Edit", menu=edit_menu)
 
         # -- Preview --
@@ -490,13 +683,29 @@ class SimMovieMaker:
         color_menu = tk.Menu(filter_menu, tearoff=0)
         color_menu.add_command(label="Brightness", command=lambda: self.apply_filter("brightness"))
         color_menu.add_command(label="Contrast", command=lambda: self.apply_filter("contrast"))
+        color_menu.add_command(label="Auto Normalize", command=lambda: self.apply_filter("normalize"))
         color_menu.add_command(label="Grayscale", command=lambda: self.apply_filter("grayscale"))
+        color_menu.add_command(label="Colormap", command=lambda: self.apply_filter("colormap"))
         filter_menu.add_cascade(label="Adjust Colors", menu=color_menu)
         overlay_menu = tk.Menu(filter_menu, tearoff=0)
         overlay_menu.add_command(label="Text Overlay", command=lambda: self.apply_filter("text_overlay"))
         overlay_menu.add_command(label="Scale Bar", command=lambda: self.apply_filter("scale_bar"))
         overlay_menu.add_command(label="Timestamp", command=lambda: self.apply_filter("timestamp"))
         filter_menu.add_cascade(label="Overlay", menu=overlay_menu)
+        filter_menu.add_separator()
+        chain_menu = tk.Menu(filter_menu, tearoff=0)
+        self._queue_filters_var = tk.BooleanVar(value=False)
+        chain_menu.add_checkbutton(label="Queue Filters Into Chain",
+                                   variable=self._queue_filters_var)
+        chain_menu.add_command(label="Run Filter Chain", command=self.run_filter_chain)
+        chain_menu.add_command(label="Show Filter Chain", command=self.show_filter_chain)
+        chain_menu.add_command(label="Clear Filter Chain", command=self.clear_filter_chain)
+        chain_menu.add_separator()
+        chain_menu.add_command(label="Save Filter Chain...", command=self.save_filter_chain)
+        chain_menu.add_command(label="Load Filter Chain...", command=self.load_filter_chain)
+        filter_menu.add_cascade(label="Filter Chain", menu=chain_menu)
+        filter_menu.add_separator()
+        filter_menu.add_command(label="Bake Edits Into Files...", command=self.bake_edits)
         menubar.add_cascade(label="Filters", menu=filter_menu)
 
         # -- Metadata --
@@ -514,6 +723,8 @@ class SimMovieMaker:
         tools_menu.add_command(label="Batch Process", command=self.batch_process)
         tools_menu.add_command(label="Export File List", command=self.export_file_list)
         tools_menu.add_command(label="Import File List", command=self.import_file_list)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Jobs...", command=self.show_jobs)
         menubar.add_cascade(label="Tools", menu=tools_menu)
 
         # -- Help --
@@ -667,6 +878,7 @@ class SimMovieMaker:
 
         # ---- ROW 2: Thumbnail strip ----
         self.thumb_strip = ThumbnailStrip(main, on_select_callback=self._on_thumb_select)
+        self._use_project_thumbnails()
         self.thumb_strip.frame.grid(row=2, column=0, sticky="ew", pady=4)
 
         # ---- ROW 3: Bottom panel (file list + properties) ----
@@ -772,7 +984,8 @@ class SimMovieMaker:
             path = self.media_files[self.current_preview_index]["path"]
             self._build_video_thumbs(path)
         else:
-            items = [{"path": m["path"], "type": m["type"]}
+            items = [{"path": m["path"], "type": m["type"],
+                      "frame": m.get("frame"), "ops": edits.entry_ops(m)}
                      for m in self.media_files]
             self.thumb_strip.set_items(items)
             self.thumb_strip.set_current(self.current_preview_index)
@@ -903,8 +1116,7 @@ class SimMovieMaker:
 
         if self._is_single_video_mode():
             idx = self.selected_indices[0] if self.selected_indices else 0
-            path = self.media_files[idx]["path"]
-            self._start_video_playback(path)
+            self._start_video_playback(self.media_files[idx])
         else:
             self._start_image_playback()
 
@@ -922,8 +1134,42 @@ class SimMovieMaker:
         self._play_btn.config(text="Pause")
         self._playback_total_frames = len(self.media_files)
         self._playback_duration = self._playback_total_frames / fps
+        self._prefetch_preview_images(self.current_preview_index + 1)
         self._image_playback_tick()
 
+    def _prefetch_preview_images(self, start, count=PLAYBACK_READ_AHEAD):
+        """Decode the next *count* slideshow frames into the shared frame
+        cache on a background pool so playback ticks only hit the cache."""
+        canvas_w = self.preview_canvas.winfo_width()
+        canvas_h = self.preview_canvas.winfo_height()
+        if canvas_w <= 1 or canvas_h <= 1:
+            return
+        if self._preview_pool is None:
+            self._preview_pool = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="preview")
+        size = (canvas_w, canvas_h)
+        for idx in range(start, min(start + count, len(self.media_files))):
+            entry = self.media_files[idx]
+            if entry["type"] not in _FRAME_TYPES:
+                continue
+            key = (entry["path"], entry.get("frame"), size,
+                   edits.ops_key(edits.entry_ops(entry)))
+            if key in self._preview_requested:
+                continue
+            if len(self._preview_requested) > 4 * count:
+                self._preview_requested.clear()
+            self._preview_requested.add(key)
+            self._preview_pool.submit(self._decode_for_preview,
+                                      entry["path"], size, entry.get("ops"),
+                                      entry.get("frame"))
+
+    @staticmethod
+    def _decode_for_preview(path, size, ops, frame=None):
+        try:
+            frame_cache.load_image(path, size, ops=ops, frame=frame)
+        except Exception:
+            pass  # the foreground path reports unreadable files
+
     def _image_playback_tick(self):
         if not self._playback_active:
             return
@@ -935,6 +1181,7 @@ class SimMovieMaker:
         self.update_preview()
         self.thumb_strip.set_current(self.current_preview_index)
         self._update_transport_display_images()
+        self._prefetch_preview_images(self.current_preview_index + 1)
 
         interval = max(1, int(1000 / self._playback_fps))
         self._playback_after_id = self.root.after(interval,
@@ -950,27 +1197,29 @@ class SimMovieMaker:
         if total > 1:
             self._position_var.set(idx / (total - 1) * 100)
 
-    def _start_video_playback(self, path):
+    def _start_video_playback(self, entry):
         """Play video in the preview canvas with cv2 frames + background audio
-        via ffplay -nodisp (no popup window)."""
+        via ffplay -nodisp (no popup window).
+
+        Only the :class:`FrameDecoder` opens the file; the frame rate and
+        length come from the entry's cached probe, or else from the
+        thumbnail preview shown when the video was selected.
+        """
+        path = entry["path"]
+        # The frame-stepping capture would otherwise hold the file open
+        # alongside the decoder's.
         if self._playback_cap is not None:
             self._playback_cap.release()
+            self._playback_cap = None
 
-        cap = cv2.VideoCapture(path)
-        if not cap.isOpened():
-            messagebox.showerror("Error", f"Cannot open video: {path}")
-            return
-
-        self._playback_cap = cap
-        self._playback_fps = cap.get(cv2.CAP_PROP_FPS) or 30
-        self._playback_total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-        self._playback_duration = (self._playback_total_frames / self._playback_fps
-                                   if self._playback_fps > 0 else 0)
+        info = entry.get("info") if _has_current_info(entry) else None
+        if info and info["fps"] > 0:
+            self._playback_fps = info["fps"]
+            self._playback_total_frames = int(round(info["duration"] * info["fps"]))
+            self._playback_duration = info["duration"]
 
-        # Seek to current position if resuming
         start_t = 0.0
         if self._playback_frame_idx > 0:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, self._playback_frame_idx)
             start_t = self._playback_frame_idx / self._playback_fps
 
         # Start background audio via ffplay -nodisp (no popup window)
@@ -983,8 +1232,21 @@ class SimMovieMaker:
         self.status_var.set(f"Playing: {os.path.basename(path)}{has_audio}")
         self._playback_start_time = time.monotonic()
         self._playback_start_frame = self._playback_frame_idx
+        self._stop_playback_decoder()
+        self._playback_decoder = FrameDecoder(
+            path, self._preview_canvas_size(), self._playback_frame_idx,
+            self._playback_fps).start(self._playback_start_time)
         self._video_playback_tick()
 
+    def _preview_canvas_size(self):
+        return (max(1, self.preview_canvas.winfo_width()),
+                max(1, self.preview_canvas.winfo_height()))
+
+    def _stop_playback_decoder(self):
+        if self._playback_decoder is not None:
+            self._playback_decoder.stop()
+            self._playback_decoder = None
+
     def _start_background_audio(self, path, start_t=0.0):
         """Launch ffplay in audio-only mode (no video window) as background."""
         self._kill_ffplay()
@@ -1026,30 +1288,26 @@ class SimMovieMaker:
             self._playback_process = None
 
     def _video_playback_tick(self):
-        if not self._playback_active or self._playback_cap is None:
-            return
-
-        # Calculate which frame we SHOULD be on based on elapsed wall-clock time
-        # This skips frames if rendering is too slow, keeping audio in sync
-        elapsed = time.monotonic() - self._playback_start_time
-        target_frame = self._playback_start_frame + int(elapsed * self._playback_fps)
-
-        current_frame = int(self._playback_cap.get(cv2.CAP_PROP_POS_FRAMES))
-
-        # Skip ahead if we've fallen behind by more than 2 frames
-        if target_frame > current_frame + 2:
-            self._playback_cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-
-        ret, frame = self._playback_cap.read()
-        if not ret:
-            self._stop_playback()
-            return
-
-        self._playback_frame_idx = int(
-            self._playback_cap.get(cv2.CAP_PROP_POS_FRAMES))
-
-        self._display_cv2_frame(frame)
-        self._update_transport_display_video()
+        decoder = self._playback_decoder
+        if not self._playback_active or decoder is None:
+            return
+
+        # Show the newest decoded frame due at the current wall-clock time.
+        # Late frames are dropped by the decoder thread, keeping audio in sync.
+        canvas_size = self._preview_canvas_size()
+        decoder.set_size(canvas_size)
+        ready = decoder.get_frame(decoder.target_frame())
+        if ready is None:
+            if decoder.finished:
+                self._stop_playback()
+                if decoder.error is not None:
+                    messagebox.showerror("Error", str(decoder.error))
+                return
+        else:
+            index, img = ready
+            self._playback_frame_idx = index + 1
+            self._display_pil_image(img, canvas_size)
+            self._update_transport_display_video()
 
         # Schedule next frame - aim for video fps but min 1ms
         interval = max(1, int(1000 / self._playback_fps))
@@ -1069,6 +1327,7 @@ class SimMovieMaker:
 
     def _pause_playback(self):
         self._playback_active = False
+        self._stop_playback_decoder()
         self._play_btn.config(text="Play")
         if self._playback_after_id:
             self.root.after_cancel(self._playback_after_id)
@@ -1272,6 +1531,14 @@ class SimMovieMaker:
                 img_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                 img_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                 cap.release()
+            elif edits.has_edits(entry):
+                frame = edits.load_frame(entry)
+                if frame is None:
+                    self.status_var.set("Could not determine image dimensions")
+                    return
+                img_h, img_w = frame.shape[:2]
+            elif entry["type"] == "stack":
+                img_w, img_h = frame_stack.frame_size(entry["path"])
             else:
                 img = Image.open(entry["path"])
                 img_w, img_h = img.size
@@ -1343,20 +1610,15 @@ class SimMovieMaker:
             self._run_video_op("Cropping Video", op)
         else:
             # Image crop
-            cl, ct, cr, cb = crop_left, crop_top, crop_right, crop_bottom
-
-            def _do_crop(img):
-                return img[ct:cb, cl:cr]
+            spec = {"op": "crop", "left": crop_left, "top": crop_top,
+                    "right": crop_right, "bottom": crop_bottom}
 
             if result:  # Yes = all selected
-                self._apply_cv2_filter_to_selected(_do_crop, "Crop")
+                self._apply_filter_specs_to_selected([spec], "Crop")
             else:  # No = current only
-                p = entry["path"]
-                img = cv2.imread(p)
-                if img is not None:
-                    cv2.imwrite(p, _do_crop(img))
-                    self.update_preview()
-                    self.status_var.set("Crop applied to current image")
+                edits.add_ops(entry, [spec])
+                self._refresh_edited_entries()
+                self.status_var.set("Crop applied to current image")
 
     # ------------------------------------------------------------------
     # Display helpers
@@ -1378,7 +1640,12 @@ class SimMovieMaker:
         new_h = int(img_h * scale)
 
         img_resized = img.resize((new_w, new_h), Image.BILINEAR)
-        photo = ImageTk.PhotoImage(img_resized)
+        self._display_pil_image(img_resized, (canvas_w, canvas_h))
+
+    def _display_pil_image(self, img, canvas_size):
+        """Blit an already-scaled PIL image centred on the preview canvas."""
+        canvas_w, canvas_h = canvas_size
+        photo = ImageTk.PhotoImage(img)
         self.current_photo = photo
 
         self.preview_canvas.delete("all")
@@ -1395,6 +1662,54 @@ class SimMovieMaker:
         for entry in self.media_files:
             self.file_listbox.insert(tk.END, _listbox_display(entry))
 
+    def _probe_videos_async(self, entries=None):
+        """Probe every video entry in *entries* (default: all) that lacks a
+        current ``info`` summary, concurrently on a background thread, and
+        show each result in the file list as soon as it arrives.
+
+        Keyframe counts need a full demux pass, so they are filled in by a
+        second pass once every file has its basic information."""
+        if entries is None:
+            entries = self.media_files
+        paths = [e["path"] for e in entries
+                 if e["type"] == "video" and not _has_current_info(e)]
+        if not paths or not find_ffprobe():
+            return
+
+        def _work():
+            probed = []
+            try:
+                for path, info in video_ops.iter_probe_videos(paths, keyframes=False):
+                    if info:
+                        probed.append(path)
+                        self.root.after(0, self._apply_probe_result, path, info)
+                self.root.after(0, self.status_var.set,
+                                f"Probed {len(probed)} video(s); counting keyframes...")
+                for path, info in video_ops.iter_probe_videos(probed):
+                    if info:
+                        self.root.after(0, self._apply_probe_result, path, info)
+            except Exception:
+                return
+            self.root.after(0, self.status_var.set,
+                            f"Probed {len(probed)} video(s)")
+
+        self.status_var.set(f"Probing {len(paths)} video(s)...")
+        threading.Thread(target=_work, daemon=True).start()
+
+    def _apply_probe_result(self, path, info):
+        """Store the probe *info* of *path* on its video entries and redraw
+        their file list rows."""
+        selected = set(self.file_listbox.curselection())
+        for idx, entry in enumerate(self.media_files):
+            if entry["type"] != "video" or entry["path"] != path:
+                continue
+            entry["info"] = _video_entry_info(info, path)
+            self.file_listbox.delete(idx)
+            self.file_listbox.insert(idx, _listbox_display(entry))
+            if idx in selected:
+                self.file_listbox.selection_set(idx)
+                self._show_selected_info()
+
     def _get_selected_video_path(self):
         indices = list(self.file_listbox.curselection())
         for idx in indices:
@@ -1417,6 +1732,7 @@ class SimMovieMaker:
     def new_project(self):
         self._stop_playback()
         self.project_file = None
+        self._use_project_thumbnails()
         self.media_files = []
         self.selected_indices = []
         self.current_preview_index = 0
@@ -1438,6 +1754,7 @@ class SimMovieMaker:
                 project_data = json.load(f)
 
             self.project_file = filename
+            self._use_project_thumbnails()
             raw_files = project_data.get("media_files") or project_data.get("image_files", [])
             self.media_files = []
             for item in raw_files:
@@ -1456,9 +1773,16 @@ class SimMovieMaker:
             self.update_preview()
             self._rebuild_thumb_strip()
             self.status_var.set(f"Project loaded: {os.path.basename(filename)}")
+            self._probe_videos_async()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open project: {e}")
 
+    def _use_project_thumbnails(self):
+        """Point the thumbnail strip at the on-disk atlas of the current
+        project (or the shared default atlas for unsaved projects)."""
+        self.thumb_strip.set_atlas(
+            ThumbnailAtlas.for_project(self.project_file, (THUMB_W, THUMB_H)))
+
     def save_project(self):
         if not self.project_file:
             self.save_project_as()
@@ -1474,6 +1798,7 @@ class SimMovieMaker:
         if not filename:
             return
         self.project_file = filename
+        self._use_project_thumbnails()
         self._save_project(filename)
 
     def _save_project(self, filename):
@@ -1485,6 +1810,8 @@ class SimMovieMaker:
         try:
             with open(filename, "w") as f:
                 json.dump(project_data, f, indent=2)
+            self.thumb_strip.flush()
+            probe_cache.shared_probe_cache().flush()
             self.status_var.set(f"Project saved: {os.path.basename(filename)}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save project: {e}")
@@ -1550,6 +1877,29 @@ class SimMovieMaker:
             self.update_preview()
         self._rebuild_thumb_strip()
 
+    def import_stack(self):
+        """Add every frame of a memory-mapped ``.npy`` frame stack (see
+        :mod:`simmovimaker.frame_stack`) without touching per-frame files."""
+        filename = filedialog.askopenfilename(
+            title="Select Frame Stack",
+            filetypes=[("NumPy frame stack", "*.npy"), ("All files", "*.*")],
+        )
+        if not filename:
+            return
+        try:
+            entries = frame_stack.stack_entries(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not open frame stack: {e}")
+            return
+        self.media_files.extend(entries)
+        for entry in entries:
+            self.file_listbox.insert(tk.END, _listbox_display(entry))
+        self.status_var.set(
+            f"Added {len(entries)} frame(s) from {os.path.basename(filename)}")
+        if self.media_files and self.current_preview_index == 0:
+            self.update_preview()
+        self._rebuild_thumb_strip()
+
     def import_videos(self):
         filenames = filedialog.askopenfilenames(
             title="Select Video Files",
@@ -1561,15 +1911,16 @@ class SimMovieMaker:
         if not filenames:
             return
         existing_paths = {m["path"] for m in self.media_files}
-        added = 0
+        added = []
         for fn in filenames:
             if fn not in existing_paths:
                 entry = {"path": fn, "type": "video"}
                 self.media_files.append(entry)
                 self.file_listbox.insert(tk.END, _listbox_display(entry))
-                added += 1
-        self.status_var.set(f"Added {added} video(s)")
+                added.append(entry)
+        self.status_var.set(f"Added {len(added)} video(s)")
         self._rebuild_thumb_strip()
+        self._probe_videos_async(added)
 
     # ------------------------------------------------------------------
     # Edit menu
@@ -1642,15 +1993,14 @@ class SimMovieMaker:
         if idx >= len(self.media_files):
             return
         entry = self.media_files[idx]
-        if entry["type"] == "video":
+        if entry["type"] == "video" and _has_current_info(entry):
+            self.video_info_label.config(text=_video_info_text(entry["info"]))
+        elif entry["type"] == "video":
             path = entry["path"]
             def _fetch():
                 try:
                     info = video_ops.get_video_info(path)
-                    dur = format_duration(info["duration"])
-                    txt = (f"Video: {info['width']}x{info['height']}  |  "
-                           f"{info['fps']:.1f} fps  |  {dur}  |  "
-                           f"Codec: {info['codec']}")
+                    txt = _video_info_text(info)
                     self.root.after(0, self.video_info_label.config, {"text": txt})
                 except Exception:
                     self.root.after(0, self.video_info_label.config,
@@ -1701,31 +2051,33 @@ class SimMovieMaker:
         if entry["type"] == "video":
             self._preview_video_thumbnail(path)
         else:
-            self._preview_image(path)
+            self._preview_image(entry)
 
         self._update_transport_display_images()
 
-    def _preview_image(self, image_path):
+    def _preview_image(self, entry):
+        image_path = entry["path"]
         try:
-            img = Image.open(image_path)
             canvas_w = self.preview_canvas.winfo_width()
             canvas_h = self.preview_canvas.winfo_height()
             if canvas_w <= 1 or canvas_h <= 1:
                 self.preview_canvas.after(100, self.update_preview)
                 return
-            img_w, img_h = img.size
-            scale = min(canvas_w / img_w, canvas_h / img_h)
-            new_w = int(img_w * scale)
-            new_h = int(img_h * scale)
-            img_resized = img.resize((new_w, new_h), Image.LANCZOS)
+            img_resized, (img_w, img_h) = frame_cache.load_image(
+                image_path, (canvas_w, canvas_h), ops=entry.get("ops"),
+                frame=entry.get("frame"))
             photo = ImageTk.PhotoImage(img_resized)
             self.current_photo = photo
             self.preview_canvas.delete("all")
             self.preview_canvas.create_image(
                 canvas_w // 2, canvas_h // 2,
                 image=photo, anchor=tk.CENTER)
-            self.status_var.set(
-                f"{os.path.basename(image_path)} - {img_w}x{img_h}")
+            n_edits = len(edits.entry_ops(entry))
+            suffix = f"  ({n_edits} edit(s))" if n_edits else ""
+            name = os.path.basename(image_path)
+            if entry["type"] == "stack":
+                name += f" #{entry['frame'] + 1}"
+            self.status_var.set(f"{name} - {img_w}x{img_h}{suffix}")
         except Exception as e:
             self.preview_canvas.delete("all")
             self.preview_canvas.create_text(
@@ -1829,30 +2181,18 @@ class SimMovieMaker:
             return
 
         temp_output = os.path.join(os.path.expanduser("~"), "sim_preview_temp.mp4")
-        preview_files = images[:min(100, len(images))]
+        preview_files = self.image_entries[:min(100, len(images))]
         progress = ProgressDialog(self.root, "Creating Preview",
                                   maximum=len(preview_files))
 
         def _thread():
             try:
-                first_img = cv2.imread(preview_files[0])
-                if first_img is None:
-                    raise RuntimeError(f"Cannot read: {preview_files[0]}")
-                height, width = first_img.shape[:2]
-                fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-                out = cv2.VideoWriter(temp_output, fourcc, chosen_fps, (width, height))
-                for i, img_path in enumerate(preview_files):
-                    if progress.cancelled:
-                        out.release()
-                        return
-                    self.root.after(0, progress.update_progress, i + 1,
-                                    f"Frame {i+1}/{len(preview_files)}")
-                    img = cv2.imread(img_path)
-                    if img is not None:
-                        out.write(img)
-                out.release()
+                completed = self._encode_image_sequence(
+                    preview_files, temp_output, chosen_fps, progress,
+                    codec="H264", quality=50)
                 self.root.after(0, progress.destroy)
-                self.play_output_file(temp_output)
+                if completed:
+                    self.play_output_file(temp_output)
             except Exception as e:
                 self.root.after(0, progress.destroy)
                 self.root.after(0, messagebox.showerror, "Error",
@@ -1867,7 +2207,7 @@ class SimMovieMaker:
     def show_output_settings(self):
         settings = tk.Toplevel(self.root)
         settings.title("Output Settings")
-        settings.geometry("400x300")
+        settings.geometry("400x380")
         settings.transient(self.root)
         settings.grab_set()
 
@@ -1896,8 +2236,20 @@ class SimMovieMaker:
         ttk.Spinbox(frame, from_=0, to=100, textvariable=quality_var, width=10).grid(
             row=3, column=1, sticky=tk.W, pady=5)
 
+        ttk.Label(frame, text="Decode Workers:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        workers_var = tk.StringVar(value=str(
+            self.output_settings.get("decode_workers", default_workers())))
+        ttk.Spinbox(frame, from_=1, to=64, textvariable=workers_var, width=10).grid(
+            row=4, column=1, sticky=tk.W, pady=5)
+
+        ttk.Label(frame, text="Prefetch Depth (frames):").grid(row=5, column=0, sticky=tk.W, pady=5)
+        depth_var = tk.StringVar(value=str(
+            self.output_settings.get("prefetch_depth", 2 * default_workers())))
+        ttk.Spinbox(frame, from_=1, to=256, textvariable=depth_var, width=10).grid(
+            row=5, column=1, sticky=tk.W, pady=5)
+
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=4, column=0, columnspan=2, pady=20)
+        button_frame.grid(row=6, column=0, columnspan=2, pady=20)
 
         def save_settings():
             try:
@@ -1905,6 +2257,8 @@ class SimMovieMaker:
                 self.output_settings["format"] = format_var.get()
                 self.output_settings["codec"] = codec_var.get()
                 self.output_settings["quality"] = int(quality_var.get())
+                self.output_settings["decode_workers"] = max(1, int(workers_var.get()))
+                self.output_settings["prefetch_depth"] = max(1, int(depth_var.get()))
                 self.fps_var.set(str(self.output_settings["fps"]))
                 self.format_var.set(self.output_settings["format"])
                 self.codec_var.set(self.output_settings["codec"])
@@ -1942,36 +2296,14 @@ class SimMovieMaker:
 
         def _thread():
             try:
-                first_img = cv2.imread(images[0])
-                if first_img is None:
-                    raise RuntimeError(f"Cannot read: {images[0]}")
-                height, width = first_img.shape[:2]
-
-                fmt = self.output_settings["format"]
-                codec = self.output_settings["codec"]
-                if fmt == "mp4":
-                    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-                elif fmt == "avi":
-                    fourcc = cv2.VideoWriter_fourcc(*(
-                        "MJPG" if codec == "MJPG" else "XVID"))
-                elif fmt == "mov":
-                    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-                else:
-                    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-
-                out = cv2.VideoWriter(output_file, fourcc,
-                                      self.output_settings["fps"], (width, height))
-                for i, img_path in enumerate(images):
-                    if progress.cancelled:
-                        out.release()
-                        return
-                    self.root.after(0, progress.update_progress, i + 1,
-                                    f"Frame {i+1}/{len(images)}")
-                    img = cv2.imread(img_path)
-                    if img is not None:
-                        out.write(img)
-                out.release()
+                completed = self._encode_image_sequence(
+                    self.image_entries, output_file,
+                    self.output_settings["fps"], progress,
+                    codec=self.output_settings["codec"],
+                    quality=self.output_settings.get("quality", 80))
                 self.root.after(0, progress.destroy)
+                if not completed:
+                    return
                 play = messagebox.askyesno(
                     "Success",
                     f"Video created at:\n{output_file}\n\nPlay it now?")
@@ -1984,6 +2316,47 @@ class SimMovieMaker:
 
         threading.Thread(target=_thread, daemon=True).start()
 
+    def _encode_image_sequence(self, entries, output_file, fps, progress,
+                               codec="H264", quality=80):
+        """Encode image *entries* into *output_file*, updating *progress*.
+
+        Frames are decoded (with each entry's edit list applied) by a
+        prefetching worker pool sized by the ``decode_workers`` /
+        ``prefetch_depth`` output settings, and streamed into ffmpeg when it
+        is installed, otherwise into cv2.VideoWriter.  Runs on a worker
+        thread.  Returns False if the user cancelled.
+        """
+        frames = prefetch_frames(
+            entries,
+            reader=lambda entry: edits.load_frame(entry, cache=False),
+            workers=self.output_settings.get("decode_workers") or None,
+            depth=self.output_settings.get("prefetch_depth") or None)
+        out = None
+        try:
+            for i, entry, img in frames:
+                if progress.cancelled:
+                    break
+                self.root.after(0, progress.update_progress, i + 1,
+                                f"Frame {i+1}/{len(entries)}")
+                if img is None:
+                    if out is None:
+                        raise RuntimeError(f"Cannot read: {entry['path']}")
+                    continue
+                if out is None:
+                    height, width = img.shape[:2]
+                    out = open_frame_writer(output_file, width, height, fps,
+                                            codec=codec, quality=quality)
+                out.write(img)
+        except Exception:
+            if out is not None:
+                out.abort()
+            raise
+        finally:
+            frames.close()
+        if out is not None:
+            out.close()
+        return not progress.cancelled
+
     def play_output_file(self, file_path):
         import platform
         import subprocess as _sp
@@ -2017,28 +2390,70 @@ class SimMovieMaker:
     # VIDEO OPERATIONS (ffmpeg-powered)
     # ==================================================================
 
-    def _run_video_op(self, title, operation_fn, done_msg=None):
-        progress = ProgressDialog(self.root, title, maximum=100)
+    def _run_video_op(self, title, operation_fn, done_msg=None, depends_on=()):
+        """Queue ``operation_fn(progress_callback)`` on the job manager.
+
+        A progress dialog follows the job; cancelling it kills the job's
+        ffmpeg process.  The job starts after every job in *depends_on*
+        has completed.  Returns the :class:`~simmovimaker.jobs.Job`.
+        """
+        job = self.job_manager.submit(title, operation_fn, depends_on)
+        progress = ProgressDialog(self.root, title, maximum=100,
+                                  on_cancel=lambda: self.job_manager.cancel(job))
+        self._job_dialogs[job.id] = (progress, done_msg)
+        self._on_job_change(job)
+        return job
+
+    def _on_job_change(self, job):
+        """Reflect a job update in its progress dialog and the job panel
+        (runs on the Tk thread)."""
+        if self._job_panel is not None:
+            try:
+                self._job_panel.refresh()
+            except tk.TclError:
+                self._job_panel = None
 
-        def _cb(pct):
-            self.root.after(0, progress.update_progress, pct, f"{pct:.0f}%")
+        entry = self._job_dialogs.get(job.id)
+        if entry is None:
+            return
+        progress, done_msg = entry
+        if job.state == PENDING:
+            running = len(self.job_manager.active_jobs)
+            progress.update_progress(0, f"Queued ({running} job(s) active)...")
+            return
+        if job.state == RUNNING:
+            text = "Cancelling..." if job.cancelled else f"{job.progress:.0f}%"
+            progress.update_progress(job.progress, text)
+            return
 
-        def _thread():
-            try:
-                result = operation_fn(_cb)
-                self.root.after(0, progress.destroy)
-                if done_msg:
-                    self.root.after(0, messagebox.showinfo, "Done", done_msg)
-                elif result:
-                    self.root.after(0, messagebox.showinfo, "Done", str(result))
-            except FFmpegNotFoundError as e:
-                self.root.after(0, progress.destroy)
-                self.root.after(0, messagebox.showerror, "FFmpeg Not Found", str(e))
-            except Exception as e:
-                self.root.after(0, progress.destroy)
-                self.root.after(0, messagebox.showerror, "Error", str(e))
+        del self._job_dialogs[job.id]
+        try:
+            progress.destroy()
+        except tk.TclError:
+            pass
+        if job.state == DONE:
+            if done_msg:
+                messagebox.showinfo("Done", done_msg)
+            elif job.result:
+                messagebox.showinfo("Done", str(job.result))
+        elif job.state == FAILED:
+            if isinstance(job.error, FFmpegNotFoundError):
+                messagebox.showerror("FFmpeg Not Found", str(job.error))
+            else:
+                messagebox.showerror("Error", str(job.error))
+        else:
+            self.status_var.set(f"Cancelled: {job.title}")
 
-        threading.Thread(target=_thread, daemon=True).start()
+    def show_jobs(self):
+        """Open (or raise) the job panel."""
+        if self._job_panel is not None:
+            try:
+                self._job_panel.lift()
+                self._job_panel.refresh()
+                return
+            except tk.TclError:
+                pass
+        self._job_panel = JobPanel(self.root, self.job_manager)
 
     # -- Merge Videos --
 
@@ -2512,7 +2927,7 @@ class SimMovieMaker:
     # ==================================================================
 
     def apply_filter(self, filter_name):
-        if not self.selected_indices:
+        if not self.selected_indices and not self._queue_filters_var.get():
             messagebox.showinfo("Filter", "Please select images to apply the filter to.")
             return
         dispatch = {
@@ -2521,7 +2936,9 @@ class SimMovieMaker:
             "rotate": self.show_rotate_dialog,
             "brightness": self.show_brightness_dialog,
             "contrast": self.show_contrast_dialog,
+            "normalize": self.show_normalize_dialog,
             "grayscale": self.apply_grayscale,
+            "colormap": self.show_colormap_dialog,
             "text_overlay": self.show_text_overlay_dialog,
             "scale_bar": self.show_scale_bar_dialog,
             "timestamp": self.show_timestamp_dialog,
@@ -2531,38 +2948,98 @@ class SimMovieMaker:
             handler()
 
     def _get_selected_image_paths(self):
+        return [e["path"] for e in self._get_selected_image_entries()]
+
+    def _get_selected_image_entries(self):
         return [
-            self.media_files[i]["path"]
+            self.media_files[i]
             for i in self.selected_indices
-            if i < len(self.media_files) and self.media_files[i]["type"] == "image"
+            if i < len(self.media_files)
+            and self.media_files[i]["type"] in _FRAME_TYPES
         ]
 
-    def _apply_cv2_filter_to_selected(self, filter_fn, description="filter"):
-        paths = self._get_selected_image_paths()
-        if not paths:
+    def _refresh_edited_entries(self):
+        """Redraw listbox labels, preview and thumbnails after edit-list
+        changes, keeping the current selection."""
+        selection = list(self.file_listbox.curselection())
+        self._refresh_listbox()
+        for idx in selection:
+            self.file_listbox.selection_set(idx)
+        self.update_preview()
+        self._rebuild_thumb_strip()
+
+    def _apply_filter_specs_to_selected(self, specs, description="filter"):
+        """Add filter *specs* (see :mod:`simmovimaker.filters`) to the edit
+        list of each selected image.
+
+        Source files are left untouched; edits are applied on the fly in
+        preview and render (see :mod:`simmovimaker.edits`).  When "Queue
+        Filters Into Chain" is enabled the specs are appended to
+        ``self.filter_chain`` instead, to be run later in one fused pass.
+        """
+        if self._queue_filters_var.get():
+            self.filter_chain.extend(specs)
+            self.status_var.set(
+                f"Queued {description} ({len(self.filter_chain)} filter(s) in chain: "
+                f"{self.filter_chain.describe()})")
+            return
+        entries = self._get_selected_image_entries()
+        if not entries:
             messagebox.showinfo("Filter", "No images selected.")
             return
-        progress = ProgressDialog(self.root, f"Applying {description}",
-                                  maximum=len(paths))
+        for i, entry in enumerate(entries):
+            edits.add_ops(entry, specs, index=i)
+        self._refresh_edited_entries()
+        self.status_var.set(f"{description} applied to {len(entries)} image(s)")
+
+    def undo_last_edit(self):
+        """Remove the most recent edit from each selected image."""
+        entries = self._get_selected_image_entries()
+        undone = sum(1 for e in entries if edits.undo_last(e))
+        self._refresh_edited_entries()
+        self.status_var.set(f"Undid last edit on {undone} image(s)")
+
+    def clear_edits(self):
+        """Drop every edit from the selected images."""
+        entries = [e for e in self._get_selected_image_entries()
+                   if edits.has_edits(e)]
+        for entry in entries:
+            edits.clear_ops(entry)
+        self._refresh_edited_entries()
+        self.status_var.set(f"Cleared edits on {len(entries)} image(s)")
+
+    def bake_edits(self):
+        """Write the selected images' edits into their source files."""
+        entries = [e for e in self._get_selected_image_entries()
+                   if edits.has_edits(e)]
+        if not entries:
+            messagebox.showinfo("Bake Edits", "No edited images selected.")
+            return
+        if not messagebox.askyesno(
+                "Bake Edits",
+                f"Overwrite {len(entries)} source image(s) with their edited "
+                "version?\n\nThis cannot be undone."):
+            return
+        progress = ProgressDialog(self.root, "Baking Edits", maximum=len(entries))
+
+        def _progress(done, total):
+            self.root.after(0, progress.update_progress, done,
+                            f"{done}/{total}")
 
         def _thread():
             try:
-                for i, p in enumerate(paths):
-                    if progress.cancelled:
-                        break
-                    img = cv2.imread(p)
-                    if img is None:
-                        continue
-                    result = filter_fn(img)
-                    cv2.imwrite(p, result)
-                    self.root.after(0, progress.update_progress, i + 1,
-                                    f"{i+1}/{len(paths)}")
+                written = edits.bake_entries(
+                    entries,
+                    progress_callback=_progress,
+                    cancel_check=lambda: progress.cancelled)
                 self.root.after(0, progress.destroy)
-                self.root.after(0, self.update_preview)
+                self.root.after(0, self._refresh_edited_entries)
                 self.root.after(0, self.status_var.set,
-                                f"{description} applied to {len(paths)} image(s)")
+                                f"Edits written to {written} of "
+                                f"{len(entries)} image(s)")
             except Exception as e:
                 self.root.after(0, progress.destroy)
+                self.root.after(0, self._refresh_edited_entries)
                 self.root.after(0, messagebox.showerror, "Error", str(e))
 
         threading.Thread(target=_thread, daemon=True).start()
@@ -2605,8 +3082,9 @@ class SimMovieMaker:
                 right = int(right_var.get())
                 bottom = int(bottom_var.get())
                 crop.destroy()
-                self._apply_cv2_filter_to_selected(
-                    lambda img: img[top:bottom, left:right], "Crop")
+                self._apply_filter_specs_to_selected(
+                    [{"op": "crop", "left": left, "top": top,
+                      "right": right, "bottom": bottom}], "Crop")
             except ValueError as e:
                 messagebox.showerror("Error", f"Invalid value: {e}")
 
@@ -2643,10 +3121,8 @@ class SimMovieMaker:
                 if w <= 0 or h <= 0:
                     raise ValueError("Dimensions must be positive")
                 dlg.destroy()
-                self._apply_cv2_filter_to_selected(
-                    lambda img: cv2.resize(img, (w, h),
-                                           interpolation=cv2.INTER_LANCZOS4),
-                    "Resize")
+                self._apply_filter_specs_to_selected(
+                    [{"op": "resize", "width": w, "height": h}], "Resize")
             except ValueError as e:
                 messagebox.showerror("Error", f"Invalid value: {e}")
 
@@ -2678,20 +3154,8 @@ class SimMovieMaker:
             try:
                 angle = float(angle_var.get())
                 dlg.destroy()
-
-                def _rot(img):
-                    h, w = img.shape[:2]
-                    center = (w // 2, h // 2)
-                    M = cv2.getRotationMatrix2D(center, angle, 1.0)
-                    cos = abs(M[0, 0])
-                    sin = abs(M[0, 1])
-                    new_w = int(h * sin + w * cos)
-                    new_h = int(h * cos + w * sin)
-                    M[0, 2] += (new_w - w) / 2
-                    M[1, 2] += (new_h - h) / 2
-                    return cv2.warpAffine(img, M, (new_w, new_h))
-
-                self._apply_cv2_filter_to_selected(_rot, "Rotate")
+                self._apply_filter_specs_to_selected(
+                    [{"op": "rotate", "angle": angle}], "Rotate")
             except ValueError as e:
                 messagebox.showerror("Error", f"Invalid value: {e}")
 
@@ -2725,9 +3189,8 @@ class SimMovieMaker:
         def apply_brightness():
             offset = bright_var.get()
             dlg.destroy()
-            self._apply_cv2_filter_to_selected(
-                lambda img: cv2.convertScaleAbs(img, alpha=1.0, beta=offset),
-                "Brightness")
+            self._apply_filter_specs_to_selected(
+                [{"op": "brightness", "offset": offset}], "Brightness")
 
         ttk.Button(btn_frame, text="Apply",
                    command=apply_brightness).pack(side=tk.RIGHT, padx=5)
@@ -2761,22 +3224,210 @@ class SimMovieMaker:
         def apply_contrast():
             factor = contrast_var.get()
             dlg.destroy()
-            self._apply_cv2_filter_to_selected(
-                lambda img: cv2.convertScaleAbs(img, alpha=factor, beta=0),
-                "Contrast")
+            self._apply_filter_specs_to_selected(
+                [{"op": "contrast", "factor": factor}], "Contrast")
 
         ttk.Button(btn_frame, text="Apply",
                    command=apply_contrast).pack(side=tk.RIGHT, padx=5)
         ttk.Button(btn_frame, text="Cancel",
                    command=dlg.destroy).pack(side=tk.RIGHT, padx=5)
 
+    # -- Auto normalize dialog --
+
+    def show_normalize_dialog(self):
+        """Stretch the selected frames with one range taken from percentiles
+        of all of them (see :mod:`simmovimaker.stats`), so exposure stays
+        consistent across the sequence.  The range is measured on the
+        unedited sources and applied before any other edits."""
+        entries = self._get_selected_image_entries()
+        if not entries:
+            messagebox.showinfo("Auto Normalize", "No images selected.")
+            return
+
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Auto Normalize")
+        dlg.geometry("320x180")
+        dlg.transient(self.root)
+        dlg.grab_set()
+
+        frame = ttk.Frame(dlg, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text="Black point (percentile):").grid(row=0, column=0, sticky=tk.W, pady=5)
+        low_var = tk.StringVar(value="0.5")
+        ttk.Entry(frame, textvariable=low_var, width=8).grid(row=0, column=1, sticky=tk.W, pady=5)
+        ttk.Label(frame, text="White point (percentile):").grid(row=1, column=0, sticky=tk.W, pady=5)
+        high_var = tk.StringVar(value="99.5")
+        ttk.Entry(frame, textvariable=high_var, width=8).grid(row=1, column=1, sticky=tk.W, pady=5)
+
+        ttk.Label(frame, text="Measured on the unedited frames; applied\n"
+                              "before any other edits.",
+                  foreground="gray").grid(row=2, column=0, columnspan=2, sticky=tk.W)
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=3, column=0, columnspan=2, pady=10)
+
+        def apply_normalize():
+            try:
+                low, high = float(low_var.get()), float(high_var.get())
+                if not 0 <= low < high <= 100:
+                    raise ValueError("need 0 <= black < white <= 100")
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid value: {e}")
+                return
+            dlg.destroy()
+            self._normalize_entries(entries, low, high)
+
+        ttk.Button(btn_frame, text="Apply", command=apply_normalize).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dlg.destroy).pack(side=tk.LEFT, padx=5)
+
+    def _normalize_entries(self, entries, low, high):
+        """Run the statistics pass over *entries* on a worker thread, then
+        add a ``normalize`` edit mapping the *low*..*high* percentiles to
+        0..255.
+
+        The percentiles are measured on the unedited sources, so the edit
+        goes first in each edit list (see :func:`edits.set_raw_op`), where
+        it sees exactly the values that were measured."""
+        def _finish(stats):
+            lo, hi = stats.percentile([low, high])
+            spec = {"op": "normalize", "low": float(lo), "high": float(hi)}
+            self._set_raw_op_on_entries(
+                entries, spec,
+                f"Normalized {len(entries)} frame(s) to {lo:g}..{hi:g} "
+                f"(data range {stats.min:g}..{stats.max:g})")
+
+        self._measure_entries(entries, _finish)
+
+    def _measure_entries(self, entries, on_done, transform=None):
+        """Run :func:`compute_stats` over the unedited frames of *entries*
+        on a worker thread with a cancellable progress dialog, then call
+        ``on_done(stats)`` on the main thread.  *transform* is passed on to
+        :func:`compute_stats`."""
+        progress = ProgressDialog(self.root, "Measuring Intensities",
+                                  maximum=len(entries))
+
+        def _progress(done, total):
+            self.root.after(0, progress.update_progress, done,
+                            f"{done}/{total} frames")
+
+        def _thread():
+            try:
+                stats = compute_stats(edits.SourceFrames(entries),
+                                      transform=transform,
+                                      progress_callback=_progress,
+                                      cancel_check=lambda: progress.cancelled)
+                self.root.after(0, progress.destroy)
+                if stats is None:
+                    return
+                if not stats.count:
+                    raise ValueError("the selected frames hold no values")
+                self.root.after(0, on_done, stats)
+            except Exception as e:
+                self.root.after(0, progress.destroy)
+                self.root.after(0, messagebox.showerror, "Error",
+                                f"Failed to measure intensities: {e}")
+
+        threading.Thread(target=_thread, daemon=True).start()
+
+    def _set_raw_op_on_entries(self, entries, spec, message):
+        """Put the raw-input *spec* first in each entry's edit list (see
+        :func:`edits.set_raw_op`) and report *message* in the status bar."""
+        replaced = 0
+        for i, entry in enumerate(entries):
+            if edits.set_raw_op(entry, spec, index=i) is not None:
+                replaced += 1
+        self._refresh_edited_entries()
+        note = f", replacing {replaced} earlier" if replaced else ""
+        self.status_var.set(f"{message} as their first edit{note}")
+
     # -- Grayscale --
 
     def apply_grayscale(self):
-        def _to_gray(img):
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-        self._apply_cv2_filter_to_selected(_to_gray, "Grayscale")
+        self._apply_filter_specs_to_selected([{"op": "grayscale"}], "Grayscale")
+
+    # -- Colormap dialog --
+
+    def show_colormap_dialog(self):
+        """Colour scalar-field frames through a lookup table (see
+        :mod:`simmovimaker.colormap`).  16-bit and float sources keep their
+        full depth because the colormap reads them unconverted, which is
+        why it always becomes the first edit; percentile ranges are
+        measured on the unedited frames on a worker thread."""
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Colormap")
+        dlg.geometry("360x270")
+        dlg.transient(self.root)
+        dlg.grab_set()
+
+        frame = ttk.Frame(dlg, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text="Colormap:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        cmap_var = tk.StringVar(value="viridis")
+        ttk.Combobox(frame, textvariable=cmap_var, values=colormap_names(),
+                     width=14).grid(row=0, column=1, columnspan=3, sticky=tk.W, pady=5)
+
+        mode_var = tk.StringVar(value="percentile")
+        low_var = tk.StringVar(value="1")
+        high_var = tk.StringVar(value="99")
+        ttk.Radiobutton(frame, text="Percentiles of selection",
+                        variable=mode_var, value="percentile").grid(
+            row=1, column=0, columnspan=4, sticky=tk.W)
+        ttk.Radiobutton(frame, text="Fixed range",
+                        variable=mode_var, value="fixed").grid(
+            row=2, column=0, columnspan=4, sticky=tk.W)
+        ttk.Radiobutton(frame, text="Each frame's own range",
+                        variable=mode_var, value="frame").grid(
+            row=3, column=0, columnspan=4, sticky=tk.W)
+        ttk.Label(frame, text="Low:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(frame, textvariable=low_var, width=10).grid(row=4, column=1, sticky=tk.W)
+        ttk.Label(frame, text="High:").grid(row=4, column=2, sticky=tk.W, padx=(10, 0))
+        ttk.Entry(frame, textvariable=high_var, width=10).grid(row=4, column=3, sticky=tk.W)
+        ttk.Label(frame, text="Ranges refer to the unedited frames; the colormap\n"
+                              "is applied before any other edits.",
+                  foreground="gray").grid(row=5, column=0, columnspan=4, sticky=tk.W)
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=6, column=0, columnspan=4, pady=10)
+
+        def apply_colormap():
+            mode = mode_var.get()
+            try:
+                cmap = Colormap(cmap_var.get().strip())
+                if mode != "frame":
+                    low, high = float(low_var.get()), float(high_var.get())
+                if mode == "percentile" and not 0 <= low < high <= 100:
+                    raise ValueError("need 0 <= low < high <= 100")
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid value: {e}")
+                return
+            entries = self._get_selected_image_entries()
+            if not entries:
+                messagebox.showinfo("Colormap", "No images selected.")
+                return
+            dlg.destroy()
+
+            def _finish(vmin=None, vmax=None):
+                spec = {"op": "colormap", "cmap": cmap.name}
+                if vmin is not None:
+                    spec.update(vmin=float(vmin), vmax=float(vmax))
+                self._set_raw_op_on_entries(
+                    entries, spec,
+                    f"Colormap {cmap.name} applied to {len(entries)} image(s)")
+
+            if mode == "percentile":
+                self._measure_entries(
+                    entries,
+                    lambda stats: _finish(*stats.percentile([low, high])),
+                    transform=to_scalar)
+            elif mode == "fixed":
+                _finish(low, high)
+            else:
+                _finish()
+
+        ttk.Button(btn_frame, text="Apply", command=apply_colormap).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dlg.destroy).pack(side=tk.LEFT, padx=5)
 
     # -- Text overlay dialog --
 
@@ -2821,12 +3472,9 @@ class SimMovieMaker:
                 fs = float(scale_var.get())
                 color = tuple(int(c.strip()) for c in color_var.get().split(","))
                 dlg.destroy()
-
-                def _overlay(img):
-                    return cv2.putText(img.copy(), text, (x, y),
-                                       cv2.FONT_HERSHEY_SIMPLEX, fs, color, 2,
-                                       cv2.LINE_AA)
-                self._apply_cv2_filter_to_selected(_overlay, "Text Overlay")
+                self._apply_filter_specs_to_selected(
+                    [{"op": "text", "text": text, "x": x, "y": y,
+                      "scale": fs, "color": list(color)}], "Text Overlay")
             except Exception as e:
                 messagebox.showerror("Error", f"Invalid input: {e}")
 
@@ -2876,20 +3524,9 @@ class SimMovieMaker:
                 y = int(y_var.get())
                 thickness = int(thick_var.get())
                 dlg.destroy()
-
-                def _bar(img):
-                    out = img.copy()
-                    cv2.line(out, (x, y), (x + bar_len, y), (255, 255, 255), thickness)
-                    cap_h = thickness * 2
-                    cv2.line(out, (x, y - cap_h), (x, y + cap_h), (255, 255, 255), thickness)
-                    cv2.line(out, (x + bar_len, y - cap_h), (x + bar_len, y + cap_h),
-                             (255, 255, 255), thickness)
-                    cv2.putText(out, label, (x, y - cap_h - 5),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
-                                cv2.LINE_AA)
-                    return out
-
-                self._apply_cv2_filter_to_selected(_bar, "Scale Bar")
+                self._apply_filter_specs_to_selected(
+                    [{"op": "scale_bar", "length": bar_len, "label": label,
+                      "x": x, "y": y, "thickness": thickness}], "Scale Bar")
             except Exception as e:
                 messagebox.showerror("Error", f"Invalid input: {e}")
 
@@ -2935,41 +3572,11 @@ class SimMovieMaker:
                 pos_parts = pos_var.get().split(",")
                 px = int(pos_parts[0].strip())
                 py = int(pos_parts[1].strip())
+                fmt_str.format(start_t)  # validate before starting the batch
                 dlg.destroy()
-
-                paths = self._get_selected_image_paths()
-                if not paths:
-                    messagebox.showinfo("Timestamp", "No images selected.")
-                    return
-
-                progress = ProgressDialog(self.root, "Applying Timestamp",
-                                          maximum=len(paths))
-
-                def _thread():
-                    try:
-                        for i, p in enumerate(paths):
-                            if progress.cancelled:
-                                break
-                            img = cv2.imread(p)
-                            if img is None:
-                                continue
-                            t = start_t + i * step
-                            text = fmt_str.format(t)
-                            cv2.putText(img, text, (px, py),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.7,
-                                        (255, 255, 255), 2, cv2.LINE_AA)
-                            cv2.imwrite(p, img)
-                            self.root.after(0, progress.update_progress, i + 1,
-                                            f"{i+1}/{len(paths)}")
-                        self.root.after(0, progress.destroy)
-                        self.root.after(0, self.update_preview)
-                        self.root.after(0, self.status_var.set,
-                                        f"Timestamp applied to {len(paths)} image(s)")
-                    except Exception as e:
-                        self.root.after(0, progress.destroy)
-                        self.root.after(0, messagebox.showerror, "Error", str(e))
-
-                threading.Thread(target=_thread, daemon=True).start()
+                self._apply_filter_specs_to_selected(
+                    [{"op": "timestamp", "start": start_t, "step": step,
+                      "format": fmt_str, "x": px, "y": py}], "Timestamp")
 
             except Exception as e:
                 messagebox.showerror("Error", f"Invalid input: {e}")
@@ -2977,6 +3584,70 @@ class SimMovieMaker:
         ttk.Button(btn_frame, text="Apply", command=apply_timestamp).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Cancel", command=dlg.destroy).pack(side=tk.LEFT, padx=5)
 
+    # -- Filter chain --
+
+    def run_filter_chain(self, chain=None):
+        """Add *chain* (default: the queued chain) to the selected images'
+        edit lists; all of its filters are then applied in the same
+        decode/encode pass at preview and render time."""
+        chain = chain if chain is not None else self.filter_chain
+        if not len(chain):
+            messagebox.showinfo("Filter Chain", "The filter chain is empty.")
+            return
+        queued = self._queue_filters_var.get()
+        self._queue_filters_var.set(False)
+        try:
+            self._apply_filter_specs_to_selected(
+                list(chain), f"Filter Chain ({chain.describe()})")
+        finally:
+            self._queue_filters_var.set(queued)
+
+    def show_filter_chain(self):
+        if not len(self.filter_chain):
+            messagebox.showinfo("Filter Chain", "The filter chain is empty.")
+            return
+        lines = [f"{i + 1}. {json.dumps(spec)}"
+                 for i, spec in enumerate(self.filter_chain)]
+        messagebox.showinfo("Filter Chain", "\n".join(lines))
+
+    def clear_filter_chain(self):
+        self.filter_chain.clear()
+        self.status_var.set("Filter chain cleared")
+
+    def save_filter_chain(self):
+        if not len(self.filter_chain):
+            messagebox.showinfo("Filter Chain", "The filter chain is empty.")
+            return
+        filename = filedialog.asksaveasfilename(
+            title="Save Filter Chain", defaultextension=".smc",
+            filetypes=[("SimMovieMaker Filter Chain", "*.smc"), ("All files", "*.*")])
+        if not filename:
+            return
+        try:
+            self.filter_chain.save(filename)
+            self.status_var.set(f"Filter chain saved: {os.path.basename(filename)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save filter chain: {e}")
+
+    def load_filter_chain(self):
+        chain = self._ask_filter_chain_file()
+        if chain is not None:
+            self.filter_chain = chain
+            self.status_var.set(f"Filter chain loaded: {chain.describe()}")
+
+    def _ask_filter_chain_file(self):
+        """Prompt for a saved chain file and return it as a FilterChain."""
+        filename = filedialog.askopenfilename(
+            title="Load Filter Chain",
+            filetypes=[("SimMovieMaker Filter Chain", "*.smc"), ("All files", "*.*")])
+        if not filename:
+            return None
+        try:
+            return filters.FilterChain.load(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load filter chain: {e}")
+            return None
+
     # ==================================================================
     # TOOLS
     # ==================================================================
@@ -2996,21 +3667,37 @@ class SimMovieMaker:
         ttk.Label(frame, text="Apply a filter to all images in the list.").pack(
             anchor=tk.W, pady=(0, 10))
 
+        current_chain = "(current filter chain)"
+        saved_chain = "(saved filter chain...)"
         filter_var = tk.StringVar(value="grayscale")
-        filters = ["grayscale", "resize", "rotate", "brightness", "contrast"]
+        choices = ["grayscale", "resize", "rotate", "brightness", "contrast",
+                   current_chain, saved_chain]
         ttk.Label(frame, text="Select filter:").pack(anchor=tk.W)
-        combo = ttk.Combobox(frame, textvariable=filter_var, values=filters,
-                             state="readonly", width=20)
+        combo = ttk.Combobox(frame, textvariable=filter_var, values=choices,
+                             state="readonly", width=28)
         combo.pack(anchor=tk.W, pady=5)
+        ttk.Label(frame, text=f"Current chain: {self.filter_chain.describe()}",
+                  foreground="gray").pack(anchor=tk.W)
 
         btn_frame = ttk.Frame(frame)
         btn_frame.pack(fill=tk.X, pady=10)
 
         def run_batch():
+            choice = filter_var.get()
             batch.destroy()
+            chain = None
+            if choice == current_chain:
+                chain = self.filter_chain
+            elif choice == saved_chain:
+                chain = self._ask_filter_chain_file()
+                if chain is None:
+                    return
             self.file_listbox.selection_set(0, tk.END)
             self.update_selected_indices()
-            self.apply_filter(filter_var.get())
+            if chain is not None:
+                self.run_filter_chain(chain)
+            else:
+                self.apply_filter(choice)
 
         ttk.Button(btn_frame, text="Run", command=run_batch).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Cancel",
@@ -3027,7 +3714,15 @@ class SimMovieMaker:
             return
         try:
             with open(filename, "w") as f:
+                last_stack = None
                 for entry in self.media_files:
+                    # A stack is listed once and re-expanded on import.
+                    if entry["type"] == "stack":
+                        if entry["path"] == last_stack:
+                            continue
+                        last_stack = entry["path"]
+                    else:
+                        last_stack = None
                     f.write(f"{entry['path']}\n")
             self.status_var.set(f"File list exported to {os.path.basename(filename)}")
         except Exception as e:
@@ -3045,7 +3740,11 @@ class SimMovieMaker:
             self.media_files = []
             self.file_listbox.delete(0, tk.END)
             for path in file_paths:
-                if os.path.isfile(path):
+                if os.path.isfile(path) and frame_stack.is_stack_file(path):
+                    for entry in frame_stack.stack_entries(path):
+                        self.media_files.append(entry)
+                        self.file_listbox.insert(tk.END, _listbox_display(entry))
+                elif os.path.isfile(path):
                     mtype = "video" if _is_video_file(path) else "image"
                     entry = {"path": path, "type": mtype}
                     self.media_files.append(entry)
@@ -3055,6 +3754,7 @@ class SimMovieMaker:
                 self.update_preview()
             self._rebuild_thumb_strip()
             self.status_var.set(f"Imported {len(self.media_files)} file(s)")
+            self._probe_videos_async()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to import: {e}")
 
@@ -3083,7 +3783,8 @@ snapshots and performing video file operations.
 IMAGE WORKFLOW
 --------------
 1. Import your simulation images using File > Import Images
-   or File > Import Sequence.
+   or File > Import Sequence, or a whole .npy frame stack with
+   File > Import Frame Stack.
 2. Arrange images in the desired order using the Up/Down buttons.
 3. Set output properties (FPS, format, codec).
 4. Use the Play button or Preview to check how the movie will look.
@@ -3101,6 +3802,23 @@ VIDEO OPERATIONS (requires FFmpeg)
 - Convert Format: transcode between video formats.
 - Create GIF: convert a video to an animated GIF.
 
+FILTERS
+-------
+- Filters are non-destructive: they are recorded per image in the
+  project and applied on the fly in preview and when creating videos.
+- Edit > Undo Last Filter / Clear Filters removes them again.
+- Filters > Bake Edits Into Files writes the result over the source
+  images (cannot be undone).
+
+FILTER CHAINS
+-------------
+- Enable Filters > Filter Chain > Queue Filters Into Chain, then pick
+  filters from the Filters menu to queue them instead of applying them.
+- Run Filter Chain adds every queued filter to the selected images;
+  they are applied together in a single pass per frame.
+- Chains can be saved to / loaded from .smc files, and Tools > Batch
+  Process can run the current or a saved chain on all images.
+
 METADATA
 --------
 - View, edit, or strip metadata from video files.
@@ -3157,9 +3875,7 @@ KEYBOARD SHORTCUTS
         FFmpegHelpDialog(self.root, text)
 
     def check_for_ffmpeg(self):
-        import simmovimaker.ffmpeg_utils as _fu
-        _fu._ffmpeg_path_cache = None
-        _fu._ffprobe_path_cache = None
+        invalidate_capabilities()
         self.status_var.set("Checking for FFmpeg...")
         threading.Thread(target=self._check_ffmpeg_async, daemon=True).start()
 
@@ -0,0 +1,233 @@
+"""
+arrays.py - Encode frames straight from NumPy arrays.
+
+Simulation codes already hold their output as arrays.  Rendering every
+step to PNG only for SimMovieMaker to decode it again costs a full image
+encode and decode per frame; :func:`encode_frames` instead takes an
+array, an iterable of arrays (e.g. a generator stepping the simulation)
+or a ``.npy`` / ``.npz`` file and pipes the frames as raw video into the
+encoder.
+
+Frames are ``(H, W)`` scalar fields or ``(H, W, 3)`` RGB images of any
+numeric dtype.  Scalar fields are mapped linearly to 0..255 (fixed
+``vmin`` / ``vmax``, per frame, or over the whole sequence) or coloured
+with a :class:`~simmovimaker.colormap.Colormap`; both steps operate on
+whole frames at once.
+"""
+
+import os
+
+import numpy as np
+
+from .colormap import Colormap
+from .encoder import open_frame_writer, resolve_codec
+
+
+ARRAY_EXTENSIONS = (".npy", ".npz")
+
+# How scalar frames are mapped to 0..255 when vmin/vmax are not both given:
+# over the whole sequence, per frame, or not at all (values are clipped).
+NORMALIZE_MODES = ("global", "frame", "none")
+
+# Frames read at once when scanning an array for its value range.
+_RANGE_CHUNK = 32
+
+
+def is_array_file(path):
+    return os.path.splitext(str(path))[1].lower() in ARRAY_EXTENSIONS
+
+
+def load_frames(path, key=None):
+    """Return the ``(N, H, W[, C])`` frame array stored in *path*.
+
+    ``.npy`` files are memory-mapped, so frames are read from disk as they
+    are encoded.  For ``.npz`` archives *key* names the array (default:
+    the first one); members of an archive are loaded when accessed.
+    """
+    if os.path.splitext(str(path))[1].lower() == ".npz":
+        with np.load(path, allow_pickle=False) as archive:
+            names = list(archive.files)
+            if not names:
+                raise ValueError(f"{path} contains no arrays.")
+            if key is None:
+                key = names[0]
+            elif key not in names:
+                raise ValueError(f"{path} has no array {key!r} "
+                                 f"(arrays: {', '.join(names)})")
+            return archive[key]
+    return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+def value_range(frames, chunk=_RANGE_CHUNK):
+    """Return the ``(min, max)`` over all *frames* of an array, ignoring
+    NaNs.  The array is read *chunk* frames at a time, so a memory-mapped
+    stack is never loaded whole."""
+    lo, hi = np.inf, -np.inf
+    for start in range(0, len(frames), chunk):
+        block = np.asarray(frames[start:start + chunk])
+        if np.issubdtype(block.dtype, np.floating):
+            block = block[np.isfinite(block)]
+            if block.size == 0:
+                continue
+        lo = min(lo, float(block.min()))
+        hi = max(hi, float(block.max()))
+    if lo > hi:
+        return 0.0, 0.0
+    return lo, hi
+
+
+def to_uint8(frame, vmin=None, vmax=None):
+    """Map *frame* linearly so *vmin* becomes 0 and *vmax* 255.
+
+    A missing bound is taken from the frame itself; NaNs become 0 and
+    values outside the range are clipped.  uint8 frames with no bounds are
+    returned unchanged.
+    """
+    frame = np.asarray(frame)
+    if frame.dtype == np.uint8 and vmin is None and vmax is None:
+        return frame
+    if vmin is None or vmax is None:
+        lo, hi = value_range(frame[np.newaxis])
+        vmin = lo if vmin is None else vmin
+        vmax = hi if vmax is None else vmax
+    scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+    work = frame.astype(np.float32)
+    work -= vmin
+    work *= scale
+    np.nan_to_num(work, copy=False, nan=0.0)
+    np.clip(work, 0.0, 255.0, out=work)
+    return work.astype(np.uint8)
+
+
+def apply_lut(frame, lut):
+    """Colour the uint8 *frame* through the ``(256, 3)`` RGB table *lut*."""
+    return np.take(lut, frame, axis=0)
+
+
+def _open_source(frames, key=None):
+    """Return ``(frames, count)`` for any supported source; *count* is
+    ``None`` for iterables of unknown length."""
+    if isinstance(frames, (str, os.PathLike)):
+        frames = load_frames(frames, key)
+    if isinstance(frames, np.ndarray):
+        if frames.ndim not in (3, 4):
+            raise ValueError(f"Expected an (N, H, W[, C]) frame array, "
+                             f"got shape {frames.shape}.")
+        return frames, len(frames)
+    try:
+        return frames, len(frames)
+    except TypeError:
+        return frames, None
+
+
+def _frame_pix_fmt(frame, coloured):
+    if frame.ndim == 2 or (frame.ndim == 3 and frame.shape[2] == 1):
+        return "rgb24" if coloured else "gray"
+    if frame.ndim == 3 and frame.shape[2] in (3, 4):
+        return "rgb24"
+    raise ValueError(f"Frames must be (H, W) or (H, W, 3), got {frame.shape}.")
+
+
+def encode_frames(frames, output_file, fps=30, codec="H264", quality=80,
+                  vmin=None, vmax=None, normalize=None, colormap=None,
+                  key=None, progress_callback=None):
+    """Encode *frames* into *output_file* without writing any images.
+
+    Parameters
+    ----------
+    frames : array, iterable of arrays, or str
+        An ``(N, H, W[, C])`` array, any iterable yielding ``(H, W[, C])``
+        frames, or the path of a ``.npy`` / ``.npz`` file.
+    fps : float
+        Output frame rate.
+    codec : str
+        Output Settings codec name (``"H264"``, ``"VP9"``, ``"MJPG"``,
+        ``"XVID"``) or the matching ffmpeg encoder name (``"libx264"``,
+        ...).  Unknown names raise ``ValueError`` before anything is read.
+    quality : int
+        0..100, as in the Output Settings dialog.
+    vmin, vmax : float, optional
+        Values mapped to black and white.  Override *normalize*.
+    normalize : str, optional
+        One of :data:`NORMALIZE_MODES`.  By default uint8 data is used as
+        is, other arrays are scaled over the whole sequence and other
+        iterables per frame (their range is not known in advance).
+    colormap : str, Colormap or ndarray, optional
+        Colour scalar frames with this map (see
+        :func:`simmovimaker.colormap.colormap_names`), a ready
+        :class:`~simmovimaker.colormap.Colormap` (which keeps its own
+        range), or a ``(256, 3)`` uint8 RGB table indexed by the
+        normalised values.  16-bit and float data keep their full
+        precision when coloured by a named map.
+    key : str, optional
+        Array to read from an ``.npz`` file.
+    progress_callback : callable, optional
+        Called with a percentage when the frame count is known.
+
+    Returns *output_file*.
+    """
+    codec = resolve_codec(codec)
+    frames, count = _open_source(frames, key)
+    if normalize is None:
+        if isinstance(frames, np.ndarray):
+            normalize = "none" if frames.dtype == np.uint8 else "global"
+        else:
+            normalize = "frame"
+    if normalize not in NORMALIZE_MODES:
+        raise ValueError(f"Unknown normalization {normalize!r} "
+                         f"(expected one of {', '.join(NORMALIZE_MODES)})")
+    if normalize == "global" and (vmin is None or vmax is None):
+        if not isinstance(frames, np.ndarray):
+            raise ValueError("Global normalization needs an array or file "
+                             "source; use vmin/vmax or normalize='frame'.")
+        lo, hi = value_range(frames)
+        vmin = lo if vmin is None else vmin
+        vmax = hi if vmax is None else vmax
+    elif normalize == "none" and (vmin is not None or vmax is not None):
+        vmin = 0.0 if vmin is None else vmin
+        vmax = 255.0 if vmax is None else vmax
+    lut = cmap = None
+    if isinstance(colormap, str):
+        cmap = Colormap(colormap, vmin, vmax)
+    elif isinstance(colormap, Colormap):
+        cmap = colormap
+    elif colormap is not None:
+        lut = np.asarray(colormap, dtype=np.uint8)
+
+    out = None
+    pix_fmt = None
+    try:
+        for i, frame in enumerate(frames):
+            frame = np.asarray(frame)
+            if pix_fmt is None:
+                pix_fmt = _frame_pix_fmt(frame, colormap is not None)
+            if frame.ndim == 3 and frame.shape[2] == 1:
+                frame = frame[:, :, 0]
+            elif frame.ndim == 3 and frame.shape[2] == 4:
+                frame = frame[:, :, :3]
+            if cmap is not None and frame.ndim == 2:
+                frame = cmap.apply(frame)
+            elif normalize != "none" or vmin is not None:
+                frame = to_uint8(frame, vmin, vmax)
+            elif frame.dtype != np.uint8:
+                frame = np.clip(frame, 0, 255).astype(np.uint8)
+            if lut is not None and frame.ndim == 2:
+                frame = apply_lut(frame, lut)
+            if out is None:
+                height, width = frame.shape[:2]
+                out = open_frame_writer(output_file, width, height, fps,
+                                        codec=codec, quality=quality,
+                                        pix_fmt=pix_fmt)
+            out.write(np.ascontiguousarray(frame))
+            if progress_callback is not None and count:
+                progress_callback(min(100.0, (i + 1) * 100.0 / count))
+    except BaseException:
+        if out is not None:
+            out.abort()
+        raise
+    if out is None:
+        raise ValueError("No frames to encode.")
+    out.close()
+    if progress_callback is not None:
+        progress_callback(100.0)
+    return output_file
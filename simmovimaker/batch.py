@@ -0,0 +1,384 @@
+"""
+batch.py - Run many video operations from a manifest in one process.
+
+A manifest lists operations such as::
+
+    [
+      {"id": "trim-run1", "op": "trim", "input": "run1.mp4",
+       "output": "run1_cut.mp4", "start": 5, "end": 60},
+      {"op": "gif", "input": "run1_cut.mp4", "output": "run1.gif",
+       "after": ["trim-run1"]}
+    ]
+
+as JSON (a list, or an object with a ``"jobs"`` list), YAML (same shape,
+requires PyYAML) or CSV (one row per job, one column per field).  The
+jobs run on a :class:`~simmovimaker.jobs.JobManager`, status changes are
+reported as JSON lines, and finished jobs are recorded in a state file so
+a re-run with ``--resume`` only repeats what failed or never ran.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from . import video_ops
+from .jobs import JobManager, DONE, FAILED, CANCELLED, RUNNING
+
+
+# Fields converted to numbers when a manifest comes from CSV.
+_FLOAT_FIELDS = ("start", "end", "factor", "fps", "vmin", "vmax")
+_INT_FIELDS = ("width", "segments", "quality")
+
+
+# ---------------------------------------------------------------------------
+# Manifest loading
+# ---------------------------------------------------------------------------
+
+def _split_list(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [v.strip() for v in str(value).replace(";", ",").split(",") if v.strip()]
+
+
+def _normalise_csv_row(row):
+    job = {k.strip(): v.strip() for k, v in row.items()
+           if k and v is not None and v.strip() != ""}
+    for key in _FLOAT_FIELDS:
+        if key in job:
+            job[key] = float(job[key])
+    for key in _INT_FIELDS:
+        if key in job:
+            job[key] = int(job[key])
+    if "inputs" in job:
+        job["inputs"] = [p.strip() for p in job["inputs"].split(";") if p.strip()]
+    if "points" in job:
+        job["points"] = [float(p) for p in _split_list(job["points"])]
+    if "after" in job:
+        job["after"] = _split_list(job["after"])
+    for key in ("strip", "fast"):
+        if key in job:
+            job[key] = job[key].lower() in ("1", "true", "yes")
+    if "set" in job:
+        job["set"] = dict(item.split("=", 1)
+                          for item in job["set"].split(";") if "=" in item)
+    return job
+
+
+def load_manifest(path):
+    """Load the job list from a JSON, YAML or CSV manifest."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        if ext == ".csv":
+            return [_normalise_csv_row(row) for row in csv.DictReader(fh)]
+        if ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML manifests require PyYAML "
+                                 "(pip install pyyaml).")
+            data = yaml.safe_load(fh)
+        else:
+            data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+    if not isinstance(data, list):
+        raise ValueError("Manifest must contain a list of jobs.")
+    return [dict(job) for job in data]
+
+
+def job_key(job):
+    """Stable identifier of a manifest entry: its ``id`` field, or a hash
+    of its contents (so reordering the manifest does not change it)."""
+    if job.get("id"):
+        return str(job["id"])
+    blob = json.dumps(job, sort_keys=True, default=str).encode("utf-8")
+    return f"{job.get('op', 'job')}-{hashlib.sha1(blob).hexdigest()[:10]}"
+
+
+# ---------------------------------------------------------------------------
+# Operations
+# ---------------------------------------------------------------------------
+
+def _require(job, *fields):
+    missing = [f for f in fields if job.get(f) in (None, "", [])]
+    if missing:
+        raise ValueError(f"{job.get('op')}: missing field(s) {', '.join(missing)}")
+
+
+def _op_trim(job, cb):
+    _require(job, "input", "output", "start", "end")
+    return video_ops.trim_video(job["input"], job["output"], float(job["start"]),
+                                float(job["end"]), progress_callback=cb,
+                                accurate=not job.get("fast"))
+
+
+def _op_convert(job, cb):
+    _require(job, "input", "output")
+    return video_ops.convert_format(job["input"], job["output"],
+                                    codec=job.get("codec"),
+                                    bitrate=job.get("bitrate"),
+                                    progress_callback=cb,
+                                    segments=job.get("segments"))
+
+
+def _op_gif(job, cb):
+    _require(job, "input", "output")
+    return video_ops.create_gif(job["input"], job["output"],
+                                fps=int(job.get("fps", 10)),
+                                width=int(job.get("width", 480)),
+                                progress_callback=cb)
+
+
+def _op_extract_frames(job, cb):
+    if job.get("npy"):
+        _require(job, "input")
+        shape = video_ops.save_frames_npy(
+            job["input"], job["npy"], progress_callback=cb, fps=job.get("fps"),
+            width=job.get("width"), start_time=job.get("start"),
+            end_time=job.get("end"))
+        return f"{shape[0]} frame(s) in {job['npy']}"
+    output_dir = job.get("output_dir") or job.get("output")
+    _require(dict(job, output_dir=output_dir), "input", "output_dir")
+    frames = video_ops.extract_frames(job["input"], output_dir,
+                                      fps=job.get("fps"),
+                                      format=job.get("format", "png"),
+                                      progress_callback=cb)
+    return output_dir if frames is None else f"{len(frames)} frame(s) in {output_dir}"
+
+
+def _op_speed(job, cb):
+    _require(job, "input", "output", "factor")
+    return video_ops.change_speed(job["input"], job["output"],
+                                  float(job["factor"]), progress_callback=cb,
+                                  segments=job.get("segments"))
+
+
+def _op_metadata(job, cb):
+    _require(job, "input", "output")
+    if job.get("strip"):
+        return video_ops.strip_metadata(job["input"], job["output"],
+                                        progress_callback=cb)
+    _require(job, "set")
+    return video_ops.set_metadata(job["input"], job["output"], dict(job["set"]),
+                                  progress_callback=cb)
+
+
+def _op_create(job, cb):
+    _require(job, "input", "output")
+    image_files = video_ops.collect_image_files(job["input"], job.get("pattern"))
+    if not image_files:
+        raise ValueError(f"No image files found in {job['input']}")
+    return video_ops.create_video_from_images(
+        image_files, job["output"], fps=float(job.get("fps", 30)),
+        codec=job.get("codec", "libx264"), progress_callback=cb)
+
+
+def _op_encode_array(job, cb):
+    _require(job, "input", "output")
+    from .arrays import encode_frames
+    return encode_frames(job["input"], job["output"],
+                         fps=float(job.get("fps", 30)),
+                         codec=job.get("codec", "H264"),
+                         quality=int(job.get("quality", 80)),
+                         vmin=job.get("vmin"), vmax=job.get("vmax"),
+                         normalize=job.get("normalize"),
+                         colormap=job.get("colormap"), key=job.get("key"),
+                         progress_callback=cb)
+
+
+def _op_merge(job, cb):
+    _require(job, "inputs", "output")
+    return video_ops.merge_videos(list(job["inputs"]), job["output"],
+                                  progress_callback=cb)
+
+
+def _op_split(job, cb):
+    output_dir = job.get("output_dir") or job.get("output")
+    _require(dict(job, output_dir=output_dir), "input", "output_dir", "points")
+    outputs = video_ops.split_video(job["input"], output_dir,
+                                    [float(p) for p in _split_list(job["points"])],
+                                    progress_callback=cb)
+    return f"{len(outputs)} segment(s) in {output_dir}"
+
+
+def _op_mute(job, cb):
+    _require(job, "input", "output")
+    return video_ops.mute_audio(job["input"], job["output"], progress_callback=cb)
+
+
+OPERATIONS = {
+    "trim": _op_trim,
+    "convert": _op_convert,
+    "gif": _op_gif,
+    "extract-frames": _op_extract_frames,
+    "speed": _op_speed,
+    "metadata": _op_metadata,
+    "create": _op_create,
+    "encode-array": _op_encode_array,
+    "merge": _op_merge,
+    "split": _op_split,
+    "mute": _op_mute,
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+# Lines of ffmpeg's log quoted when an operation fails.
+_ERROR_TAIL_LINES = 15
+
+
+def _checked(result):
+    """Return *result*, raising ``RuntimeError`` if it is a failed ffmpeg
+    run (``run_ffmpeg`` reports failure through the return code only)."""
+    if isinstance(result, subprocess.CompletedProcess) and result.returncode != 0:
+        tail = "\n".join((result.stderr or "").strip().splitlines()[-_ERROR_TAIL_LINES:])
+        raise RuntimeError(f"ffmpeg exited with code {result.returncode}"
+                           + (f":\n{tail}" if tail else ""))
+    return result
+
+
+def _describe_result(result):
+    """Return a JSON-friendly summary of an operation's result."""
+    if isinstance(result, subprocess.CompletedProcess):
+        return None
+    return result
+
+
+def _load_state(state_file):
+    """Return the set of job keys recorded as done in *state_file*."""
+    done = set()
+    try:
+        with open(state_file, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("status") == DONE:
+                    done.add(record.get("id"))
+                else:
+                    done.discard(record.get("id"))
+    except OSError:
+        pass
+    return done
+
+
+def run_batch(jobs, max_jobs=None, state_file=None, resume=False,
+              fail_fast=False, overwrite=False, out=None):
+    """Run manifest *jobs* and report status as JSON lines on *out*.
+
+    Parameters
+    ----------
+    jobs : list of dict
+        Manifest entries; each needs an ``"op"`` from :data:`OPERATIONS`.
+        An optional ``"after"`` list names (by ``id``) earlier jobs that
+        must finish first.
+    max_jobs : int, optional
+        Operations run at once (default: :func:`jobs.default_concurrency`).
+    state_file : str, optional
+        JSON-lines file where finished jobs are recorded.
+    resume : bool
+        Skip jobs that *state_file* records as done.
+    fail_fast : bool
+        Cancel everything still queued after the first failure.
+    overwrite : bool
+        Delete an existing output file before running its job (ffmpeg
+        will otherwise refuse to overwrite it).
+
+    Returns a dict counting jobs per final status.
+    """
+    out = out or sys.stdout
+    lock = threading.RLock()
+    state_fh = open(state_file, "a", encoding="utf-8") if state_file else None
+    already_done = _load_state(state_file) if (state_file and resume) else set()
+
+    def _emit(record):
+        line = json.dumps(record, default=str)
+        with lock:
+            out.write(line + "\n")
+            out.flush()
+            if state_fh is not None and record["status"] in (DONE, FAILED, CANCELLED):
+                state_fh.write(line + "\n")
+                state_fh.flush()
+
+    entries = {}            # job key -> manifest entry
+    started = {}            # job key -> monotonic start time
+    last_state = {}
+
+    def _on_change(job):
+        key = job.title
+        with lock:
+            if key not in entries or last_state.get(key) == job.state:
+                return
+            last_state[key] = job.state
+        entry = entries[key]
+        record = {"id": key, "op": entry.get("op"), "status": job.state,
+                  "input": entry.get("input") or entry.get("inputs"),
+                  "output": entry.get("output") or entry.get("output_dir")}
+        if job.state == RUNNING:
+            started[key] = time.monotonic()
+        elif job.finished:
+            if key in started:
+                record["elapsed"] = round(time.monotonic() - started[key], 3)
+            if job.state == DONE and _describe_result(job.result) is not None:
+                record["result"] = _describe_result(job.result)
+            if job.error is not None:
+                record["error"] = str(job.error)
+        _emit(record)
+        if fail_fast and job.state == FAILED:
+            threading.Thread(target=manager.cancel_all, daemon=True).start()
+
+    manager = JobManager(max_concurrent=max_jobs, on_change=_on_change)
+    counts = {"done": 0, "failed": 0, "cancelled": 0, "skipped": 0}
+    submitted = {}
+    try:
+        # Validate everything before starting anything.
+        keys = []
+        for job in jobs:
+            if job.get("op") not in OPERATIONS:
+                raise ValueError(f"Unknown operation {job.get('op')!r} "
+                                 f"(expected one of {', '.join(OPERATIONS)})")
+            key = job_key(job)
+            if key in keys:
+                key = f"{key}-{len(keys)}"
+            for name in _split_list(job.get("after", [])):
+                if name not in keys:
+                    where = "appears later in" if any(
+                        job_key(j) == name for j in jobs) else "is not in"
+                    raise ValueError(f"Job {key!r}: 'after' job {name!r} {where} "
+                                     "the manifest (dependencies must come first).")
+            keys.append(key)
+
+        for key, entry in zip(keys, jobs):
+            if key in already_done:
+                counts["skipped"] += 1
+                _emit({"id": key, "op": entry.get("op"), "status": "skipped"})
+                continue
+            # Dependencies skipped on resume are already done.
+            depends_on = [submitted[name] for name in _split_list(entry.get("after", []))
+                          if name in submitted]
+            if overwrite:
+                output = entry.get("output")
+                if output and os.path.isfile(output):
+                    os.remove(output)
+            op = OPERATIONS[entry["op"]]
+            with lock:
+                entries[key] = entry
+            submitted[key] = manager.submit(
+                key, lambda cb, op=op, entry=entry: _checked(op(entry, cb)),
+                depends_on)
+        manager.wait()
+    finally:
+        if state_fh is not None:
+            state_fh.close()
+
+    for job in submitted.values():
+        counts[job.state] = counts.get(job.state, 0) + 1
+    return counts
@@ -1,33 +1,24 @@
 """Command-line interface for SimMovieMaker.
 
-Provides subcommands for creating videos from image sequences and for
-common video editing operations (merge, split, trim, mute, speed change,
-GIF creation, frame extraction, metadata manipulation, etc.).
+Provides subcommands for creating videos from image sequences or NumPy
+frame arrays and for common video editing operations (merge, split, trim,
+mute, speed change, GIF creation, frame extraction, metadata manipulation,
+etc.), plus a ``batch`` subcommand that runs many of them from one
+manifest.
 
 All heavy lifting is delegated to :mod:`simmovimaker.video_ops` and
-:mod:`simmovimaker.ffmpeg_utils`.
+:mod:`simmovimaker.ffmpeg_utils`.  Subcommands import what they need when
+they run, so pure ffmpeg commands such as ``info`` never load OpenCV,
+NumPy or Pillow; ``--profile-startup`` reports where import time goes.
 """
 
 import argparse
-import glob
 import os
+import subprocess
 import sys
 
 from . import __version__
-from .ffmpeg_utils import check_ffmpeg, FFmpegNotFoundError, run_ffmpeg
-from .video_ops import (
-    get_video_info,
-    get_metadata,
-    merge_videos,
-    split_video,
-    trim_video,
-    mute_audio,
-    change_speed,
-    extract_frames,
-    create_gif,
-    strip_metadata,
-    set_metadata,
-)
+from .ffmpeg_utils import check_ffmpeg, get_capabilities, FFmpegNotFoundError
 
 
 # ---------------------------------------------------------------------------
@@ -57,6 +48,8 @@ def _error(message):
 
 def _cmd_create(args):
     """Create a video from an image sequence (default subcommand)."""
+    from .video_ops import collect_image_files, create_video_from_images
+
     input_path = args.input
     output_file = args.output
     fps = args.fps
@@ -69,23 +62,10 @@ def _cmd_create(args):
         output_file = f"output.{fmt}"
 
     # Collect image files
-    if os.path.isdir(input_path):
-        if pattern:
-            image_files = sorted(glob.glob(os.path.join(input_path, pattern)))
-        else:
-            extensions = ("*.png", "*.jpg", "*.jpeg", "*.bmp", "*.tif", "*.tiff")
-            image_files = []
-            for ext in extensions:
-                image_files.extend(glob.glob(os.path.join(input_path, ext)))
-            image_files.sort()
-    elif os.path.isfile(input_path):
-        # Treat as a text file containing one image path per line
-        with open(input_path, "r", encoding="utf-8") as fh:
-            image_files = [
-                line.strip() for line in fh if line.strip() and not line.startswith("#")
-            ]
-    else:
-        return _error(f"Input path does not exist: {input_path}")
+    try:
+        image_files = collect_image_files(input_path, pattern)
+    except FileNotFoundError as exc:
+        return _error(str(exc))
 
     if not image_files:
         return _error("No image files found.")
@@ -93,36 +73,8 @@ def _cmd_create(args):
     print(f"Found {len(image_files)} image(s).")
     print(f"Creating video: {output_file}  (fps={fps}, codec={codec}, format={fmt})")
 
-    # Build ffmpeg command for image sequence
-    # Write a temporary concat file listing each image with its duration
-    import tempfile
-
-    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="smm_cli_")
-    frame_duration = 1.0 / fps
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as fh:
-            for img in image_files:
-                safe = os.path.abspath(img).replace("'", "'\\''")
-                fh.write(f"file '{safe}'\n")
-                fh.write(f"duration {frame_duration}\n")
-            # Repeat last file so the last frame is shown for its full duration
-            if image_files:
-                safe = os.path.abspath(image_files[-1]).replace("'", "'\\''")
-                fh.write(f"file '{safe}'\n")
-
-        ffmpeg_args = [
-            "-f", "concat",
-            "-safe", "0",
-            "-i", list_path,
-        ]
-        if codec:
-            ffmpeg_args += ["-c:v", codec]
-        ffmpeg_args += ["-pix_fmt", "yuv420p", "-y", output_file]
-
-        run_ffmpeg(ffmpeg_args, progress_callback=_progress_printer)
-    finally:
-        if os.path.exists(list_path):
-            os.remove(list_path)
+    create_video_from_images(image_files, output_file, fps=fps, codec=codec,
+                             progress_callback=_progress_printer)
 
     if os.path.isfile(output_file):
         size_mb = os.path.getsize(output_file) / (1024 * 1024)
@@ -133,8 +85,38 @@ def _cmd_create(args):
     return 0
 
 
+def _cmd_encode_array(args):
+    """Create a video straight from a .npy / .npz frame array."""
+    from .arrays import encode_frames, load_frames
+
+    input_file = args.input
+    if not os.path.isfile(input_file):
+        return _error(f"Input file not found: {input_file}")
+
+    try:
+        frames = load_frames(input_file, key=args.key)
+    except (OSError, ValueError) as exc:
+        return _error(str(exc))
+
+    print(f"Encoding {len(frames)} frame(s) of shape {frames.shape[1:]} "
+          f"-> {args.output}  (fps={args.fps}, codec={args.codec})")
+    try:
+        encode_frames(frames, args.output, fps=args.fps, codec=args.codec,
+                      quality=args.quality, vmin=args.vmin, vmax=args.vmax,
+                      normalize=args.normalize, colormap=args.colormap,
+                      progress_callback=_progress_printer)
+    except (FFmpegNotFoundError, ValueError, RuntimeError) as exc:
+        return _error(str(exc))
+
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print(f"Done. Output: {args.output} ({size_mb:.1f} MB)")
+    return 0
+
+
 def _cmd_merge(args):
     """Merge multiple video files."""
+    from .video_ops import merge_videos
+
     input_files = args.inputs
     output_file = args.output
 
@@ -154,6 +136,8 @@ def _cmd_merge(args):
 
 def _cmd_split(args):
     """Split a video at given time points."""
+    from .video_ops import split_video
+
     input_file = args.input
     output_dir = args.output_dir
     points_str = args.points
@@ -170,7 +154,7 @@ def _cmd_split(args):
     try:
         outputs = split_video(input_file, output_dir, split_points,
                               progress_callback=_progress_printer)
-    except FFmpegNotFoundError as exc:
+    except (FFmpegNotFoundError, RuntimeError) as exc:
         return _error(str(exc))
 
     print(f"Done. Created {len(outputs)} segment(s):")
@@ -181,6 +165,8 @@ def _cmd_split(args):
 
 def _cmd_mute(args):
     """Remove audio from a video."""
+    from .video_ops import mute_audio
+
     input_file = args.input
     output_file = args.output
 
@@ -199,6 +185,8 @@ def _cmd_mute(args):
 
 def _cmd_trim(args):
     """Trim a video between start and end times."""
+    from .video_ops import trim_video
+
     input_file = args.input
     output_file = args.output
     start = args.start
@@ -210,8 +198,9 @@ def _cmd_trim(args):
     print(f"Trimming {input_file} [{start}s - {end}s] -> {output_file} ...")
     try:
         trim_video(input_file, output_file, start, end,
-                   progress_callback=_progress_printer)
-    except FFmpegNotFoundError as exc:
+                   progress_callback=_progress_printer,
+                   accurate=not args.fast)
+    except (FFmpegNotFoundError, ValueError, RuntimeError) as exc:
         return _error(str(exc))
 
     print(f"Done. Output: {output_file}")
@@ -220,6 +209,8 @@ def _cmd_trim(args):
 
 def _cmd_info(args):
     """Display information about a video file."""
+    from .video_ops import get_video_info
+
     input_file = args.input
 
     if not os.path.isfile(input_file):
@@ -246,6 +237,8 @@ def _cmd_info(args):
 
 def _cmd_metadata(args):
     """View, strip, or set metadata on a video file."""
+    from .video_ops import get_metadata, strip_metadata, set_metadata
+
     input_file = args.input
 
     if not os.path.isfile(input_file):
@@ -293,6 +286,8 @@ def _cmd_metadata(args):
 
 def _cmd_extract_frames(args):
     """Extract frames from a video."""
+    from .video_ops import extract_frames, save_frames_npy
+
     input_file = args.input
     output_dir = args.output_dir
     fps = args.fps
@@ -300,6 +295,20 @@ def _cmd_extract_frames(args):
 
     if not os.path.isfile(input_file):
         return _error(f"Input file not found: {input_file}")
+    if not output_dir and not args.npy:
+        return _error("Give an output directory (-d) or a stack file (--npy).")
+
+    if args.npy:
+        print(f"Extracting frames from {input_file} -> {args.npy} ...")
+        try:
+            shape = save_frames_npy(
+                input_file, args.npy, progress_callback=_progress_printer,
+                fps=fps, width=args.width, start_time=args.start,
+                end_time=args.end, pix_fmt="gray" if args.gray else "rgb24")
+        except (FFmpegNotFoundError, ValueError, RuntimeError) as exc:
+            return _error(str(exc))
+        print(f"Done. Wrote {shape[0]} frame(s), array shape {shape}.")
+        return 0
 
     print(f"Extracting frames from {input_file} -> {output_dir}/ ...")
     try:
@@ -314,6 +323,8 @@ def _cmd_extract_frames(args):
 
 def _cmd_gif(args):
     """Create a GIF from a video."""
+    from .video_ops import create_gif
+
     input_file = args.input
     output_file = args.output
     fps = args.fps
@@ -339,6 +350,8 @@ def _cmd_gif(args):
 
 def _cmd_speed(args):
     """Change the playback speed of a video."""
+    from .video_ops import change_speed
+
     input_file = args.input
     output_file = args.output
     factor = args.factor
@@ -352,14 +365,100 @@ def _cmd_speed(args):
     print(f"Changing speed: {input_file} -> {output_file} (factor={factor}x) ...")
     try:
         change_speed(input_file, output_file, factor,
-                     progress_callback=_progress_printer)
-    except FFmpegNotFoundError as exc:
+                     progress_callback=_progress_printer,
+                     segments=args.segments)
+    except (FFmpegNotFoundError, RuntimeError) as exc:
         return _error(str(exc))
 
     print(f"Done. Output: {output_file}")
     return 0
 
 
+def _cmd_batch(args):
+    """Run every job in a manifest on a worker pool."""
+    from .batch import load_manifest, run_batch
+
+    if not os.path.isfile(args.manifest):
+        return _error(f"Manifest not found: {args.manifest}")
+    try:
+        jobs = load_manifest(args.manifest)
+    except ValueError as exc:
+        return _error(str(exc))
+    if not jobs:
+        return _error("Manifest contains no jobs.")
+
+    state_file = args.state or f"{args.manifest}.state.jsonl"
+    if not args.resume and os.path.exists(state_file):
+        os.remove(state_file)
+
+    try:
+        counts = run_batch(jobs, max_jobs=args.jobs, state_file=state_file,
+                           resume=args.resume, fail_fast=args.fail_fast,
+                           overwrite=args.overwrite)
+    except ValueError as exc:
+        return _error(str(exc))
+
+    summary = ", ".join(f"{n} {status}" for status, n in counts.items() if n)
+    print(f"Batch finished: {summary or 'nothing to do'}", file=sys.stderr)
+    if counts.get("failed") or counts.get("cancelled"):
+        print(f"Re-run with --resume to retry; state kept in {state_file}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+def _cmd_stats(args):
+    """Print dataset-wide intensity statistics of a frame array or image
+    sequence."""
+    import json
+
+    from .stats import compute_stats
+
+    input_path = args.input
+    try:
+        percentiles = [float(p) for p in args.percentiles.split(",") if p.strip()]
+    except ValueError:
+        return _error(f"Invalid percentiles: {args.percentiles}")
+
+    try:
+        if os.path.isfile(input_path) and input_path.lower().endswith((".npy", ".npz")):
+            from .arrays import load_frames
+            frames = load_frames(input_path, key=args.key)
+        else:
+            from .edits import SourceFrames
+            from .video_ops import collect_image_files
+            paths = collect_image_files(input_path, args.pattern)
+            if not paths:
+                return _error("No image files found.")
+            frames = SourceFrames([{"path": p, "type": "image"} for p in paths])
+    except (OSError, ValueError) as exc:
+        return _error(str(exc))
+
+    def _progress(done, total):
+        _progress_printer(100.0 * done / total)
+
+    try:
+        stats = compute_stats(frames, workers=args.jobs,
+                              progress_callback=None if args.json else _progress)
+    except ValueError as exc:
+        return _error(str(exc))
+    if not stats.count:
+        return _error("No finite values found.")
+
+    summary = stats.to_dict(percentiles)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    exactness = "exact" if stats.exact else "sampled"
+    print(f"Frames:  {summary['frames']}  ({summary['count']} values)")
+    print(f"Range:   {summary['min']:g} .. {summary['max']:g}")
+    print(f"Mean:    {summary['mean']:g}  (std {summary['std']:g})")
+    print(f"Percentiles ({exactness}):")
+    for q, value in summary.get("percentiles", {}).items():
+        print(f"  {q:>6}%: {value:g}")
+    return 0
+
+
 def _cmd_check_ffmpeg(args):
     """Check whether ffmpeg is installed and reachable."""
     status = check_ffmpeg()
@@ -370,6 +469,11 @@ def _cmd_check_ffmpeg(args):
         print(f"  ffprobe: {status['ffprobe_path']}")
         if status["version"]:
             print(f"  Version: {status['version']}")
+        caps = get_capabilities()
+        print(f"  Encoders: {len(caps.encoders)}  |  Filters: {len(caps.filters)}"
+              f"  |  Pixel formats: {len(caps.pix_fmts)}")
+        if caps.hwaccels:
+            print(f"  Hardware acceleration: {', '.join(caps.hwaccels)}")
     else:
         print("ffmpeg is NOT available.", file=sys.stderr)
         if status["ffmpeg_path"]:
@@ -403,6 +507,10 @@ def _build_parser():
         "--version", action="version",
         version=f"%(prog)s {__version__}",
     )
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Run the command under 'python -X importtime' and report import cost",
+    )
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
@@ -420,6 +528,28 @@ def _build_parser():
     p_create.add_argument("--codec", default="libx264", help="Video codec (default: libx264)")
     p_create.add_argument("--pattern", default=None, help="Filename glob pattern for image sequence (e.g. 'frame_*.png')")
 
+    # -- encode-array --------------------------------------------------------
+    p_array = subparsers.add_parser(
+        "encode-array", help="Create a video straight from a .npy/.npz frame array",
+    )
+    p_array.add_argument("-i", "--input", required=True,
+                         help="(N, H, W) or (N, H, W, 3) array in a .npy or .npz file")
+    p_array.add_argument("-o", "--output", required=True, help="Output video filename")
+    p_array.add_argument("--key", default=None, help="Array name inside a .npz file (default: first)")
+    p_array.add_argument("--fps", type=float, default=30, help="Frames per second (default: 30)")
+    p_array.add_argument("--codec", default="H264",
+                         help="Video codec: H264, VP9, MJPG, XVID or the ffmpeg "
+                              "encoder name (default: H264)")
+    p_array.add_argument("--quality", type=int, default=80, help="Quality 0-100 (default: 80)")
+    p_array.add_argument("--vmin", type=float, default=None, help="Value mapped to black")
+    p_array.add_argument("--vmax", type=float, default=None, help="Value mapped to white")
+    p_array.add_argument("--normalize", default=None, choices=["global", "frame", "none"],
+                         help="Scale values over the whole array, per frame, or not at all "
+                              "(default: global unless the array is uint8)")
+    p_array.add_argument("--colormap", default=None,
+                         help="Colour scalar frames with this map (e.g. viridis, magma, "
+                              "coolwarm; append _r to reverse)")
+
     # -- merge ---------------------------------------------------------------
     p_merge = subparsers.add_parser("merge", help="Merge multiple videos into one")
     p_merge.add_argument("inputs", nargs="+", help="Input video files to merge")
@@ -442,6 +572,8 @@ def _build_parser():
     p_trim.add_argument("-o", "--output", required=True, help="Output file")
     p_trim.add_argument("-s", "--start", type=float, required=True, help="Start time in seconds")
     p_trim.add_argument("-e", "--end", type=float, required=True, help="End time in seconds")
+    p_trim.add_argument("--fast", action="store_true",
+                        help="Stream-copy only (start snaps to the previous keyframe)")
 
     # -- info ----------------------------------------------------------------
     p_info = subparsers.add_parser("info", help="Display information about a video file")
@@ -457,9 +589,15 @@ def _build_parser():
     # -- extract-frames ------------------------------------------------------
     p_frames = subparsers.add_parser("extract-frames", help="Extract frames from a video")
     p_frames.add_argument("-i", "--input", required=True, help="Input video file")
-    p_frames.add_argument("-d", "--output-dir", required=True, help="Output directory for frames")
+    p_frames.add_argument("-d", "--output-dir", default=None, help="Output directory for frames")
     p_frames.add_argument("--fps", type=float, default=None, help="Extraction FPS (default: all frames)")
     p_frames.add_argument("--format", default="png", help="Output image format (default: png)")
+    p_frames.add_argument("--npy", default=None, metavar="FILE",
+                          help="Write all frames to one memory-mappable .npy stack instead of images")
+    p_frames.add_argument("--start", type=float, default=None, help="Start time in seconds (--npy)")
+    p_frames.add_argument("--end", type=float, default=None, help="End time in seconds (--npy)")
+    p_frames.add_argument("--width", type=int, default=None, help="Scale frames to this width (--npy)")
+    p_frames.add_argument("--gray", action="store_true", help="Store single-channel frames (--npy)")
 
     # -- gif -----------------------------------------------------------------
     p_gif = subparsers.add_parser("gif", help="Create an animated GIF from a video")
@@ -473,6 +611,39 @@ def _build_parser():
     p_speed.add_argument("-i", "--input", required=True, help="Input video file")
     p_speed.add_argument("-o", "--output", required=True, help="Output file")
     p_speed.add_argument("-f", "--factor", type=float, required=True, help="Speed factor (e.g. 2.0 = double speed)")
+    p_speed.add_argument("--segments", type=int, default=None,
+                         help="Encode in N keyframe-aligned chunks in parallel")
+
+    # -- batch ---------------------------------------------------------------
+    p_batch = subparsers.add_parser(
+        "batch", help="Run many operations from a JSON/YAML/CSV manifest in parallel",
+    )
+    p_batch.add_argument("manifest", help="Manifest file (.json, .yaml/.yml or .csv)")
+    p_batch.add_argument("-j", "--jobs", type=int, default=None,
+                         help="Operations to run at once (default: based on CPU count)")
+    p_batch.add_argument("--state", default=None,
+                         help="State file recording finished jobs "
+                              "(default: <manifest>.state.jsonl)")
+    p_batch.add_argument("--resume", action="store_true",
+                         help="Skip jobs the state file records as done")
+    p_batch.add_argument("--fail-fast", action="store_true",
+                         help="Cancel remaining jobs after the first failure")
+    p_batch.add_argument("--overwrite", action="store_true",
+                         help="Replace existing output files")
+
+    # -- stats ---------------------------------------------------------------
+    p_stats = subparsers.add_parser(
+        "stats", help="Dataset-wide min/max/percentiles of a frame array or image sequence",
+    )
+    p_stats.add_argument("-i", "--input", required=True,
+                         help=".npy/.npz frame array, image directory, or text file listing images")
+    p_stats.add_argument("--key", default=None, help="Array name inside a .npz file (default: first)")
+    p_stats.add_argument("--pattern", default=None, help="Filename glob pattern for image sequences")
+    p_stats.add_argument("-p", "--percentiles", default="0.5,1,50,99,99.5",
+                         help="Comma-separated percentiles to report (default: 0.5,1,50,99,99.5)")
+    p_stats.add_argument("-j", "--jobs", type=int, default=None,
+                         help="Worker threads (default: based on CPU count)")
+    p_stats.add_argument("--json", action="store_true", help="Print the result as JSON")
 
     # -- check-ffmpeg --------------------------------------------------------
     subparsers.add_parser("check-ffmpeg", help="Check ffmpeg installation status")
@@ -480,6 +651,50 @@ def _build_parser():
     return parser
 
 
+# ---------------------------------------------------------------------------
+# Startup profiling
+# ---------------------------------------------------------------------------
+
+# Modules too slow to import for commands that only drive ffmpeg.
+_HEAVY_MODULES = ("cv2", "numpy", "PIL", "tkinter")
+
+
+def _profile_startup(argv):
+    """Re-run the CLI with *argv* under ``python -X importtime`` and print a
+    summary of where import time went.  Returns the command's exit code."""
+    if getattr(sys, "frozen", False) or "__compiled__" in globals():
+        return _error("--profile-startup needs a Python interpreter "
+                      "(not available in compiled builds).")
+
+    cmd = [sys.executable, "-X", "importtime", "-m", "simmovimaker"] + list(argv)
+    result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
+
+    imports = []        # (cumulative us, depth, module)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            sys.stderr.write(line + "\n")
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue    # the header row
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((int(fields[1]), depth, name.strip()))
+
+    total = sum(us for us, depth, _ in imports if depth == 0)
+    loaded = {name.split(".")[0] for _, _, name in imports}
+    heavy = [m for m in _HEAVY_MODULES if m in loaded]
+
+    print("\nStartup profile (python -X importtime):", file=sys.stderr)
+    print(f"  Total import time: {total / 1000:.1f} ms", file=sys.stderr)
+    print("  Slowest imports (cumulative):", file=sys.stderr)
+    for us, _, name in sorted(imports, reverse=True)[:10]:
+        print(f"    {us / 1000:8.1f} ms  {name}", file=sys.stderr)
+    print(f"  Heavy modules loaded: {', '.join(heavy) if heavy else 'none'}",
+          file=sys.stderr)
+    return result.returncode
+
+
 # ---------------------------------------------------------------------------
 # Public entry point
 # ---------------------------------------------------------------------------
@@ -492,8 +707,13 @@ def cli_mode():
     parser = _build_parser()
     args = parser.parse_args()
 
+    if args.profile_startup:
+        argv = [a for a in sys.argv[1:] if a != "--profile-startup"]
+        return _profile_startup(argv or ["--help"])
+
     dispatch = {
         "create": _cmd_create,
+        "encode-array": _cmd_encode_array,
         "merge": _cmd_merge,
         "split": _cmd_split,
         "mute": _cmd_mute,
@@ -503,6 +723,8 @@ def cli_mode():
         "extract-frames": _cmd_extract_frames,
         "gif": _cmd_gif,
         "speed": _cmd_speed,
+        "batch": _cmd_batch,
+        "stats": _cmd_stats,
         "check-ffmpeg": _cmd_check_ffmpeg,
     }
 
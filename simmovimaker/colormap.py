@@ -0,0 +1,265 @@
+"""
+colormap.py - Lookup-table colormaps for scalar-field frames.
+
+Simulation frames are usually scalar fields (density, temperature, ...)
+stored as 8- or 16-bit integers or floats.  A :class:`Colormap` folds the
+normalisation range and the colour map into one lookup table, so
+colouring a frame is a single ``np.take`` instead of per-pixel arithmetic:
+
+* uint8 frames index a 256-entry table directly;
+* uint16 / int16 frames index a 65536-entry table directly;
+* other dtypes (float, wider ints) are quantised to 16 bits against
+  ``vmin`` / ``vmax`` and then looked up in a 65536-entry table.
+
+The built-in maps are sampled from matplotlib's definitions, so
+matplotlib is not needed; when it is installed any of its colormap names
+can be used as well.  Append ``_r`` to a name for the reversed map.
+"""
+
+import collections
+import functools
+import threading
+
+import numpy as np
+
+
+def _even(*colors):
+    """Anchor list with *colors* spread evenly over 0..1."""
+    step = 1.0 / (len(colors) - 1)
+    return tuple((i * step, c) for i, c in enumerate(colors))
+
+
+# Built-in maps as (position, (r, g, b)) anchors, interpolated linearly.
+COLORMAPS = {
+    "gray": _even((0, 0, 0), (255, 255, 255)),
+    "viridis": _even(
+        (68, 1, 84), (72, 24, 106), (71, 45, 123), (66, 64, 134),
+        (59, 82, 139), (51, 99, 141), (44, 114, 142), (38, 130, 142),
+        (33, 145, 140), (31, 159, 136), (39, 173, 129), (61, 188, 116),
+        (92, 200, 99), (129, 211, 77), (170, 220, 50), (213, 226, 26),
+        (253, 231, 37)),
+    "magma": _even(
+        (0, 0, 4), (10, 8, 34), (29, 17, 71), (54, 16, 107),
+        (81, 18, 124), (106, 28, 129), (131, 38, 129), (156, 46, 127),
+        (183, 55, 121), (207, 64, 112), (229, 80, 100), (244, 105, 92),
+        (251, 135, 97), (254, 165, 113), (254, 194, 135), (253, 224, 161),
+        (252, 253, 191)),
+    "inferno": _even(
+        (0, 0, 4), (11, 7, 36), (33, 12, 74), (61, 9, 101),
+        (87, 16, 110), (113, 25, 110), (138, 34, 106), (163, 44, 97),
+        (188, 55, 84), (208, 69, 69), (227, 89, 51), (241, 113, 31),
+        (249, 140, 10), (252, 170, 15), (249, 201, 50), (242, 232, 101),
+        (252, 255, 164)),
+    "plasma": _even(
+        (13, 8, 135), (49, 5, 151), (76, 2, 161), (102, 0, 167),
+        (126, 3, 168), (149, 17, 161), (170, 35, 149), (188, 53, 135),
+        (204, 71, 120), (217, 88, 106), (229, 107, 93), (240, 127, 79),
+        (248, 148, 65), (253, 171, 51), (253, 195, 40), (249, 221, 37),
+        (240, 249, 33)),
+    "cividis": _even(
+        (0, 34, 78), (0, 46, 106), (26, 56, 111), (50, 67, 109),
+        (67, 78, 108), (83, 90, 109), (97, 101, 111), (111, 112, 115),
+        (125, 124, 120), (139, 135, 120), (154, 147, 118), (170, 160, 115),
+        (187, 173, 109), (204, 186, 100), (221, 200, 88), (239, 215, 72),
+        (254, 232, 56)),
+    "turbo": _even(
+        (48, 18, 59), (64, 64, 162), (70, 107, 227), (66, 148, 255),
+        (40, 188, 235), (24, 221, 194), (50, 242, 152), (109, 254, 98),
+        (164, 252, 60), (203, 237, 52), (236, 209, 58), (253, 174, 53),
+        (251, 129, 34), (236, 83, 15), (210, 49, 5), (172, 23, 1),
+        (122, 4, 3)),
+    "coolwarm": _even(
+        (59, 76, 192), (77, 104, 215), (98, 130, 234), (119, 154, 247),
+        (141, 176, 254), (163, 194, 255), (184, 208, 249), (204, 217, 238),
+        (221, 221, 221), (236, 211, 197), (245, 196, 173), (247, 177, 148),
+        (244, 154, 123), (236, 127, 99), (222, 96, 77), (203, 62, 56),
+        (180, 4, 38)),
+    "RdBu": _even(
+        (103, 0, 31), (178, 24, 43), (214, 96, 77), (244, 165, 130),
+        (253, 219, 199), (247, 247, 247), (209, 229, 240), (146, 197, 222),
+        (67, 147, 195), (33, 102, 172), (5, 48, 97)),
+    "hot": (
+        (0.0, (11, 0, 0)), (0.365079, (255, 0, 0)),
+        (0.746032, (255, 255, 0)), (1.0, (255, 255, 255))),
+    "jet": (
+        (0.0, (0, 0, 128)), (0.11, (0, 0, 255)), (0.125, (0, 0, 255)),
+        (0.34, (0, 219, 255)), (0.35, (0, 229, 247)), (0.375, (21, 255, 226)),
+        (0.64, (239, 255, 8)), (0.65, (247, 246, 0)), (0.66, (255, 236, 0)),
+        (0.89, (255, 19, 0)), (0.91, (232, 0, 0)), (1.0, (128, 0, 0))),
+}
+
+# Lookup tables a Colormap keeps per (size, bounds, channel order).
+_MAX_TABLES = 8
+
+
+def colormap_names():
+    """Return the names of the built-in colormaps."""
+    return sorted(COLORMAPS, key=str.lower)
+
+
+def _sample(name, positions):
+    """Return the ``(len(positions), 3)`` uint8 RGB colours of map *name*
+    at *positions* in 0..1."""
+    positions = np.asarray(positions, dtype=np.float64)
+    if name.endswith("_r"):
+        return _sample(name[:-2], 1.0 - positions)
+    anchors = COLORMAPS.get(name)
+    if anchors is None:
+        try:
+            import matplotlib
+        except ImportError:
+            raise ValueError(f"Unknown colormap {name!r} (built-in: "
+                             f"{', '.join(colormap_names())}; install "
+                             "matplotlib for more).")
+        try:
+            cmap = matplotlib.colormaps[name]
+        except KeyError:
+            raise ValueError(f"Unknown colormap {name!r}")
+        rgba = cmap(positions)
+        return np.round(rgba[:, :3] * 255.0).astype(np.uint8)
+    xp = [a[0] for a in anchors]
+    rgb = np.empty((len(positions), 3), dtype=np.uint8)
+    for ch in range(3):
+        fp = [a[1][ch] for a in anchors]
+        rgb[:, ch] = np.round(np.interp(positions, xp, fp))
+    return rgb
+
+
+def _finite_range(frame):
+    """Return ``(min, max)`` of *frame*, ignoring NaN and infinities."""
+    if np.issubdtype(frame.dtype, np.floating):
+        frame = frame[np.isfinite(frame)]
+        if frame.size == 0:
+            return 0.0, 0.0
+    return float(frame.min()), float(frame.max())
+
+
+def to_scalar(frame):
+    """Return *frame* as a 2-D array, converting colour frames (channels
+    last, BGR order) to luminance."""
+    frame = np.asarray(frame)
+    if frame.ndim == 3 and frame.shape[2] == 1:
+        return frame[:, :, 0]
+    if frame.ndim == 3:
+        import cv2
+        code = cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        if frame.dtype not in (np.uint8, np.uint16, np.float32):
+            frame = frame.astype(np.float32)
+        return cv2.cvtColor(frame, code)
+    if frame.ndim != 2:
+        raise ValueError(f"Expected a 2-D scalar frame, got shape {frame.shape}.")
+    return frame
+
+
+class Colormap:
+    """Colour scalar frames through a precomputed lookup table.
+
+    Parameters
+    ----------
+    name : str
+        Built-in map (see :func:`colormap_names`) or, with matplotlib
+        installed, any matplotlib colormap name.
+    vmin, vmax : float, optional
+        Values mapped to the two ends of the map.  A missing bound is
+        taken from each frame (uint8 frames default to 0..255); use
+        :meth:`fit` to fix them for a whole sequence.
+
+    Usage::
+
+        cmap = Colormap("viridis").fit(stack, percentiles=(1, 99))
+        rgb = cmap.apply(stack[0])
+    """
+
+    def __init__(self, name="viridis", vmin=None, vmax=None):
+        _sample(name, [0.0])        # fail early on unknown names
+        self.name = name
+        self.vmin = None if vmin is None else float(vmin)
+        self.vmax = None if vmax is None else float(vmax)
+        self._tables = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Colormap({self.name!r}, vmin={self.vmin}, vmax={self.vmax})"
+
+    def fit(self, frames, percentiles=(1.0, 99.0), **stats_options):
+        """Set ``vmin`` / ``vmax`` to *percentiles* of the values in
+        *frames* (an ``(N, H, W)`` array or any sequence of frames).
+
+        Runs one streaming statistics pass (see
+        :func:`simmovimaker.stats.compute_stats`, which *stats_options*
+        are passed to), so a long memory-mapped stack is never loaded
+        whole.  Returns the colormap.
+        """
+        from .stats import compute_stats
+        stats = compute_stats(frames, transform=to_scalar, **stats_options)
+        if stats is None or not stats.count:
+            raise ValueError("Frames contain no finite values.")
+        self.vmin, self.vmax = (float(v) for v in stats.percentile(percentiles))
+        return self
+
+    def apply(self, frame, bgr=False):
+        """Return the ``(H, W, 3)`` uint8 colour image of the scalar *frame*
+        (RGB, or BGR when *bgr* is true)."""
+        frame = to_scalar(frame)
+        if frame.dtype == np.uint8:
+            vmin = 0.0 if self.vmin is None else self.vmin
+            vmax = 255.0 if self.vmax is None else self.vmax
+            return np.take(self._table(256, 0, vmin, vmax, bgr), frame, axis=0)
+        vmin, vmax = self._bounds(frame)
+        if frame.dtype == np.uint16:
+            index = frame
+            table = self._table(65536, 0, vmin, vmax, bgr)
+        elif frame.dtype == np.int16:
+            # Flipping the sign bit maps -32768..32767 onto 0..65535.
+            index = frame.view(np.uint16) ^ np.uint16(0x8000)
+            table = self._table(65536, 32768, vmin, vmax, bgr)
+        else:
+            scale = 65535.0 / (vmax - vmin) if vmax > vmin else 0.0
+            work = frame.astype(np.float32)
+            work -= vmin
+            work *= scale
+            np.nan_to_num(work, copy=False, nan=0.0)
+            np.clip(work, 0.0, 65535.0, out=work)
+            index = work.astype(np.uint16)
+            table = self._table(65536, 0, 0.0, 65535.0, bgr)
+        return np.take(table, index, axis=0)
+
+    # -- internal --
+
+    def _bounds(self, frame):
+        if self.vmin is not None and self.vmax is not None:
+            return self.vmin, self.vmax
+        lo, hi = _finite_range(frame)
+        return (lo if self.vmin is None else self.vmin,
+                hi if self.vmax is None else self.vmax)
+
+    def _table(self, size, offset, vmin, vmax, bgr):
+        """Return the *size*-entry table mapping index ``i`` (value
+        ``i - offset``) to its colour for the range *vmin*..*vmax*."""
+        key = (size, offset, vmin, vmax, bgr)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+        values = np.arange(size, dtype=np.float64) - offset
+        if vmax > vmin:
+            positions = np.clip((values - vmin) / (vmax - vmin), 0.0, 1.0)
+        else:
+            positions = np.zeros(size)
+        table = _sample(self.name, positions)
+        if bgr:
+            table = np.ascontiguousarray(table[:, ::-1])
+        table.setflags(write=False)
+        with self._lock:
+            self._tables[key] = table
+            while len(self._tables) > _MAX_TABLES:
+                self._tables.popitem(last=False)
+        return table
+
+
+@functools.lru_cache(maxsize=16)
+def get_colormap(name="viridis", vmin=None, vmax=None):
+    """Return a shared :class:`Colormap`, so every frame rendered with the
+    same settings reuses the same lookup tables."""
+    return Colormap(name, vmin, vmax)
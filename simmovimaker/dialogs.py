@@ -168,11 +168,13 @@ class ProgressDialog(tk.Toplevel):
         dlg.destroy()
     """
 
-    def __init__(self, parent, title="Progress", maximum=100, cancelable=True):
+    def __init__(self, parent, title="Progress", maximum=100, cancelable=True,
+                 on_cancel=None):
         super().__init__(parent)
         self.transient(parent)
         self.title(title)
         self._cancelled = False
+        self._on_cancel_callback = on_cancel
         self._parent = parent
 
         _set_dialog_icon(self)
@@ -221,6 +223,8 @@ class ProgressDialog(tk.Toplevel):
 
     def _on_cancel(self):
         self._cancelled = True
+        if self._on_cancel_callback is not None:
+            self._on_cancel_callback()
 
 
 # ---------------------------------------------------------------------------
@@ -655,3 +659,93 @@ class MergeOptionsDialog(BaseDialog):
             "method": self._method_var.get(),
             "format": self._format_var.get(),
         }
+
+
+# ---------------------------------------------------------------------------
+# 11. JobPanel
+# ---------------------------------------------------------------------------
+
+class JobPanel(tk.Toplevel):
+    """Non-modal window listing queued, running and finished jobs.
+
+    Call :meth:`refresh` (on the Tk thread) whenever a job changes; the
+    panel reads state from the :class:`~simmovimaker.jobs.JobManager`.
+    """
+
+    def __init__(self, parent, manager):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Jobs")
+        self.geometry("520x300")
+        self._manager = manager
+
+        _set_dialog_icon(self)
+
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ("title", "state", "progress")
+        self._tree = ttk.Treeview(frame, columns=columns, show="headings",
+                                  selectmode="extended")
+        self._tree.heading("title", text="Job")
+        self._tree.heading("state", text="State")
+        self._tree.heading("progress", text="Progress")
+        self._tree.column("title", width=280)
+        self._tree.column("state", width=90, anchor=tk.CENTER)
+        self._tree.column("progress", width=80, anchor=tk.E)
+        self._tree.pack(fill=tk.BOTH, expand=True)
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill=tk.X, pady=(8, 0))
+        ttk.Label(btn_frame, text="Max concurrent:").pack(side=tk.LEFT)
+        self._limit_var = tk.IntVar(value=manager.max_concurrent)
+        ttk.Spinbox(btn_frame, from_=1, to=32, width=4,
+                    textvariable=self._limit_var,
+                    command=self._on_limit_change).pack(side=tk.LEFT, padx=(4, 0))
+        ttk.Button(btn_frame, text="Clear Finished",
+                   command=self._on_clear).pack(side=tk.RIGHT)
+        ttk.Button(btn_frame, text="Cancel All",
+                   command=self._on_cancel_all).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(btn_frame, text="Cancel Selected",
+                   command=self._on_cancel_selected).pack(side=tk.RIGHT)
+
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the job list from the manager's current state."""
+        if not self.winfo_exists():
+            return
+        selected = set(self._tree.selection())
+        self._tree.delete(*self._tree.get_children())
+        for job in self._manager.jobs:
+            iid = str(job.id)
+            state = job.state
+            if job.cancelled and not job.finished:
+                state = "cancelling"
+            self._tree.insert("", tk.END, iid=iid, values=(
+                job.title, state, f"{job.progress:.0f}%"))
+            if iid in selected:
+                self._tree.selection_add(iid)
+
+    def _selected_jobs(self):
+        ids = {int(iid) for iid in self._tree.selection()}
+        return [job for job in self._manager.jobs if job.id in ids]
+
+    def _on_cancel_selected(self):
+        for job in self._selected_jobs():
+            self._manager.cancel(job)
+        self.refresh()
+
+    def _on_cancel_all(self):
+        self._manager.cancel_all()
+        self.refresh()
+
+    def _on_clear(self):
+        self._manager.clear_finished()
+        self.refresh()
+
+    def _on_limit_change(self):
+        try:
+            self._manager.set_max_concurrent(self._limit_var.get())
+        except (tk.TclError, ValueError):
+            pass
@@ -0,0 +1,154 @@
+"""
+edits.py - Non-destructive per-frame edit lists.
+
+Image entries in ``media_files`` may carry an ``"ops"`` list of filter
+specs (see :mod:`simmovimaker.filters`).  Source files are never modified:
+the ops are applied lazily whenever a frame is previewed, thumbnailed or
+rendered, and saved with the project so they can be undone at any time.
+:func:`bake_entries` writes the edited result back to disk for users who
+explicitly want destructive edits.
+"""
+
+import json
+
+from .filters import apply_specs, bind_index, process_jobs, read_image, reads_raw
+from .frame_cache import file_key, shared_cache
+
+
+def entry_ops(entry):
+    """Return the edit list of a media entry (empty if it has none)."""
+    return entry.get("ops") or []
+
+
+def has_edits(entry):
+    return bool(entry.get("ops"))
+
+
+def add_ops(entry, specs, index=0):
+    """Append filter *specs* to *entry*'s edit list.
+
+    *index* is the entry's position in the batch the filter was applied
+    to; index-dependent filters (timestamps) are bound to it.
+    """
+    ops = entry.setdefault("ops", [])
+    for spec in specs:
+        ops.append(bind_index(spec, index))
+
+
+def set_raw_op(entry, spec, index=0):
+    """Make the raw-input *spec* (see :data:`~simmovimaker.filters.RAW_INPUT_OPS`)
+    the first edit of *entry*.
+
+    Such ops see the source at its native depth only when they run first,
+    and their ranges are measured on the unedited source, so they go in
+    front of any other edits.  A raw-input op already in front is replaced.
+    Returns the replaced spec, or ``None``.
+    """
+    ops = entry.setdefault("ops", [])
+    replaced = ops.pop(0) if reads_raw(ops) else None
+    ops.insert(0, bind_index(spec, index))
+    return replaced
+
+
+def undo_last(entry):
+    """Remove the most recent edit from *entry*.  Returns True if one was
+    removed."""
+    ops = entry.get("ops")
+    if not ops:
+        return False
+    ops.pop()
+    if not ops:
+        del entry["ops"]
+    return True
+
+
+def clear_ops(entry):
+    entry.pop("ops", None)
+
+
+def ops_key(ops):
+    """Return a hashable key identifying the edit list *ops*."""
+    return json.dumps(ops, sort_keys=True)
+
+
+def read_source(entry, raw=False):
+    """Return the unedited BGR frame of an image or stack *entry* (``None``
+    if it cannot be read).  With *raw* the frame keeps its native dtype and
+    channel count, for edit lists starting with a colormap."""
+    if entry.get("type") == "stack":
+        from .frame_stack import read_frame
+        try:
+            return read_frame(entry["path"], entry["frame"], raw=raw)
+        except (OSError, ValueError, IndexError):
+            return None
+    return read_image(entry["path"], raw=raw)
+
+
+class SourceFrames:
+    """Sequence of the unedited frames of *entries* at their native depth
+    (see :func:`read_source`), read only when indexed, for statistics over
+    a whole selection."""
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        img = read_source(self.entries[index], raw=True)
+        if img is None:
+            raise ValueError(f"Cannot read {self.entries[index]['path']}")
+        return img
+
+
+def _render(entry, ops):
+    img = read_source(entry, raw=reads_raw(ops))
+    if img is None:
+        return None
+    out = apply_specs(img, ops)
+    out.setflags(write=False)   # shared between callers via the cache
+    return out
+
+
+def load_frame(entry, cache=True):
+    """Return the BGR frame for an image or stack *entry* with its edits
+    applied.
+
+    Rendered results are kept in the shared frame cache (see
+    :mod:`simmovimaker.frame_cache`) keyed by path, modification time,
+    stack frame and edit list, so stepping back and forth in the preview
+    does not re-run the filters.  Pass ``cache=False`` for one-shot
+    streaming renders.  Returns ``None`` if the file cannot be read.
+    """
+    ops = entry_ops(entry)
+    if not ops:
+        return read_source(entry)
+    if not cache:
+        img = read_source(entry, raw=reads_raw(ops))
+        return None if img is None else apply_specs(img, ops)
+    key = (file_key(entry["path"]), "render", entry.get("frame"), ops_key(ops))
+    return shared_cache().get_or_load(key, lambda: _render(entry, ops))
+
+
+def bake_entries(entries, **kwargs):
+    """Write each entry's edits into its source file and clear its edit
+    list.  Keyword arguments are forwarded to
+    :func:`simmovimaker.filters.process_jobs`.  Returns the number of files
+    written.  Frames of stacks cannot be written back and are skipped.
+
+    Only entries whose file was actually written lose their edits; those
+    skipped by a cancel, unreadable or failing keep them, also when
+    :func:`~simmovimaker.filters.process_jobs` raises."""
+    entries = [e for e in entries if has_edits(e) and e.get("type") != "stack"]
+    jobs = [(e["path"], entry_ops(e), 0) for e in entries]
+    written_paths = []
+    try:
+        return process_jobs(jobs, written_paths=written_paths, **kwargs)
+    finally:
+        written = set(written_paths)
+        cache = shared_cache()
+        for entry in entries:
+            if entry["path"] in written:
+                clear_ops(entry)
+                cache.invalidate(entry["path"])
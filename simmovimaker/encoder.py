@@ -0,0 +1,306 @@
+"""
+encoder.py - Streaming frame encoders for image-sequence rendering.
+
+Frames are NumPy BGR arrays as returned by ``cv2.imread`` (or RGB /
+greyscale arrays when the writer is opened with that *pix_fmt*).  The
+preferred backend pipes them as raw bytes into an ``ffmpeg -f rawvideo``
+subprocess so the actual encoding runs in ffmpeg's multithreaded encoders
+(libx264, libvpx-vp9, ...).  When ffmpeg is not installed the OpenCV
+``VideoWriter`` is used instead so image-to-video creation keeps working.
+"""
+
+import collections
+import queue
+import subprocess
+import threading
+
+from .ffmpeg_utils import (
+    find_ffmpeg, get_capabilities, get_ffmpeg_help_text, FFmpegNotFoundError,
+)
+
+
+# Output Settings codec name -> ffmpeg encoder, output pixel format and the
+# (worst, best) range of the encoder's quality scale.  Quality 0..100 from
+# the Output Settings dialog is mapped linearly onto that range.
+_FFMPEG_CODECS = {
+    "H264": ("libx264", "yuv420p", "-crf", (40, 12)),
+    "VP9": ("libvpx-vp9", "yuv420p", "-crf", (50, 15)),
+    "MJPG": ("mjpeg", "yuvj420p", "-q:v", (31, 2)),
+    "XVID": ("mpeg4", "yuv420p", "-q:v", (31, 2)),
+}
+
+# Raw pixel formats writers accept, and their channel counts.
+INPUT_PIX_FMTS = {"bgr24": 3, "rgb24": 3, "gray": 1}
+
+# Number of frames buffered between the caller and the ffmpeg stdin pipe.
+_DEFAULT_QUEUE_SIZE = 8
+
+# Lines of ffmpeg stderr kept for error reporting.
+_STDERR_TAIL = 50
+
+_SENTINEL = object()
+
+
+def resolve_codec(codec):
+    """Return the Output Settings name (``"H264"``, ``"VP9"``, ``"MJPG"``,
+    ``"XVID"``) of *codec*, which may also be given as the ffmpeg encoder
+    name (``"libx264"``, ``"libvpx-vp9"``, ``"mjpeg"``, ``"mpeg4"``).
+
+    Raises ``ValueError`` for anything else.
+    """
+    name = str(codec)
+    if name.upper() in _FFMPEG_CODECS:
+        return name.upper()
+    for key, (encoder, _, _, _) in _FFMPEG_CODECS.items():
+        if name.lower() == encoder:
+            return key
+    raise ValueError(
+        f"Unknown codec {codec!r} (expected one of "
+        f"{', '.join(_FFMPEG_CODECS)} or the ffmpeg encoder names "
+        f"{', '.join(v[0] for v in _FFMPEG_CODECS.values())})")
+
+
+def _quality_args(codec, quality):
+    """Return the ffmpeg arguments selecting encoder and quality for *codec*."""
+    encoder, pix_fmt, flag, (worst, best) = _FFMPEG_CODECS[resolve_codec(codec)]
+    q = max(0, min(100, int(quality)))
+    value = round(worst + (best - worst) * q / 100.0)
+    args = ["-c:v", encoder, flag, str(value), "-pix_fmt", pix_fmt]
+    if encoder == "libx264":
+        args += ["-preset", "medium"]
+    elif encoder == "libvpx-vp9":
+        # Constant-quality mode for VP9 requires an explicit zero bitrate.
+        args += ["-b:v", "0", "-row-mt", "1"]
+    return args
+
+
+def _check_pix_fmt(pix_fmt):
+    if pix_fmt not in INPUT_PIX_FMTS:
+        raise ValueError(f"Unsupported input pixel format {pix_fmt!r} "
+                         f"(expected one of {', '.join(INPUT_PIX_FMTS)})")
+
+
+class FFmpegFrameWriter:
+    """Encode frames by streaming them into an ffmpeg subprocess.
+
+    Frames handed to :meth:`write` go through a bounded queue to a feeder
+    thread that writes them to ffmpeg's stdin, so reading the next image
+    overlaps with pushing the previous one down the pipe while memory use
+    stays capped at *queue_size* frames.  Frames whose size differs from
+    the first one are resized to match.  *pix_fmt* is the layout of the
+    frames passed in: ``"bgr24"`` (default), ``"rgb24"`` or ``"gray"``
+    for ``(H, W)`` arrays, so callers never convert colour spaces just to
+    satisfy the writer.
+
+    Usage::
+
+        with FFmpegFrameWriter("out.mp4", 1920, 1080, fps=30) as writer:
+            for frame in frames:
+                writer.write(frame)
+    """
+
+    def __init__(self, output_file, width, height, fps, codec="H264",
+                 quality=80, queue_size=_DEFAULT_QUEUE_SIZE, pix_fmt="bgr24"):
+        _check_pix_fmt(pix_fmt)
+        ffmpeg_path = find_ffmpeg()
+        if ffmpeg_path is None:
+            raise FFmpegNotFoundError(
+                "ffmpeg was not found on this system.\n\n" + get_ffmpeg_help_text()
+            )
+
+        self.output_file = output_file
+        self.width = int(width)
+        self.height = int(height)
+        self.pix_fmt = pix_fmt
+        self.frames_written = 0
+
+        cmd = [
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", pix_fmt,
+            "-s", f"{self.width}x{self.height}",
+            "-r", str(fps),
+            "-i", "-",
+            # yuv420p needs even dimensions; pad odd frames by one pixel.
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        ] + _quality_args(codec, quality) + [output_file]
+
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        self._stderr_tail = collections.deque(maxlen=_STDERR_TAIL)
+        self._error = None
+        self._closed = False
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+
+        self._stderr_thread = threading.Thread(target=self._drain_stderr,
+                                               daemon=True)
+        self._stderr_thread.start()
+        self._feeder_thread = threading.Thread(target=self._feed, daemon=True)
+        self._feeder_thread.start()
+
+    # -- context manager --
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    # -- public API --
+
+    def write(self, frame):
+        """Queue one frame for encoding (blocks while the queue is full)."""
+        if self._error is not None:
+            raise RuntimeError(self._failure_message())
+        if frame.ndim == 2 and self.pix_fmt != "gray":
+            import cv2
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        if frame.shape[0] != self.height or frame.shape[1] != self.width:
+            import cv2
+            frame = cv2.resize(frame, (self.width, self.height),
+                               interpolation=cv2.INTER_AREA)
+        self._queue.put(frame)
+        self.frames_written += 1
+
+    def close(self):
+        """Flush pending frames, finalise the file and wait for ffmpeg.
+
+        Raises ``RuntimeError`` with the tail of ffmpeg's stderr if encoding
+        failed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_SENTINEL)
+        self._feeder_thread.join()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._process.wait()
+        self._stderr_thread.join(timeout=5)
+        if self._error is not None or self._process.returncode != 0:
+            raise RuntimeError(self._failure_message())
+
+    def abort(self):
+        """Kill ffmpeg immediately, discarding any queued frames."""
+        if self._closed:
+            return
+        self._closed = True
+        self._error = self._error or RuntimeError("aborted")
+        try:
+            self._process.kill()
+        except OSError:
+            pass
+        self._queue.put(_SENTINEL)
+        self._feeder_thread.join(timeout=5)
+        self._process.wait()
+
+    # -- internal --
+
+    def _feed(self):
+        """Feeder thread: move frames from the queue into ffmpeg's stdin."""
+        stdin = self._process.stdin
+        while True:
+            frame = self._queue.get()
+            if frame is _SENTINEL:
+                return
+            if self._error is not None:
+                continue  # keep draining so producers never block forever
+            try:
+                if not frame.flags["C_CONTIGUOUS"]:
+                    frame = frame.copy()
+                stdin.write(frame.data)
+            except (BrokenPipeError, OSError, ValueError) as exc:
+                self._error = exc
+
+    def _drain_stderr(self):
+        for raw in iter(self._process.stderr.readline, b""):
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line:
+                self._stderr_tail.append(line)
+
+    def _failure_message(self):
+        detail = "\n".join(self._stderr_tail) or str(self._error or "")
+        return f"ffmpeg encoding failed for {self.output_file}:\n{detail}"
+
+
+class CV2FrameWriter:
+    """Fallback writer using ``cv2.VideoWriter`` when ffmpeg is unavailable.
+
+    Exposes the same ``write`` / ``close`` / ``abort`` interface as
+    :class:`FFmpegFrameWriter`.  RGB and greyscale frames are converted
+    to BGR before they are written.
+    """
+
+    def __init__(self, output_file, width, height, fps, codec="H264",
+                 quality=80, pix_fmt="bgr24"):
+        import cv2
+
+        _check_pix_fmt(pix_fmt)
+        fmt = output_file.rsplit(".", 1)[-1].lower()
+        if fmt == "avi":
+            fourcc = cv2.VideoWriter_fourcc(*(
+                "MJPG" if resolve_codec(codec) == "MJPG" else "XVID"))
+        else:
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+
+        self.output_file = output_file
+        self.width = int(width)
+        self.height = int(height)
+        self.pix_fmt = pix_fmt
+        self.frames_written = 0
+        self._writer = cv2.VideoWriter(output_file, fourcc, fps,
+                                       (self.width, self.height))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def write(self, frame):
+        import cv2
+
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        elif self.pix_fmt == "rgb24":
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        if frame.shape[0] != self.height or frame.shape[1] != self.width:
+            frame = cv2.resize(frame, (self.width, self.height),
+                               interpolation=cv2.INTER_AREA)
+        self._writer.write(frame)
+        self.frames_written += 1
+
+    def close(self):
+        self._writer.release()
+
+    abort = close
+
+
+def open_frame_writer(output_file, width, height, fps, codec="H264",
+                      quality=80, queue_size=_DEFAULT_QUEUE_SIZE,
+                      pix_fmt="bgr24"):
+    """Return a frame writer for *output_file*.
+
+    Uses :class:`FFmpegFrameWriter` when ffmpeg is installed with the
+    encoder *codec* needs, and falls back to :class:`CV2FrameWriter`
+    otherwise.  *pix_fmt* is one of :data:`INPUT_PIX_FMTS`; *codec* is
+    anything :func:`resolve_codec` accepts.
+    """
+    encoder = _FFMPEG_CODECS[resolve_codec(codec)][0]
+    if find_ffmpeg() is not None and get_capabilities().has_encoder(encoder):
+        return FFmpegFrameWriter(output_file, width, height, fps, codec=codec,
+                                 quality=quality, queue_size=queue_size,
+                                 pix_fmt=pix_fmt)
+    return CV2FrameWriter(output_file, width, height, fps, codec=codec,
+                          quality=quality, pix_fmt=pix_fmt)
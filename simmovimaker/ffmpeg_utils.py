@@ -6,11 +6,13 @@ caching found paths, and running ffmpeg/ffprobe subprocesses
 with optional progress reporting.
 """
 
+import collections
+import contextlib
 import os
-import re
 import shutil
 import subprocess
-from pathlib import Path
+import threading
+import time
 
 
 class FFmpegNotFoundError(Exception):
@@ -18,6 +20,11 @@ class FFmpegNotFoundError(Exception):
     pass
 
 
+class FFmpegCancelledError(Exception):
+    """Raised when an ffmpeg run is cancelled (see :func:`track_processes`)."""
+    pass
+
+
 # Module-level cache for discovered paths. None means "not yet searched";
 # an empty string means "searched but not found".
 _ffmpeg_path_cache = None
@@ -51,14 +58,14 @@ def _search_executable(name: str) -> str | None:
     # 1. Try the system PATH via shutil.which (fastest, most portable).
     path = shutil.which(name)
     if path is not None:
-        return str(Path(path).resolve())
+        return os.path.realpath(path)
 
     # 2. Walk through well-known Windows directories.
     exe_name = f"{name}.exe"
     for directory in _COMMON_WINDOWS_DIRS:
         candidate = os.path.join(directory, exe_name)
         if os.path.isfile(candidate):
-            return str(Path(candidate).resolve())
+            return os.path.realpath(candidate)
 
     return None
 
@@ -101,23 +108,6 @@ def find_ffprobe() -> str | None:
     return _ffprobe_path_cache or None
 
 
-def _get_version(ffmpeg_path: str) -> str:
-    """Return the version string reported by ffmpeg, or an empty string on
-    failure."""
-    try:
-        result = subprocess.run(
-            [ffmpeg_path, "-version"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        first_line = result.stdout.strip().splitlines()[0]
-        # Typical first line: "ffmpeg version 6.0-full_build ..."
-        return first_line
-    except Exception:
-        return ""
-
-
 def check_ffmpeg() -> dict:
     """Check ffmpeg/ffprobe availability and return a status dictionary.
 
@@ -126,35 +116,313 @@ def check_ffmpeg() -> dict:
         ffmpeg_path -- str or None
         ffprobe_path -- str or None
         version     -- str, the first line of ``ffmpeg -version`` output
+
+    The answer comes from the capability registry (see
+    :func:`get_capabilities`), so ffmpeg is only run once per process.
     """
-    ffmpeg_path = find_ffmpeg()
-    ffprobe_path = find_ffprobe()
-    ffplay_path = find_ffplay()
-    version = ""
-    if ffmpeg_path:
-        version = _get_version(ffmpeg_path)
+    return get_capabilities().status()
 
-    return {
-        "available": bool(ffmpeg_path and ffprobe_path),
-        "ffmpeg_path": ffmpeg_path,
-        "ffprobe_path": ffprobe_path,
-        "ffplay_path": ffplay_path,
-        "version": version,
+
+# ---------------------------------------------------------------------------
+# Capability registry
+# ---------------------------------------------------------------------------
+
+# Seconds a resolved registry stays valid before it is re-read.
+CAPABILITIES_TTL = 600.0
+
+
+def _parse_version(output: str) -> str:
+    # Typical first line: "ffmpeg version 6.0-full_build ..."
+    lines = output.strip().splitlines()
+    return lines[0] if lines else ""
+
+
+def _parse_table(output: str) -> set[str]:
+    """Names from an ``-encoders`` / ``-pix_fmts`` style listing (a legend,
+    a ``-----`` rule, then one ``FLAGS name ...`` row per entry)."""
+    names = set()
+    in_table = False
+    for line in output.splitlines():
+        if not in_table:
+            in_table = line.strip().startswith("---")
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            names.add(parts[1])
+    return names
+
+
+def _parse_filters(output: str) -> set[str]:
+    """Filter names from ``ffmpeg -filters`` (rows like
+    ``T.C scale  V->V  Scale the input video size``)."""
+    names = set()
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and "->" in parts[2]:
+            names.add(parts[1])
+    return names
+
+
+def _parse_encoder_pix_fmts(output: str) -> set[str]:
+    """Pixel formats from ``ffmpeg -h encoder=NAME`` (the ``Supported pixel
+    formats:`` line)."""
+    for line in output.splitlines():
+        label, _, value = line.strip().partition(":")
+        if label == "Supported pixel formats":
+            return set(value.split())
+    return set()
+
+
+def _parse_hwaccels(output: str) -> list[str]:
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    return [line for line in lines if not line.endswith(":")]
+
+
+class FFmpegCapabilities:
+    """What the installed ffmpeg can do.
+
+    Executable paths are looked up when the registry is created.  The
+    version and the encoder, filter, hwaccel and pixel-format lists (also
+    those of single encoders) each cost one ffmpeg run and are read on
+    first use, then kept.  Obtain the shared instance with
+    :func:`get_capabilities`.
+    """
+
+    _QUERIES = {
+        "version": (["-version"], _parse_version),
+        "encoders": (["-encoders"], _parse_table),
+        "filters": (["-filters"], _parse_filters),
+        "hwaccels": (["-hwaccels"], _parse_hwaccels),
+        "pix_fmts": (["-pix_fmts"], _parse_table),
     }
 
+    def __init__(self):
+        self.ffmpeg_path = find_ffmpeg()
+        self.ffprobe_path = find_ffprobe()
+        self.ffplay_path = find_ffplay()
+        self.created = time.monotonic()
+        self._results = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return bool(self.ffmpeg_path and self.ffprobe_path)
+
+    @property
+    def version(self) -> str:
+        return self._query("version")
+
+    @property
+    def encoders(self) -> set[str]:
+        return self._query("encoders")
+
+    @property
+    def filters(self) -> set[str]:
+        return self._query("filters")
+
+    @property
+    def hwaccels(self) -> list[str]:
+        return self._query("hwaccels")
+
+    @property
+    def pix_fmts(self) -> set[str]:
+        return self._query("pix_fmts")
+
+    def encoder_pix_fmts(self, name: str) -> set[str]:
+        """Return the pixel formats encoder *name* accepts (empty if ffmpeg
+        does not list them or the query failed)."""
+        return self._query(f"encoder_pix_fmts:{name}",
+                           ["-h", f"encoder={name}"], _parse_encoder_pix_fmts)
+
+    def has_encoder(self, name: str) -> bool:
+        # An empty list means the query failed; assume the encoder exists
+        # and let ffmpeg report the error.
+        encoders = self.encoders
+        return name in encoders if encoders else bool(self.ffmpeg_path)
+
+    def has_filter(self, name: str) -> bool:
+        filters = self.filters
+        return name in filters if filters else bool(self.ffmpeg_path)
+
+    def first_encoder(self, *names: str) -> str | None:
+        """Return the first of *names* this ffmpeg can encode with."""
+        for name in names:
+            if self.has_encoder(name):
+                return name
+        return None
+
+    def status(self) -> dict:
+        """Return the :func:`check_ffmpeg` status dictionary."""
+        return {
+            "available": self.available,
+            "ffmpeg_path": self.ffmpeg_path,
+            "ffprobe_path": self.ffprobe_path,
+            "ffplay_path": self.ffplay_path,
+            "version": self.version,
+        }
+
+    def _query(self, name, args=None, parse=None):
+        with self._lock:
+            if name in self._results:
+                return self._results[name]
+            if args is None:
+                args, parse = self._QUERIES[name]
+            output = ""
+            if self.ffmpeg_path:
+                try:
+                    result = subprocess.run(
+                        [self.ffmpeg_path, "-hide_banner"] + args,
+                        capture_output=True,
+                        text=True,
+                        timeout=10,
+                    )
+                    output = result.stdout
+                except Exception:
+                    output = ""
+            value = parse(output)
+            self._results[name] = value
+            return value
+
+
+_capabilities = None
+_capabilities_lock = threading.Lock()
+
+
+def get_capabilities(refresh: bool = False) -> FFmpegCapabilities:
+    """Return the process-wide :class:`FFmpegCapabilities`.
+
+    The registry is resolved once and reused for :data:`CAPABILITIES_TTL`
+    seconds; pass *refresh* to re-resolve it immediately.
+    """
+    global _capabilities
+    with _capabilities_lock:
+        if (refresh or _capabilities is None
+                or time.monotonic() - _capabilities.created > CAPABILITIES_TTL):
+            _capabilities = FFmpegCapabilities()
+        return _capabilities
+
+
+def invalidate_capabilities() -> None:
+    """Forget the cached executable paths and capability registry (e.g.
+    after the user installed ffmpeg)."""
+    global _capabilities, _ffmpeg_path_cache, _ffprobe_path_cache
+    global _ffplay_path_cache
+    with _capabilities_lock:
+        _capabilities = None
+        _ffmpeg_path_cache = None
+        _ffprobe_path_cache = None
+        _ffplay_path_cache = None
+
+
+# Lines of ffmpeg stderr kept for error reporting when streaming progress.
+_STDERR_TAIL = 50
+
+# Per-thread (on_start, is_cancelled) hooks installed by track_processes().
+_tracking = threading.local()
+
+
+@contextlib.contextmanager
+def track_processes(on_start, is_cancelled=None):
+    """Report every ffmpeg process started by :func:`run_ffmpeg` in the
+    current thread.
+
+    *on_start(process)* receives each ``subprocess.Popen`` so the caller
+    can kill it.  If *is_cancelled()* returns True, further runs are
+    refused and a run whose process was killed raises
+    :class:`FFmpegCancelledError` instead of returning.
+    """
+    previous = getattr(_tracking, "hooks", None)
+    _tracking.hooks = (on_start, is_cancelled)
+    try:
+        yield
+    finally:
+        _tracking.hooks = previous
+
+
+def propagate_tracking(fn):
+    """Wrap *fn* so it runs under the calling thread's
+    :func:`track_processes` hooks when executed on another thread (e.g. a
+    worker pool running several ffmpeg processes for one job)."""
+    hooks = getattr(_tracking, "hooks", None)
+    if hooks is None:
+        return fn
+
+    def _wrapped(*args, **kwargs):
+        with track_processes(*hooks):
+            return fn(*args, **kwargs)
+    return _wrapped
+
+
+def _cancelled() -> bool:
+    hooks = getattr(_tracking, "hooks", None)
+    return bool(hooks and hooks[1] is not None and hooks[1]())
+
+
+def _start_process(cmd: list[str], **kwargs) -> subprocess.Popen:
+    """Start *cmd* and hand the process to the tracking hooks, if any."""
+    if _cancelled():
+        raise FFmpegCancelledError("Operation cancelled.")
+    # ffmpeg never reads from our stdin; without this an overwrite prompt
+    # would block forever in batch and GUI runs.
+    kwargs.setdefault("stdin", subprocess.DEVNULL)
+    process = subprocess.Popen(cmd, **kwargs)
+    hooks = getattr(_tracking, "hooks", None)
+    if hooks is not None:
+        hooks[0](process)
+    return process
+
+
+def _parse_clock(value: str) -> float | None:
+    """Convert ``HH:MM:SS.micro`` to seconds (``None`` if malformed)."""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _parse_number(value: str, suffix: str = "") -> float | None:
+    """Parse a ``-progress`` value such as ``29.97``, ``1.5x`` or
+    ``N/A``."""
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[: -len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return None
 
-# Regex to capture the time= field from ffmpeg stderr progress lines.
-# Example: "frame=  120 fps= 30 ... time=00:00:04.00 ..."
-_TIME_RE = re.compile(r"time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})")
 
+def _progress_stats(block: dict) -> dict:
+    """Normalise one ``-progress`` key=value block.
 
-def _parse_time_seconds(match: re.Match) -> float:
-    """Convert a ``time=HH:MM:SS.cc`` regex match to total seconds."""
-    hours, minutes, seconds, centiseconds = (int(g) for g in match.groups())
-    return hours * 3600 + minutes * 60 + seconds + centiseconds / 100.0
+    Returns a dict with ``frame``, ``fps``, ``speed`` (realtime factor),
+    ``out_time`` (seconds), ``bitrate`` (kbit/s), ``total_size`` (bytes)
+    and ``done`` (True on the final block); unknown values are ``None``.
+    """
+    out_time = None
+    for key in ("out_time_us", "out_time_ms"):     # both are microseconds
+        micros = _parse_number(block.get(key, ""))
+        if micros is not None:
+            out_time = micros / 1_000_000
+            break
+    if out_time is None and "out_time" in block:
+        out_time = _parse_clock(block["out_time"])
+    frame = _parse_number(block.get("frame", ""))
+    size = _parse_number(block.get("total_size", ""))
+    return {
+        "frame": int(frame) if frame is not None else None,
+        "fps": _parse_number(block.get("fps", "")),
+        "speed": _parse_number(block.get("speed", ""), "x"),
+        "out_time": out_time,
+        "bitrate": _parse_number(block.get("bitrate", ""), "kbits/s"),
+        "total_size": int(size) if size is not None else None,
+        "done": block.get("progress") == "end",
+    }
 
 
-def run_ffmpeg(args: list[str], progress_callback=None) -> subprocess.CompletedProcess:
+def run_ffmpeg(args: list[str], progress_callback=None,
+               stats_callback=None) -> subprocess.CompletedProcess:
     """Run ffmpeg with the given argument list.
 
     Parameters
@@ -164,20 +432,29 @@ def run_ffmpeg(args: list[str], progress_callback=None) -> subprocess.CompletedP
         itself; it will be prepended automatically).
     progress_callback : callable, optional
         A function accepting a single float argument (0.0 -- 100.0)
-        representing encoding progress.  Progress is estimated from the
-        ``time=`` lines that ffmpeg writes to stderr, so a total duration
-        must be determinable from the input for percentages to be meaningful.
-        If the duration cannot be determined, the callback will not be
-        invoked.
+        representing encoding progress.  Progress is read from ffmpeg's
+        ``-progress pipe:1`` channel and related to the input duration, so
+        a total duration must be determinable from the input for
+        percentages to be meaningful.  If the duration cannot be
+        determined, the callback will not be invoked.
+    stats_callback : callable, optional
+        Called with the dict described in :func:`_progress_stats` (plus a
+        ``percent`` key, ``None`` if the duration is unknown) for every
+        progress update ffmpeg reports.
 
     Returns
     -------
     subprocess.CompletedProcess
+        When progress is streamed, ``stdout`` is empty (ffmpeg's stdout
+        carries the progress channel) and ``stderr`` holds only the last
+        lines ffmpeg printed.
 
     Raises
     ------
     FFmpegNotFoundError
         If ffmpeg cannot be located.
+    FFmpegCancelledError
+        If the run was cancelled through :func:`track_processes`.
     """
     ffmpeg_path = find_ffmpeg()
     if ffmpeg_path is None:
@@ -185,65 +462,136 @@ def run_ffmpeg(args: list[str], progress_callback=None) -> subprocess.CompletedP
             "ffmpeg was not found on this system.\n\n" + get_ffmpeg_help_text()
         )
 
-    cmd = [ffmpeg_path] + list(args)
-
-    # If no progress callback, just run and return.
-    if progress_callback is None:
-        return subprocess.run(cmd, capture_output=True, text=True)
-
-    # With a progress callback we need to stream stderr line-by-line.
-    # First, try to figure out the total duration from the args (look for
-    # an input file and probe it).
+    # If nobody listens for progress, just run and return.
+    if progress_callback is None and stats_callback is None:
+        cmd = [ffmpeg_path, "-nostats"] + list(args)
+        process = _start_process(cmd, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE, text=True)
+        stdout_data, stderr_data = process.communicate()
+        if _cancelled():
+            raise FFmpegCancelledError("Operation cancelled.")
+        return subprocess.CompletedProcess(cmd, process.returncode,
+                                           stdout_data, stderr_data)
+
+    # ffmpeg writes machine-readable key=value progress blocks to stdout,
+    # each terminated by a "progress=continue|end" line, while the regular
+    # log goes to stderr and is drained on a helper thread into a bounded
+    # tail.
+    cmd = [ffmpeg_path, "-nostats", "-progress", "pipe:1"] + list(args)
     total_duration = _estimate_duration(args)
-    collected_stderr: list[str] = []
 
-    process = subprocess.Popen(
+    process = _start_process(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
     )
 
-    # ffmpeg writes progress to stderr.  It uses \r for in-place updates so
-    # we read character-by-character and split on \r or \n.
-    line_buf = []
-    while True:
-        ch = process.stderr.read(1)
-        if not ch:
-            break
-        if ch in ("\r", "\n"):
-            line = "".join(line_buf)
-            line_buf = []
-            collected_stderr.append(line)
-            if total_duration and total_duration > 0:
-                match = _TIME_RE.search(line)
-                if match:
-                    current = _parse_time_seconds(match)
-                    percent = min(current / total_duration * 100.0, 100.0)
-                    progress_callback(percent)
-        else:
-            line_buf.append(ch)
+    stderr_tail = collections.deque(maxlen=_STDERR_TAIL)
+
+    def _drain_stderr():
+        for raw in process.stderr:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line:
+                stderr_tail.append(line)
+
+    stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
+    stderr_thread.start()
+
+    block = {}
+    for raw in process.stdout:
+        key, sep, value = raw.decode("utf-8", errors="replace").strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value
+        if key != "progress":
+            continue
+
+        stats = _progress_stats(block)
+        block = {}
+        percent = None
+        if total_duration and total_duration > 0 and stats["out_time"] is not None:
+            percent = max(0.0, min(stats["out_time"] / total_duration * 100.0, 100.0))
+        stats["percent"] = percent
+        if stats_callback is not None:
+            stats_callback(stats)
+        if progress_callback is not None and percent is not None:
+            progress_callback(percent)
 
     process.wait()
-
-    stdout_data = process.stdout.read() if process.stdout else ""
+    stderr_thread.join(timeout=5)
+    if _cancelled():
+        raise FFmpegCancelledError("Operation cancelled.")
 
     return subprocess.CompletedProcess(
         args=cmd,
         returncode=process.returncode,
-        stdout=stdout_data,
-        stderr="\n".join(collected_stderr),
+        stdout="",
+        stderr="\n".join(stderr_tail),
     )
 
 
+class FFmpegPipe:
+    """An ffmpeg process whose output is read from ``stdout``.
+
+    *args* must end with an output of ``pipe:1``.  The process is
+    registered with :func:`track_processes` like :func:`run_ffmpeg`, and
+    its log is drained into a bounded tail on a helper thread.  Call
+    :meth:`finish` after reading everything and :meth:`close` in a
+    ``finally`` block.
+    """
+
+    def __init__(self, args: list[str]):
+        ffmpeg_path = find_ffmpeg()
+        if ffmpeg_path is None:
+            raise FFmpegNotFoundError(
+                "ffmpeg was not found on this system.\n\n" + get_ffmpeg_help_text()
+            )
+        self.args = [ffmpeg_path, "-nostats", "-v", "error"] + list(args)
+        self.process = _start_process(self.args, stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE)
+        self.stdout = self.process.stdout
+        self._stderr_tail = collections.deque(maxlen=_STDERR_TAIL)
+        self._stderr_thread = threading.Thread(target=self._drain_stderr,
+                                               daemon=True)
+        self._stderr_thread.start()
+
+    def finish(self) -> None:
+        """Wait for ffmpeg to exit.
+
+        Raises :class:`FFmpegCancelledError` if the run was cancelled and
+        ``RuntimeError`` with the end of ffmpeg's log if it failed.
+        """
+        self.process.wait()
+        self._stderr_thread.join(timeout=5)
+        if _cancelled():
+            raise FFmpegCancelledError("Operation cancelled.")
+        if self.process.returncode != 0:
+            raise RuntimeError("ffmpeg failed:\n" + "\n".join(self._stderr_tail))
+
+    def close(self) -> None:
+        """Stop ffmpeg if it is still running and release the pipe."""
+        if self.process.poll() is None:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+            self.process.wait()
+        self.stdout.close()
+
+    def _drain_stderr(self):
+        for raw in self.process.stderr:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line:
+                self._stderr_tail.append(line)
+
+
 def _estimate_duration(args: list[str]) -> float | None:
     """Try to determine the total duration (in seconds) of the first input
     file referenced in *args*.
 
     Returns ``None`` if the duration cannot be determined.
     """
-    ffprobe_path = find_ffprobe()
-    if ffprobe_path is None:
+    if find_ffprobe() is None:
         return None
 
     # Find the first -i <file> pair in the argument list.
@@ -256,22 +604,9 @@ def _estimate_duration(args: list[str]) -> float | None:
     if input_file is None:
         return None
 
-    try:
-        result = subprocess.run(
-            [
-                ffprobe_path,
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                input_file,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        return float(result.stdout.strip())
-    except Exception:
-        return None
+    # Imported here: probe_cache builds on this module.
+    from .probe_cache import probe_duration
+    return probe_duration(input_file)
 
 
 def run_ffprobe(args: list[str]) -> str:
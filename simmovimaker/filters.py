@@ -0,0 +1,422 @@
+"""
+filters.py - Picklable image filter specs and a parallel batch engine.
+
+A filter is described by a plain dict such as ``{"op": "resize",
+"width": 640, "height": 480}`` instead of a closure, so it can be sent to
+worker processes, stored in a project file, and replayed later.
+:func:`apply_spec` applies one spec to a BGR image and
+:func:`process_files` spreads a list of specs over many image files on a
+``ProcessPoolExecutor``.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import cv2
+import numpy as np
+
+
+FILTER_OPS = (
+    "crop", "resize", "rotate", "brightness", "contrast", "grayscale",
+    "text", "scale_bar", "timestamp", "colormap", "normalize",
+)
+
+# Operations that accept the source at its native depth (16-bit or float
+# images and stack frames, single channel) when they come first in an edit
+# list; every other operation expects an 8-bit BGR image.
+RAW_INPUT_OPS = ("colormap", "normalize")
+
+
+# ---------------------------------------------------------------------------
+# Individual operations
+# ---------------------------------------------------------------------------
+
+def _crop(img, spec, index):
+    return img[spec["top"]:spec["bottom"], spec["left"]:spec["right"]]
+
+
+def _resize(img, spec, index):
+    return cv2.resize(img, (int(spec["width"]), int(spec["height"])),
+                      interpolation=cv2.INTER_LANCZOS4)
+
+
+def _rotate(img, spec, index):
+    angle = float(spec["angle"])
+    h, w = img.shape[:2]
+    center = (w // 2, h // 2)
+    M = cv2.getRotationMatrix2D(center, angle, 1.0)
+    cos = abs(M[0, 0])
+    sin = abs(M[0, 1])
+    new_w = int(h * sin + w * cos)
+    new_h = int(h * cos + w * sin)
+    M[0, 2] += (new_w - w) / 2
+    M[1, 2] += (new_h - h) / 2
+    return cv2.warpAffine(img, M, (new_w, new_h))
+
+
+def _brightness(img, spec, index):
+    return cv2.convertScaleAbs(img, alpha=1.0, beta=float(spec["offset"]))
+
+
+def _contrast(img, spec, index):
+    return cv2.convertScaleAbs(img, alpha=float(spec["factor"]), beta=0)
+
+
+def _normalize(img, spec, index):
+    """Map ``low`` to 0 and ``high`` to 255 (clipping outside), e.g. the
+    dataset-wide percentiles from :func:`simmovimaker.stats.compute_stats`.
+
+    Accepts 8-bit, 16-bit and float images; the result is 8-bit BGR.
+    """
+    low, high = float(spec["low"]), float(spec["high"])
+    scale = 255.0 / (high - low) if high > low else 0.0
+    if img.dtype == np.uint8:
+        table = np.clip((np.arange(256) - low) * scale, 0, 255).astype(np.uint8)
+        out = cv2.LUT(img, table)
+    else:
+        work = img.astype(np.float32)
+        work -= low
+        work *= scale
+        np.nan_to_num(work, copy=False, nan=0.0)
+        out = np.clip(work, 0, 255, out=work).astype(np.uint8)
+    if out.ndim == 2:
+        return cv2.cvtColor(out, cv2.COLOR_GRAY2BGR)
+    if out.shape[2] == 4:
+        return cv2.cvtColor(out, cv2.COLOR_BGRA2BGR)
+    return out
+
+
+def _grayscale(img, spec, index):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def _text(img, spec, index):
+    return cv2.putText(img.copy(), spec["text"], (int(spec["x"]), int(spec["y"])),
+                       cv2.FONT_HERSHEY_SIMPLEX, float(spec.get("scale", 1.0)),
+                       tuple(spec.get("color", (255, 255, 255))), 2, cv2.LINE_AA)
+
+
+def _scale_bar(img, spec, index):
+    x, y = int(spec["x"]), int(spec["y"])
+    bar_len = int(spec["length"])
+    thickness = int(spec.get("thickness", 5))
+    white = (255, 255, 255)
+    out = img.copy()
+    cv2.line(out, (x, y), (x + bar_len, y), white, thickness)
+    cap_h = thickness * 2
+    cv2.line(out, (x, y - cap_h), (x, y + cap_h), white, thickness)
+    cv2.line(out, (x + bar_len, y - cap_h), (x + bar_len, y + cap_h),
+             white, thickness)
+    cv2.putText(out, spec.get("label", ""), (x, y - cap_h - 5),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, white, 1, cv2.LINE_AA)
+    return out
+
+
+def _timestamp(img, spec, index):
+    """Label frame *index* with ``start + index * step`` seconds.
+
+    A spec bound to a frame with :func:`bind_index` uses its stored index.
+    """
+    index = spec.get("index", index)
+    t = float(spec.get("start", 0.0)) + index * float(spec.get("step", 1.0))
+    text = spec.get("format", "t = {:.1f} s").format(t)
+    out = img.copy()
+    cv2.putText(out, text, (int(spec["x"]), int(spec["y"])),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+    return out
+
+
+def _colormap(img, spec, index):
+    """Colour a scalar field through a LUT (see :mod:`simmovimaker.colormap`).
+
+    Colour images are reduced to luminance first.  Without ``vmin`` /
+    ``vmax`` each frame is stretched to its own range.
+    """
+    from .colormap import get_colormap
+    cmap = get_colormap(spec.get("cmap", "viridis"), spec.get("vmin"),
+                        spec.get("vmax"))
+    return cmap.apply(img, bgr=True)
+
+
+_OPS = {
+    "crop": _crop,
+    "resize": _resize,
+    "rotate": _rotate,
+    "brightness": _brightness,
+    "contrast": _contrast,
+    "normalize": _normalize,
+    "grayscale": _grayscale,
+    "text": _text,
+    "scale_bar": _scale_bar,
+    "timestamp": _timestamp,
+    "colormap": _colormap,
+}
+
+
+def apply_spec(img, spec, index=0):
+    """Apply one filter *spec* to the BGR image *img* and return the result.
+
+    *index* is the frame's position within the batch; only index-dependent
+    filters such as ``timestamp`` use it.
+    """
+    try:
+        fn = _OPS[spec["op"]]
+    except KeyError:
+        raise ValueError(f"Unknown filter operation: {spec.get('op')!r}")
+    return fn(img, spec, index)
+
+
+# Operations whose output depends on the frame's position in a batch.
+_INDEXED_OPS = ("timestamp",)
+
+
+def bind_index(spec, index):
+    """Return a copy of *spec* with its batch *index* fixed.
+
+    Needed when a spec is stored per frame (e.g. in a project's edit list)
+    rather than applied across a batch.
+    """
+    spec = dict(spec)
+    if spec.get("op") in _INDEXED_OPS:
+        spec["index"] = index
+    return spec
+
+
+def reads_raw(specs):
+    """True if *specs* should receive the source at its native depth (see
+    :data:`RAW_INPUT_OPS`)."""
+    return bool(specs) and specs[0].get("op") in RAW_INPUT_OPS
+
+
+def read_image(path, raw=False):
+    """Read *path* as 8-bit BGR, or unchanged (any depth and channel
+    count) when *raw* is true.  Returns ``None`` if it cannot be read."""
+    return cv2.imread(path, cv2.IMREAD_UNCHANGED if raw else cv2.IMREAD_COLOR)
+
+
+def apply_specs(img, specs, index=0):
+    """Apply every spec in *specs* to *img* in order."""
+    for spec in specs:
+        img = apply_spec(img, spec, index)
+    return img
+
+
+# ---------------------------------------------------------------------------
+# Parallel batch engine
+# ---------------------------------------------------------------------------
+
+def default_workers():
+    """Return the default number of filter worker processes."""
+    return max(1, os.cpu_count() or 1)
+
+
+def _process_chunk(jobs):
+    """Worker: read, filter and rewrite each ``(path, specs, index)`` job
+    in place.
+
+    Returns ``(written, error)``: the paths actually written and, if a job
+    raised, a message naming it (the rest of the chunk is then skipped).
+    Unreadable files are skipped silently."""
+    written = []
+    for path, specs, index in jobs:
+        try:
+            img = read_image(path, raw=reads_raw(specs))
+            if img is None:
+                continue
+            if not cv2.imwrite(path, apply_specs(img, specs, index)):
+                raise IOError("could not write file")
+        except Exception as e:
+            return written, f"{os.path.basename(path)}: {e}"
+        written.append(path)
+    return written, None
+
+
+def process_files(paths, specs, **kwargs):
+    """Apply the same *specs* to every image in *paths*, overwriting each
+    file.  Keyword arguments are forwarded to :func:`process_jobs`."""
+    specs = [dict(s) for s in specs]
+    return process_jobs([(p, specs, i) for i, p in enumerate(paths)], **kwargs)
+
+
+def process_jobs(jobs, workers=None, chunk_size=None,
+                 progress_callback=None, cancel_check=None, written_paths=None):
+    """Run ``(path, specs, index)`` *jobs*, overwriting each file with the
+    filtered result.
+
+    Jobs are grouped into chunks that run on a ``ProcessPoolExecutor``
+    with at most ``2 * workers`` chunks in flight.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of worker processes (default: CPU count).  ``1`` runs
+        everything in the calling thread.
+    chunk_size : int, optional
+        Files per task (default: chosen so each worker gets several chunks).
+    progress_callback : callable, optional
+        ``progress_callback(done, total)``, called in the calling thread
+        whenever the completed prefix of the batch grows, so progress is
+        reported in order even though chunks finish out of order.
+    cancel_check : callable, optional
+        Polled between chunks; once it returns True no further chunks are
+        started.  Chunks already running are allowed to finish so no file
+        is left half-written.
+    written_paths : list, optional
+        The path of every file actually written is appended to it as its
+        chunk completes, so the caller knows which jobs took effect even
+        when the run is cancelled or fails part-way.
+
+    Returns the number of files written.  If any job raises, no further
+    chunks are started and a ``RuntimeError`` naming the file is raised
+    once the running chunks have finished.
+    """
+    jobs = list(jobs)
+    total = len(jobs)
+    if not total:
+        return 0
+    workers = max(1, int(workers or default_workers()))
+    if chunk_size is None:
+        chunk_size = max(1, min(32, total // (workers * 4)))
+    chunks = [jobs[start:start + chunk_size]
+              for start in range(0, total, chunk_size)]
+
+    def _report(done):
+        if progress_callback is not None:
+            progress_callback(done, total)
+
+    written = 0
+    errors = []
+
+    def _collect(result):
+        nonlocal written
+        paths, error = result
+        written += len(paths)
+        if written_paths is not None:
+            written_paths.extend(paths)
+        if error is not None:
+            errors.append(error)
+
+    def _raise_errors():
+        if errors:
+            raise RuntimeError(f"Filtering failed for {errors[0]}")
+
+    if workers == 1 or len(chunks) == 1:
+        done = 0
+        for chunk in chunks:
+            if errors or (cancel_check is not None and cancel_check()):
+                break
+            _collect(_process_chunk(chunk))
+            done += len(chunk)
+            _report(done)
+        _raise_errors()
+        return written
+
+    done = 0
+    cancelled = False
+    finished = {}           # chunk index -> (paths, error), awaiting in-order report
+    pending = {}            # future -> chunk index
+    next_submit = 0
+    next_report = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while (not cancelled and next_submit < len(chunks)
+                   and len(pending) < workers * 2):
+                pending[pool.submit(_process_chunk, chunks[next_submit])] = next_submit
+                next_submit += 1
+            if not pending:
+                break
+
+            completed, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in completed:
+                finished[pending.pop(fut)] = fut.result()
+
+            while next_report in finished:
+                _collect(finished.pop(next_report))
+                done += len(chunks[next_report])
+                next_report += 1
+                _report(done)
+
+            if errors or (cancel_check is not None and cancel_check()):
+                cancelled = True
+    # Chunks that finished after an earlier one was cancelled or failed.
+    for index in sorted(finished):
+        _collect(finished[index])
+    _raise_errors()
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Filter chains
+# ---------------------------------------------------------------------------
+
+class FilterChain:
+    """An ordered list of filter specs applied in a single pass.
+
+    Running a chain decodes each image once, applies every queued
+    operation in memory and encodes the result once, instead of one full
+    read/write round per filter.  Chains can be saved to and loaded from
+    JSON files so ``batch_process`` can replay them.
+    """
+
+    FILE_VERSION = 1
+
+    def __init__(self, specs=None):
+        self.specs = []
+        for spec in specs or []:
+            self.add(spec)
+
+    def __len__(self):
+        return len(self.specs)
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def add(self, spec):
+        """Append *spec* to the chain and return the chain."""
+        if spec.get("op") not in _OPS:
+            raise ValueError(f"Unknown filter operation: {spec.get('op')!r}")
+        self.specs.append(dict(spec))
+        return self
+
+    def extend(self, specs):
+        for spec in specs:
+            self.add(spec)
+        return self
+
+    def clear(self):
+        self.specs = []
+
+    def describe(self):
+        """Return a short human-readable summary such as ``resize -> grayscale``."""
+        return " -> ".join(s["op"] for s in self.specs) or "(empty)"
+
+    def apply(self, img, index=0):
+        """Apply the whole chain to one BGR image."""
+        return apply_specs(img, self.specs, index)
+
+    def run(self, paths, **kwargs):
+        """Apply the chain to every file in *paths* in one pass.
+
+        Keyword arguments are forwarded to :func:`process_files`.
+        """
+        return process_files(paths, self.specs, **kwargs)
+
+    # -- persistence --
+
+    def to_dict(self):
+        return {"version": self.FILE_VERSION, "filters": [dict(s) for s in self.specs]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("filters", []))
+
+    def save(self, filename):
+        with open(filename, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, "r", encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
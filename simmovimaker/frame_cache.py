@@ -0,0 +1,280 @@
+"""
+frame_cache.py - Shared, byte-bounded LRU cache of decoded frames.
+
+The preview canvas, image slideshow playback and the thumbnail strip all
+decode the same files.  They share one :class:`FrameCache`, keyed by
+``(path, mtime, target size, ...)``, so scrubbing back and forth only
+decodes each frame once.  Entries are evicted least-recently-used first
+once the cache exceeds its byte budget, and a changed modification time
+(e.g. after baking edits) yields a new key so stale frames are never
+returned.
+"""
+
+import collections
+import os
+import threading
+
+from PIL import Image
+
+
+# Default byte budget of the shared cache (256 MiB).
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _nbytes(value):
+    """Best-effort size in bytes of a cached value."""
+    if value is None:
+        return 0
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    nbytes = getattr(value, "nbytes", None)     # NumPy arrays
+    if nbytes is not None:
+        return int(nbytes)
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    return 64
+
+
+class FrameCache:
+    """Thread-safe LRU mapping with a total byte budget."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._data = collections.OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    @property
+    def current_bytes(self):
+        return self._bytes
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return  # never cache something larger than the whole budget
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for *key*, calling ``loader()`` and
+        caching its result on a miss.  The loader runs outside the lock."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = loader()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, path):
+        """Drop every entry decoded from *path* (keys built with
+        :func:`file_key` as their first element)."""
+        with self._lock:
+            stale = [k for k in self._data
+                     if isinstance(k, tuple) and k and isinstance(k[0], tuple)
+                     and k[0][:1] == (path,)]
+            for key in stale:
+                self._bytes -= self._data.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+_shared_cache = FrameCache()
+
+
+def shared_cache():
+    """Return the process-wide cache used by preview, playback and
+    thumbnails."""
+    return _shared_cache
+
+
+def file_key(path):
+    """Return ``(path, mtime_ns)`` identifying the current contents of
+    *path* (mtime is ``None`` if the file cannot be stat'ed)."""
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return path, None
+
+
+def fit_image(img, size, upscale=True, resample=Image.LANCZOS):
+    """Scale PIL *img* to fit inside *size* ``(w, h)`` keeping its aspect
+    ratio.  Images are only enlarged when *upscale* is True."""
+    if size is None:
+        return img
+    target_w, target_h = size
+    w, h = img.size
+    scale = min(target_w / w, target_h / h)
+    if not upscale:
+        scale = min(scale, 1.0)
+    new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    if new_size == img.size:
+        return img
+    return img.resize(new_size, resample)
+
+
+def _decode(path, ops, time, frame=None):
+    """Decode *path* to a PIL RGB image (video frame at *time* seconds if
+    *time* is not None, frame *frame* of a stack if that is not None, with
+    edit-list *ops* applied for images and stack frames)."""
+    import cv2
+
+    if frame is not None:
+        from . import edits
+        img = edits.load_frame({"path": path, "type": "stack", "frame": frame,
+                                "ops": ops}, cache=False)
+        if img is None:
+            raise ValueError(f"Could not read frame {frame} of {path}")
+        return Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+
+    if time is not None:
+        cap = cv2.VideoCapture(path)
+        if time > 0:
+            cap.set(cv2.CAP_PROP_POS_MSEC, time * 1000)
+        ret, frame = cap.read()
+        cap.release()
+        if not ret or frame is None:
+            raise ValueError(f"Could not read frame from {path}")
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    if ops:
+        from . import edits
+        frame = edits.load_frame({"path": path, "ops": ops}, cache=False)
+        if frame is None:
+            raise ValueError(f"Could not read image {path}")
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    img = Image.open(path)
+    return img.convert("RGB")
+
+
+# Reduced-resolution TIFF pages probed when looking for a pyramid level.
+_MAX_PYRAMID_PAGES = 16
+
+
+def _reduction_factor(source_size, target_size):
+    """Largest power-of-two shrink (at most 8) that still covers
+    *target_size*."""
+    factor = 1
+    while (factor < 8 and source_size[0] // (factor * 2) >= target_size[0]
+           and source_size[1] // (factor * 2) >= target_size[1]):
+        factor *= 2
+    return factor
+
+
+def _tiff_pyramid_page(img, target_size):
+    """Return the index of the smallest reduced-resolution page of TIFF
+    *img* that still covers *target_size*, or ``None``.
+
+    Pyramidal TIFFs store downsampled copies of the first image as
+    further pages with the same aspect ratio.  Pages the size of the first
+    one (plain multi-page stacks) end the search.
+    """
+    src_w, src_h = img.size
+    best = None
+    try:
+        for page in range(1, _MAX_PYRAMID_PAGES + 1):
+            img.seek(page)
+            w, h = img.size
+            if (w, h) == (src_w, src_h):
+                break
+            if abs(w / h - src_w / src_h) > 0.02:
+                continue
+            if w >= target_size[0] and h >= target_size[1]:
+                if best is None or w < best[1]:
+                    best = (page, w)
+    except EOFError:
+        pass
+    img.seek(0)
+    return None if best is None else best[0]
+
+
+def _decode_reduced(path, size):
+    """Decode *path* at the smallest resolution that still covers *size*.
+
+    JPEGs use libjpeg's DCT scaling via :meth:`PIL.Image.Image.draft`,
+    pyramidal TIFFs read their closest reduced-resolution page, and other
+    formats go through ``cv2.IMREAD_REDUCED_COLOR_2/4/8``.  Returns
+    ``(image, source_size)`` where *source_size* is the full-resolution
+    size from the file header.
+    """
+    img = Image.open(path)
+    source_size = img.size
+    if img.format == "JPEG":
+        img.draft("RGB", tuple(size))
+        return img.convert("RGB"), source_size
+    if img.format == "TIFF":
+        page = _tiff_pyramid_page(img, size)
+        if page is not None:
+            img.seek(page)
+            return img.convert("RGB"), source_size
+    factor = _reduction_factor(source_size, size)
+    if factor > 1:
+        import cv2
+        flag = {2: cv2.IMREAD_REDUCED_COLOR_2,
+                4: cv2.IMREAD_REDUCED_COLOR_4,
+                8: cv2.IMREAD_REDUCED_COLOR_8}[factor]
+        frame = cv2.imread(path, flag)
+        if frame is not None:
+            img.close()
+            return (Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)),
+                    source_size)
+    return img.convert("RGB"), source_size
+
+
+def load_image(path, size=None, ops=None, time=None, upscale=True,
+               resample=Image.LANCZOS, cache=None, frame=None):
+    """Return ``(image, source_size)`` for *path* through the shared cache.
+
+    *image* is a PIL RGB image fitted to *size* (or full size if *size* is
+    None) and *source_size* is the full-resolution ``(w, h)`` of the frame.
+    *ops* is an entry's edit list; *time* selects a video frame and
+    *frame* a frame of a stack (see :mod:`simmovimaker.frame_stack`).
+    Unedited images with a target *size* are decoded at reduced
+    resolution.
+    """
+    if cache is None:
+        cache = _shared_cache
+    from .edits import ops_key
+    key = (file_key(path), tuple(size) if size else None, time,
+           ops_key(ops) if ops else None, upscale, resample, frame)
+
+    def _load():
+        if frame is not None:
+            img = _decode(path, ops, None, frame)
+            source_size = img.size
+        elif size is not None and time is None and not ops:
+            img, source_size = _decode_reduced(path, size)
+        else:
+            # Edit lists work in full-resolution coordinates.
+            img = _decode(path, ops, time)
+            source_size = img.size
+        return fit_image(img, size, upscale, resample), source_size
+
+    return cache.get_or_load(key, _load)
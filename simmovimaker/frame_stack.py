@@ -0,0 +1,233 @@
+"""
+frame_stack.py - Frame stacks stored as one memory-mapped ``.npy`` file.
+
+A stack holds N equally shaped frames as a single ``(N, H, W[, C])``
+array in NumPy's ``.npy`` format, so it can be opened with
+``np.load(path, mmap_mode="r")`` and any frame read without touching the
+others.  Colour stacks are RGB (RGBA with four channels); ``(N, H, W)``
+stacks are greyscale.  uint8 stacks are shown as stored; other integer
+and float dtypes are stretched to 0..255 over the whole stack's range.
+A 3-D array whose last axis has 3 or 4 entries is a single RGB(A) image
+``(H, W, C)`` and is treated as a one-frame stack.
+
+In ``media_files`` every frame of a stack is an entry of type ``"stack"``
+with the stack file as ``"path"`` and the frame index as ``"frame"``, so
+importing a 10k-frame simulation opens one file instead of listing and
+stat'ing 10k images.  :func:`read_frame` gives random access to any frame.
+:class:`NpyStackWriter` appends frames as they are produced (the frame
+count does not need to be known in advance) and fixes up the header when
+it is closed.
+"""
+
+import collections
+import os
+import struct
+import threading
+
+import numpy as np
+
+from .arrays import value_range
+
+
+STACK_EXTENSIONS = (".npy",)
+
+# Stacks kept memory-mapped at once.
+_MAX_OPEN_STACKS = 8
+
+
+# Fixed size of the .npy preamble + header written by NpyStackWriter, so the
+# header can be rewritten in place once the final frame count is known.
+_HEADER_BYTES = 128
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _npy_header(dtype, shape):
+    """Return a version 1.0 ``.npy`` header padded to :data:`_HEADER_BYTES`."""
+    text = repr({
+        "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        "fortran_order": False,
+        "shape": tuple(int(n) for n in shape),
+    })
+    room = _HEADER_BYTES - len(_NPY_MAGIC) - 2
+    if len(text) + 1 > room:
+        raise ValueError(f"Frame shape {shape} does not fit the stack header.")
+    text = text.ljust(room - 1) + "\n"
+    return _NPY_MAGIC + struct.pack("<H", room) + text.encode("latin1")
+
+
+class NpyStackWriter:
+    """Append frames to a ``.npy`` stack whose length is not known up front.
+
+    Parameters
+    ----------
+    filename : str
+        Output ``.npy`` file (overwritten).
+    frame_shape : tuple of int, optional
+        ``(H, W)`` or ``(H, W, C)``; taken from the first frame if omitted.
+    dtype : numpy dtype
+        Element type of the stack.
+
+    Usage::
+
+        with NpyStackWriter("frames.npy") as writer:
+            for frame in frames:
+                writer.write(frame)
+    """
+
+    def __init__(self, filename, frame_shape=None, dtype=np.uint8):
+        self.filename = filename
+        self.frame_shape = tuple(frame_shape) if frame_shape else None
+        self.dtype = np.dtype(dtype)
+        self.frames_written = 0
+        self._fh = open(filename, "wb")
+        self._fh.write(b"\0" * _HEADER_BYTES)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def shape(self):
+        return (self.frames_written,) + (self.frame_shape or ())
+
+    def write(self, frame):
+        """Append one ``frame_shape`` frame."""
+        frame = np.asarray(frame, dtype=self.dtype)
+        self.write_batch(frame[np.newaxis])
+
+    def write_batch(self, frames):
+        """Append a batch of frames shaped ``(n, *frame_shape)``."""
+        frames = np.asarray(frames, dtype=self.dtype)
+        if self.frame_shape is None:
+            self.frame_shape = frames.shape[1:]
+        if frames.shape[1:] != self.frame_shape:
+            raise ValueError(f"Frame shape {frames.shape[1:]} does not match "
+                             f"the stack's {self.frame_shape}.")
+        self._fh.write(np.ascontiguousarray(frames).data)
+        self.frames_written += len(frames)
+
+    def close(self):
+        """Write the final header and close the file."""
+        if self._fh is None:
+            return
+        self._fh.seek(0)
+        self._fh.write(_npy_header(self.dtype, self.shape))
+        self._fh.close()
+        self._fh = None
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+_open_stacks = collections.OrderedDict()    # (path, mtime_ns) -> memmap
+_stack_ranges = {}                          # (path, mtime_ns) -> (min, max)
+_open_lock = threading.Lock()
+
+
+def is_stack_file(path):
+    return os.path.splitext(path)[1].lower() in STACK_EXTENSIONS
+
+
+def _stack_key(path):
+    return path, os.stat(path).st_mtime_ns
+
+
+def open_stack(path):
+    """Return the memory-mapped ``(N, H, W[, C])`` array of the stack at
+    *path*; a single ``(H, W, 3|4)`` image comes back as one frame.
+    Recently used stacks stay mapped; a modified file is mapped again."""
+    key = _stack_key(path)
+    with _open_lock:
+        stack = _open_stacks.get(key)
+        if stack is not None:
+            _open_stacks.move_to_end(key)
+            return stack
+    stack = np.load(path, mmap_mode="r", allow_pickle=False)
+    if stack.ndim == 3 and stack.shape[2] in (3, 4):
+        stack = stack[np.newaxis]           # one (H, W, 3|4) colour image
+    if stack.ndim not in (3, 4) or (stack.ndim == 4 and stack.shape[3] not in (1, 3, 4)):
+        raise ValueError(f"{path} is not a frame stack (shape {stack.shape}).")
+    with _open_lock:
+        _open_stacks[key] = stack
+        while len(_open_stacks) > _MAX_OPEN_STACKS:
+            old, _ = _open_stacks.popitem(last=False)
+            _stack_ranges.pop(old, None)
+    return stack
+
+
+def stack_range(path):
+    """Return the ``(min, max)`` over every frame of the stack at *path*,
+    ignoring NaNs.
+
+    Computed in one chunked pass the first time it is needed for a mapped
+    file version and then kept with the mapping, so all frames of a stack
+    share one display range.
+    """
+    key = _stack_key(path)
+    with _open_lock:
+        bounds = _stack_ranges.get(key)
+    if bounds is None:
+        bounds = value_range(open_stack(path))
+        with _open_lock:
+            if key in _open_stacks:
+                _stack_ranges[key] = bounds
+    return bounds
+
+
+def stack_length(path):
+    """Return the number of frames in the stack at *path*."""
+    return int(open_stack(path).shape[0])
+
+
+def frame_size(path):
+    """Return the ``(width, height)`` of the frames in the stack at *path*."""
+    shape = open_stack(path).shape
+    return int(shape[2]), int(shape[1])
+
+
+def _to_uint8(frame, lo, hi):
+    """Map *frame* linearly so *lo* becomes 0 and *hi* 255."""
+    if frame.dtype == np.uint8:
+        return frame
+    scale = 255.0 / (hi - lo) if hi > lo else 0.0
+    work = frame.astype(np.float32)
+    work -= lo
+    work *= scale
+    np.nan_to_num(work, copy=False, nan=0.0)
+    np.clip(work, 0.0, 255.0, out=work)
+    return work.astype(np.uint8)
+
+
+def read_frame(path, index, raw=False):
+    """Return frame *index* of the stack at *path* as a BGR uint8 array
+    (the layout ``cv2.imread`` returns).  Stacks of other dtypes are
+    stretched to 0..255 over the range of the whole stack (see
+    :func:`stack_range`), so brightness does not flicker from frame to
+    frame.  With *raw* the frame keeps its dtype and channel count (like
+    ``cv2.IMREAD_UNCHANGED``) for scalar-field processing."""
+    stack = open_stack(path)
+    if not 0 <= index < stack.shape[0]:
+        raise IndexError(f"Frame {index} outside stack of {stack.shape[0]} frames.")
+    frame = np.asarray(stack[index])
+    if raw:
+        if frame.ndim == 3 and frame.shape[2] >= 3:
+            return np.concatenate([frame[:, :, 2::-1], frame[:, :, 3:]], axis=2)
+        return frame
+    if frame.dtype != np.uint8:
+        frame = _to_uint8(frame, *stack_range(path))
+    if frame.ndim == 3 and frame.shape[2] == 1:
+        frame = frame[:, :, 0]
+    if frame.ndim == 2:
+        return np.repeat(frame[:, :, np.newaxis], 3, axis=2)
+    return np.ascontiguousarray(frame[:, :, 2::-1])    # RGB(A) -> BGR
+
+
+def stack_entries(path):
+    """Return one ``media_files`` entry per frame of the stack at *path*."""
+    return [{"path": path, "type": "stack", "frame": i}
+            for i in range(stack_length(path))]
@@ -0,0 +1,230 @@
+"""
+jobs.py - Queued ffmpeg jobs with a concurrency limit and cancellation.
+
+GUI video operations are submitted to a :class:`JobManager` instead of
+each starting its own thread.  The manager runs at most
+``max_concurrent`` jobs at a time (ffmpeg's encoders are already
+multithreaded, so running every request at once only oversubscribes the
+CPU), starts a job only after the jobs it depends on have finished, and
+cancels a job by killing the ffmpeg processes it started.
+"""
+
+import itertools
+import os
+import threading
+
+from .ffmpeg_utils import track_processes, FFmpegCancelledError
+
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+def default_concurrency():
+    """Return the default number of simultaneous ffmpeg jobs.
+
+    Each ffmpeg encode already uses several threads, so allow roughly one
+    job per four cores (at least one, at most four).
+    """
+    return max(1, min(4, (os.cpu_count() or 1) // 4))
+
+
+class Job:
+    """One queued operation.
+
+    *fn* is called as ``fn(progress_callback)`` on a worker thread, where
+    ``progress_callback(percent)`` may be called with 0..100.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, title, fn, depends_on=()):
+        self.id = next(self._ids)
+        self.title = title
+        self.fn = fn
+        self.depends_on = list(depends_on)
+        self.state = PENDING
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self._cancel_event = threading.Event()
+        self._processes = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.title!r} {self.state}>"
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    def cancel(self):
+        """Request cancellation and kill any ffmpeg process the job runs."""
+        self._cancel_event.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+    def _attach_process(self, process):
+        with self._lock:
+            self._processes = [p for p in self._processes if p.poll() is None]
+            self._processes.append(process)
+        if self.cancelled:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
+class JobManager:
+    """Run :class:`Job` objects with a concurrency limit.
+
+    Parameters
+    ----------
+    max_concurrent : int, optional
+        Jobs allowed to run at once (default: :func:`default_concurrency`).
+    on_change : callable, optional
+        ``on_change(job)`` is called whenever a job changes state or
+        reports progress.  It is invoked from worker threads; GUI callers
+        must marshal it onto their event loop.
+    """
+
+    def __init__(self, max_concurrent=None, on_change=None):
+        self.max_concurrent = max(1, int(max_concurrent or default_concurrency()))
+        self.on_change = on_change
+        self.jobs = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    # -- public API --
+
+    def submit(self, title, fn, depends_on=()):
+        """Queue ``fn(progress_callback)`` as a new job and return it.
+
+        The job starts once a slot is free and every job in *depends_on*
+        has finished successfully; if one of them fails or is cancelled,
+        this job is cancelled too.
+        """
+        job = Job(title, fn, depends_on)
+        with self._lock:
+            self.jobs.append(job)
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job):
+        """Cancel *job*, whether it is queued or running."""
+        job.cancel()
+        with self._lock:
+            queued = job.state == PENDING
+            if queued:
+                job.state = CANCELLED
+        if queued:
+            self._notify(job)
+            self._dispatch()
+            with self._idle:
+                self._idle.notify_all()
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            if not job.finished:
+                self.cancel(job)
+
+    def clear_finished(self):
+        """Forget finished jobs (keeping any a pending job depends on)."""
+        with self._lock:
+            needed = {id(dep) for job in self.jobs if not job.finished
+                      for dep in job.depends_on}
+            self.jobs = [j for j in self.jobs
+                         if not j.finished or id(j) in needed]
+
+    def set_max_concurrent(self, value):
+        self.max_concurrent = max(1, int(value))
+        self._dispatch()
+
+    @property
+    def active_jobs(self):
+        return [j for j in self.jobs if not j.finished]
+
+    def wait(self, timeout=None):
+        """Block until every submitted job has finished.  Returns False if
+        *timeout* (seconds) expired first."""
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: all(j.finished for j in self.jobs), timeout)
+
+    # -- internal --
+
+    def _notify(self, job):
+        if self.on_change is not None:
+            try:
+                self.on_change(job)
+            except Exception:
+                pass
+
+    def _dispatch(self):
+        """Start as many runnable jobs as the concurrency limit allows."""
+        to_start = []
+        to_cancel = []
+        with self._lock:
+            running = sum(1 for j in self.jobs if j.state == RUNNING)
+            for job in self.jobs:
+                if job.state != PENDING:
+                    continue
+                if any(dep.state in (FAILED, CANCELLED) for dep in job.depends_on):
+                    job.state = CANCELLED
+                    job.error = "A job it depends on did not complete."
+                    to_cancel.append(job)
+                    continue
+                if running >= self.max_concurrent:
+                    continue
+                if all(dep.state == DONE for dep in job.depends_on):
+                    job.state = RUNNING
+                    running += 1
+                    to_start.append(job)
+        for job in to_cancel:
+            self._notify(job)
+        if to_cancel:
+            with self._idle:
+                self._idle.notify_all()
+        for job in to_start:
+            self._notify(job)
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        if to_cancel:
+            self._dispatch()    # jobs depending on the cancelled ones
+
+    def _run(self, job):
+        def _progress(percent):
+            job.progress = percent
+            self._notify(job)
+
+        try:
+            with track_processes(job._attach_process, lambda: job.cancelled):
+                job.result = job.fn(_progress)
+            state = CANCELLED if job.cancelled else DONE
+        except FFmpegCancelledError:
+            state = CANCELLED
+        except Exception as exc:
+            job.error = exc
+            state = CANCELLED if job.cancelled else FAILED
+        with self._lock:
+            job.state = state
+            if state == DONE:
+                job.progress = 100.0
+        self._notify(job)
+        self._dispatch()
+        with self._idle:
+            self._idle.notify_all()
@@ -0,0 +1,152 @@
+"""
+playback.py - Background video decoding for the preview canvas.
+
+:class:`FrameDecoder` reads a video on its own thread, converts and scales
+each frame to the preview size, and keeps a small ring of display-ready
+PIL images.  The Tk playback tick only picks the frame for the current
+wall-clock position and blits it.  When the consumer falls behind, the
+decoder drops frames itself (``grab()`` without colour conversion or
+resizing) instead of seeking the capture, so playback stays in sync
+without expensive keyframe seeks.
+"""
+
+import collections
+import threading
+import time
+
+import cv2
+from PIL import Image
+
+
+# Display-ready frames buffered ahead of the playback position.
+DEFAULT_RING_SIZE = 8
+
+
+class FrameDecoder:
+    """Decode *path* from *start_frame* into a bounded ring of PIL images.
+
+    Parameters
+    ----------
+    path : str
+        Video file.
+    size : tuple of int
+        ``(width, height)`` box the frames are scaled to fit.
+    start_frame : int
+        First frame to decode.
+    fps : float
+        Playback rate used to decide which frames are already late.
+    ring_size : int
+        Maximum number of decoded frames held ahead of the consumer.
+    """
+
+    def __init__(self, path, size, start_frame=0, fps=30.0,
+                 ring_size=DEFAULT_RING_SIZE):
+        self.path = path
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.start_frame = int(start_frame)
+        self._size = tuple(size)
+        self._ring = collections.deque()
+        self._ring_size = max(1, int(ring_size))
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._eof = False
+        self.error = None
+        self.frames_dropped = 0
+        self._start_time = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    # -- public API --
+
+    def start(self, start_time=None):
+        """Start decoding; *start_time* (``time.monotonic()``) is the moment
+        ``start_frame`` is due on screen."""
+        self._start_time = time.monotonic() if start_time is None else start_time
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._ring.clear()
+            self._cond.notify_all()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout=2)
+
+    def set_size(self, size):
+        """Change the target display size for frames decoded from now on."""
+        self._size = tuple(size)
+
+    @property
+    def finished(self):
+        """True once the decoder reached the end and the ring is empty."""
+        with self._cond:
+            return self._eof and not self._ring
+
+    def target_frame(self, now=None):
+        """Frame index due on screen at *now* (default: the current time)."""
+        now = time.monotonic() if now is None else now
+        return self.start_frame + int((now - self._start_time) * self.fps)
+
+    def get_frame(self, target):
+        """Return ``(index, image)`` of the newest buffered frame at or
+        before *target*, discarding older ones; ``None`` if none is ready."""
+        with self._cond:
+            found = None
+            while self._ring and self._ring[0][0] <= target:
+                found = self._ring.popleft()
+            if found is not None:
+                self._cond.notify_all()
+            return found
+
+    # -- decoder thread --
+
+    def _run(self):
+        cap = cv2.VideoCapture(self.path)
+        try:
+            if not cap.isOpened():
+                raise RuntimeError(f"Cannot open video: {self.path}")
+            if self.start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+            index = self.start_frame
+            while True:
+                with self._cond:
+                    while len(self._ring) >= self._ring_size and not self._stopped:
+                        self._cond.wait()
+                    if self._stopped:
+                        return
+                # Frames already behind the clock are decoded but never
+                # converted or scaled, so a slow consumer catches up.
+                if index < self.target_frame() - 1:
+                    if not cap.grab():
+                        break
+                    self.frames_dropped += 1
+                    index += 1
+                    continue
+                ret, frame = cap.read()
+                if not ret or frame is None:
+                    break
+                img = self._prepare(frame)
+                with self._cond:
+                    if self._stopped:
+                        return
+                    self._ring.append((index, img))
+                    self._cond.notify_all()
+                index += 1
+        except Exception as exc:
+            self.error = exc
+        finally:
+            cap.release()
+            with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+
+    def _prepare(self, frame):
+        """Convert a BGR frame to an RGB PIL image fitted to the display box."""
+        target_w, target_h = self._size
+        h, w = frame.shape[:2]
+        scale = min(target_w / w, target_h / h)
+        new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if new_size != (w, h):
+            interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, new_size, interpolation=interp)
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
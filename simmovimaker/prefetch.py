@@ -0,0 +1,103 @@
+"""
+prefetch.py - Ordered, bounded read-ahead decoding of image sequences.
+
+The render paths used to alternate between ``cv2.imread`` and the encoder
+on a single thread.  :func:`prefetch_frames` decodes frames on a worker
+pool a bounded distance ahead of the consumer and yields them strictly in
+order, so decoding overlaps encoding and keeps every core busy while the
+number of decoded frames held in memory stays capped.
+"""
+
+import collections
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+# Upper bound on decoded-but-not-yet-consumed frame bytes (512 MiB).
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def default_workers():
+    """Return the default decoder worker count for this machine."""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def _imread(path):
+    """Default reader: decode *path* to a BGR array (``None`` on failure).
+
+    Defined at module level so it can be pickled for process pools.
+    """
+    import cv2
+    return cv2.imread(path)
+
+
+def prefetch_frames(items, reader=None, workers=None, depth=None,
+                    max_bytes=DEFAULT_MAX_BYTES, use_processes=False):
+    """Decode *items* ahead of the consumer and yield them in order.
+
+    Yields ``(index, item, frame)`` tuples, where *frame* is whatever
+    *reader* returned (``None`` for unreadable files, which callers skip).
+
+    Parameters
+    ----------
+    items : iterable
+        Image paths, or any objects understood by *reader*.
+    reader : callable, optional
+        ``reader(item) -> frame``; defaults to ``cv2.imread``.  Must be a
+        picklable module-level function when *use_processes* is True.
+    workers : int, optional
+        Number of decoder threads/processes (default: cores, at most 8).
+    depth : int, optional
+        Maximum number of frames decoded ahead of the consumer
+        (default: ``2 * workers``).
+    max_bytes : int, optional
+        Cap on the memory held by read-ahead frames.  Once the first frame
+        has been decoded its size is used to shrink *depth* so that
+        ``depth * frame_bytes <= max_bytes`` (never below one frame).
+    use_processes : bool
+        Use a process pool instead of threads.  ``cv2.imread`` releases the
+        GIL, so threads are the right choice for the default reader;
+        processes help readers that do heavy pure-Python work.
+    """
+    items = list(items)
+    if not items:
+        return
+    reader = reader or _imread
+    workers = max(1, int(workers or default_workers()))
+    depth = max(1, int(depth or 2 * workers))
+
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    pool = pool_cls(max_workers=workers)
+    pending = collections.deque()
+    next_submit = 0
+    try:
+        # Until the first frame reveals the per-frame size, only keep one
+        # frame per worker in flight so *max_bytes* is not overshot.
+        while next_submit < len(items) and len(pending) < min(depth, workers):
+            pending.append(pool.submit(reader, items[next_submit]))
+            next_submit += 1
+
+        index = 0
+        sized = False
+        while pending:
+            frame = pending.popleft().result()
+
+            if not sized and frame is not None:
+                sized = True
+                nbytes = getattr(frame, "nbytes", 0)
+                if max_bytes and nbytes:
+                    depth = max(1, min(depth, int(max_bytes // nbytes)))
+
+            # Top the window back up before handing the frame over so the
+            # workers keep decoding while the consumer encodes.
+            window = depth if sized else min(depth, workers)
+            while next_submit < len(items) and len(pending) < window:
+                pending.append(pool.submit(reader, items[next_submit]))
+                next_submit += 1
+
+            yield index, items[index], frame
+            index += 1
+    finally:
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=True)
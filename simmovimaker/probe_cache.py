@@ -0,0 +1,215 @@
+"""
+probe_cache.py - Memoized ffprobe results keyed by path, size and mtime.
+
+Selecting a file, trimming it, muting a section and estimating progress
+all need the same container and stream information.  :func:`probe` runs
+one full ``ffprobe -show_format -show_streams`` per file version and
+every consumer (:func:`video_ops.get_video_info`,
+:func:`video_ops.get_metadata`, progress estimation in
+:func:`ffmpeg_utils.run_ffmpeg`) reads from that result.
+
+Keyframe counts, which need a full demux pass, are stored alongside
+(:func:`probe_keyframes`).  Results are kept in an in-memory LRU and,
+optionally, a JSON store on disk so they survive restarts.  The key includes the file's size and
+modification time, so a changed file is probed again.
+"""
+
+import atexit
+import collections
+import json
+import os
+import threading
+
+from .ffmpeg_utils import run_ffprobe
+
+
+STORE_VERSION = 1
+
+# Entries held in memory (a probe result is a few KB at most).
+DEFAULT_MAX_ENTRIES = 2048
+
+# Field of a cached probe result holding its keyframe count, once counted.
+_KEYFRAMES = "simmovimaker_keyframes"
+
+# Persistent store used by the GUI.
+DEFAULT_STORE = os.path.join(os.path.expanduser("~"), ".simmovimaker",
+                             "probe_cache.json")
+
+
+def probe_key(path):
+    """Return ``(abspath, size, mtime_ns)`` for *path*, or ``None`` if it
+    cannot be stat'ed (then it is never cached)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+class ProbeCache:
+    """Thread-safe LRU of ffprobe results with an optional JSON store.
+
+    Parameters
+    ----------
+    max_entries : int
+        Results held in memory.
+    store : str, optional
+        JSON file the cache is loaded from and :meth:`flush` writes to.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, store=None):
+        self.max_entries = max(1, int(max_entries))
+        self.store = None
+        self._data = collections.OrderedDict()     # key -> probe dict
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if store:
+            self.open_store(store)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, path):
+        """Return the probe result for *path*, running ffprobe on a miss.
+
+        Raises whatever :func:`ffmpeg_utils.run_ffprobe` raises; failures
+        are not cached.
+        """
+        key = probe_key(path)
+        if key is not None:
+            with self._lock:
+                data = self._data.get(key)
+                if data is not None:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return data
+                self.misses += 1
+        output = run_ffprobe([
+            "-v", "quiet",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            path,
+        ])
+        data = json.loads(output or "{}")
+        if key is not None:
+            self._put(key, data)
+        return data
+
+    def keyframes(self, path):
+        """Return the number of keyframes in the first video stream of
+        *path*.
+
+        Counting reads every packet of the file, so the count is stored
+        with the file's probe result under the same (path, size, mtime)
+        key, in memory and in the store, and is redone only when the file
+        changes.
+        """
+        count = self.get(path).get(_KEYFRAMES)
+        if count is not None:
+            return count
+        output = run_ffprobe([
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=flags",
+            "-of", "csv=p=0",
+            path,
+        ])
+        count = sum(1 for line in output.splitlines() if "K" in line)
+        key = probe_key(path)
+        if key is not None:
+            with self._lock:
+                data = self._data.get(key)
+                if data is not None:
+                    data[_KEYFRAMES] = count
+                    self._dirty = True
+        return count
+
+    def invalidate(self, path):
+        """Forget every cached version of *path*."""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [k for k in self._data if k[0] == path]:
+                del self._data[key]
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._dirty = True
+
+    def open_store(self, filename):
+        """Load results from the JSON store *filename* and write back to it
+        on :meth:`flush` (and at interpreter exit)."""
+        self.store = filename
+        try:
+            with open(filename, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") == STORE_VERSION:
+            with self._lock:
+                for path, size, mtime, result in data.get("entries", []):
+                    self._data[(path, size, mtime)] = result
+                self._trim()
+        atexit.register(self.flush)
+
+    def flush(self):
+        """Write the cache to its store, if it has one and changed."""
+        with self._lock:
+            if self.store is None or not self._dirty:
+                return
+            entries = [[k[0], k[1], k[2], v] for k, v in self._data.items()]
+            self._dirty = False
+        data = {"version": STORE_VERSION, "entries": entries}
+        tmp = self.store + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.store)),
+                        exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self.store)
+        except OSError:
+            pass
+
+    # -- internal --
+
+    def _put(self, key, data):
+        with self._lock:
+            self._data[key] = data
+            self._data.move_to_end(key)
+            self._trim()
+            self._dirty = True
+
+    def _trim(self):
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+_shared_cache = ProbeCache()
+
+
+def shared_probe_cache():
+    """Return the process-wide probe cache."""
+    return _shared_cache
+
+
+def probe(path):
+    """Return the full ffprobe result (``format`` and ``streams``) for
+    *path* through the shared cache."""
+    return _shared_cache.get(path)
+
+
+def probe_keyframes(path):
+    """Return the keyframe count of *path* through the shared cache."""
+    return _shared_cache.keyframes(path)
+
+
+def probe_duration(path):
+    """Return the container duration of *path* in seconds, or ``None``."""
+    try:
+        return float(probe(path).get("format", {})["duration"])
+    except Exception:
+        return None
@@ -0,0 +1,292 @@
+"""
+stats.py - Streaming intensity statistics over whole frame sequences.
+
+Consistent exposure across a long sequence needs dataset-wide numbers
+(minimum, maximum, percentiles) rather than per-image guesses.
+:func:`compute_stats` gets them in one parallel pass without holding more
+than a few frames in memory: frames are read in chunks on a thread pool,
+each chunk is summarised by an :class:`IntensityStats`, and the partial
+results are merged.
+
+* 8- and 16-bit integer data is counted in an exact histogram (256 or
+  65536 bins), so percentiles are exact and merging is a vector add.
+* Other dtypes (float, wider integers) keep a fixed-size uniform sample
+  of their values; two samples are merged by drawing from each in
+  proportion to how many values it stands for.
+
+The result feeds the ``normalize`` filter (see
+:mod:`simmovimaker.filters`), which maps a chosen percentile range to
+0..255 at render time.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+
+# Values kept in the sample of non-integer data.
+DEFAULT_SAMPLE_SIZE = 200_000
+
+# Frames each worker reads per task.
+DEFAULT_CHUNK_FRAMES = 8
+
+# dtype -> (histogram bins, offset added to values to index them).
+_HISTOGRAM_LAYOUTS = {
+    np.dtype(np.uint8): (256, 0),
+    np.dtype(np.uint16): (65536, 0),
+    np.dtype(np.int16): (65536, 32768),
+}
+
+
+def default_workers():
+    """Return the default number of statistics worker threads."""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+class IntensityStats:
+    """Mergeable summary of the values of one or more frames.
+
+    Parameters
+    ----------
+    sample_size : int
+        Values kept for percentile estimates of non-integer data.
+    rng : numpy.random.Generator, optional
+        Source of randomness for sampling (seeded for reproducibility by
+        :func:`compute_stats`).
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, rng=None):
+        self.sample_size = max(1, int(sample_size))
+        self.count = 0
+        self.frames = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.histogram = None       # exact counts for 8/16-bit data
+        self.offset = 0
+        self.sample = np.empty(0)
+        self._rng = rng if rng is not None else np.random.default_rng()
+
+    def __repr__(self):
+        return (f"IntensityStats(frames={self.frames}, count={self.count}, "
+                f"min={self.min}, max={self.max})")
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        if not self.count:
+            return 0.0
+        return float(np.sqrt(max(0.0, self.total_sq / self.count - self.mean ** 2)))
+
+    @property
+    def exact(self):
+        """True when percentiles come from an exact histogram."""
+        return self.histogram is not None
+
+    def add(self, frame):
+        """Fold every value of *frame* (any shape) into the statistics.
+        NaN and infinite values are ignored.  Returns ``self``."""
+        values = np.asarray(frame).reshape(-1)
+        dtype = values.dtype
+        if np.issubdtype(dtype, np.floating):
+            values = values[np.isfinite(values)]
+        self.frames += 1
+        if values.size == 0:
+            return self
+        part = IntensityStats(self.sample_size, self._rng)
+        part.frames = 0
+        part.count = int(values.size)
+        part.min = float(values.min())
+        part.max = float(values.max())
+        as_float = values.astype(np.float64)
+        part.total = float(as_float.sum())
+        part.total_sq = float(np.dot(as_float, as_float))
+        layout = _HISTOGRAM_LAYOUTS.get(dtype)
+        if layout is not None:
+            bins, part.offset = layout
+            index = values.view(np.uint16) ^ np.uint16(0x8000) if part.offset else values
+            part.histogram = np.bincount(index, minlength=bins)
+        else:
+            part.sample = self._draw(as_float, self.sample_size)
+        return self.merge(part)
+
+    def merge(self, other):
+        """Fold the statistics *other* into this one.  Returns ``self``."""
+        self.frames += other.frames
+        if not other.count:
+            return self
+        if not self.count:
+            self.histogram = None if other.histogram is None else other.histogram.copy()
+            self.offset = other.offset
+            self.sample = other.sample
+        elif self._same_layout(other):
+            if self.histogram is not None:
+                self.histogram = self.histogram + other.histogram
+            else:
+                self.sample = self._combined_sample(self.sample, self.count,
+                                                    other.sample, other.count)
+        else:
+            # Mixed dtypes (e.g. 8- and 16-bit images): use samples for all.
+            self.sample = self._combined_sample(self._as_sample(), self.count,
+                                                other._as_sample(), other.count)
+            self.histogram = None
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.total += other.total
+        self.total_sq += other.total_sq
+        return self
+
+    def percentile(self, q):
+        """Return the *q*-th percentile(s) of all values added so far."""
+        if not self.count:
+            raise ValueError("No values to take percentiles of.")
+        q = np.asarray(q, dtype=np.float64)
+        if self.histogram is not None:
+            cumulative = np.cumsum(self.histogram)
+            ranks = np.clip(q, 0.0, 100.0) / 100.0 * (self.count - 1)
+            index = np.searchsorted(cumulative, ranks, side="right")
+            result = index.astype(np.float64) - self.offset
+        else:
+            result = np.percentile(self.sample, q)
+        return float(result) if result.ndim == 0 else result
+
+    def histogram_counts(self, bins=256):
+        """Return ``(counts, edges)`` over ``min..max`` with *bins* bins,
+        exact for 8/16-bit data and estimated from the sample otherwise."""
+        if not self.count:
+            raise ValueError("No values to build a histogram of.")
+        edges = np.linspace(self.min, self.max if self.max > self.min
+                            else self.min + 1, bins + 1)
+        if self.histogram is not None:
+            values = np.arange(len(self.histogram)) - self.offset
+            counts, _ = np.histogram(values, bins=edges, weights=self.histogram)
+            return counts.astype(np.int64), edges
+        counts, _ = np.histogram(self.sample, bins=edges)
+        return counts * (self.count / max(1, len(self.sample))), edges
+
+    def to_dict(self, percentiles=(0.5, 1, 5, 50, 95, 99, 99.5)):
+        """Return the summary as plain JSON-serialisable values."""
+        data = {
+            "frames": self.frames, "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": self.mean, "std": self.std, "exact": self.exact,
+        }
+        if self.count:
+            data["percentiles"] = {
+                f"{q:g}": float(v) for q, v in zip(percentiles,
+                                            np.atleast_1d(self.percentile(percentiles)))}
+        return data
+
+    # -- internal --
+
+    def _same_layout(self, other):
+        if self.histogram is None or other.histogram is None:
+            return self.histogram is None and other.histogram is None
+        return (self.offset == other.offset
+                and len(self.histogram) == len(other.histogram))
+
+    def _as_sample(self):
+        """Return a uniform sample of the values, expanding an exact
+        histogram if needed."""
+        if self.histogram is None:
+            return self.sample
+        values = np.arange(len(self.histogram), dtype=np.float64) - self.offset
+        p = self.histogram / self.count
+        return self._rng.choice(values, size=min(self.sample_size, self.count), p=p)
+
+    def _draw(self, values, size):
+        if len(values) <= size:
+            return values
+        return values[self._rng.integers(0, len(values), size=size)]
+
+    def _combined_sample(self, a, count_a, b, count_b):
+        """Merge two uniform samples standing for *count_a* and *count_b*
+        values into one of at most ``sample_size`` values."""
+        if len(a) + len(b) <= self.sample_size:
+            return np.concatenate([a, b])
+        from_a = self._rng.binomial(self.sample_size, count_a / (count_a + count_b))
+        from_a = min(from_a, len(a))
+        from_b = min(self.sample_size - from_a, len(b))
+        return np.concatenate([self._draw_without_replacement(a, from_a),
+                               self._draw_without_replacement(b, from_b)])
+
+    def _draw_without_replacement(self, values, size):
+        if len(values) <= size:
+            return values
+        return values[self._rng.choice(len(values), size=size, replace=False)]
+
+
+def compute_stats(frames, workers=None, chunk_frames=DEFAULT_CHUNK_FRAMES,
+                  sample_size=DEFAULT_SAMPLE_SIZE, transform=None, seed=0,
+                  progress_callback=None, cancel_check=None):
+    """Return the :class:`IntensityStats` of every frame in *frames*.
+
+    Parameters
+    ----------
+    frames : sequence
+        Anything with ``len`` and integer indexing that returns one frame
+        per index: an ``(N, H, W[, C])`` array or memory-mapped stack, or a
+        lazy reader such as :class:`simmovimaker.edits.SourceFrames`.
+        Frames are read only inside the worker that summarises them.
+    workers : int, optional
+        Worker threads (default: :func:`default_workers`).  NumPy and
+        OpenCV release the GIL for the heavy work.
+    chunk_frames : int
+        Frames per task.
+    transform : callable, optional
+        Applied to each frame before it is summarised, e.g.
+        :func:`simmovimaker.colormap.to_scalar` for luminance.
+    seed : int
+        Seed for the sampling of non-integer data.
+    progress_callback : callable, optional
+        ``progress_callback(done, total)`` in frames, called from the
+        calling thread.
+    cancel_check : callable, optional
+        Polled as chunks finish; once it returns True no further chunks
+        start and ``None`` is returned.
+    """
+    total = len(frames)
+    chunk_frames = max(1, int(chunk_frames))
+    starts = list(range(0, total, chunk_frames))
+    cancelled = threading.Event()
+
+    def _summarise(task, start):
+        stats = IntensityStats(sample_size, np.random.default_rng([seed, task]))
+        for i in range(start, min(start + chunk_frames, total)):
+            if cancelled.is_set():
+                break
+            frame = frames[i]
+            stats.add(frame if transform is None else transform(frame))
+        return stats
+
+    result = IntensityStats(sample_size, np.random.default_rng(seed))
+    done = 0
+    workers = max(1, int(workers or default_workers()))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_summarise, task, start): start
+                   for task, start in enumerate(starts)}
+        try:
+            for future in as_completed(futures):
+                result.merge(future.result())
+                done += min(chunk_frames, total - futures[future])
+                if progress_callback is not None:
+                    progress_callback(done, total)
+                if cancel_check is not None and cancel_check():
+                    cancelled.set()
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+        except BaseException:
+            cancelled.set()
+            for pending in futures:
+                pending.cancel()
+            raise
+    return result
@@ -0,0 +1,321 @@
+"""
+thumb_cache.py - Persistent, packed on-disk thumbnail atlas.
+
+Thumbnails are fixed-size RGB tiles stored back to back in a single
+``.atlas`` file with a small JSON index beside it, one atlas per project
+(or a shared default atlas for unsaved projects).  Entries are keyed by
+source path, tile size, video seek time or stack frame, and edit list;
+the source file's modification time is stored with each entry so edited
+files are regenerated instead of served stale.
+
+New tiles are only ever appended, so a slot the saved index points at is
+never overwritten, and the index is replaced atomically.  Once the file
+reaches its byte cap it is compacted: the most recently used tiles are
+copied into a new file that replaces the old one, and everything else
+(superseded and least recently used tiles) is dropped.  A lock file keeps
+a second process from writing to the same atlas.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+from PIL import Image
+
+
+ATLAS_VERSION = 2
+
+# Atlas used while the project has not been saved yet.
+DEFAULT_ATLAS_DIR = os.path.join(os.path.expanduser("~"), ".simmovimaker")
+
+# Default cap on the size of one atlas file (256 MiB).
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Share of the cap kept, most recently used first, when compacting.
+_KEEP_FRACTION = 0.75
+
+# The atlas file starts with a magic string and the id of its index, so a
+# crash between replacing the file and its index is detected on load.
+_MAGIC = b"SMMATLAS"
+_HEADER_BYTES = len(_MAGIC) + 16
+
+
+def thumb_key(path, size, time=None, ops=None, frame=None):
+    """Return the atlas key for a thumbnail of *path* (without mtime)."""
+    parts = [os.path.abspath(path), f"{size[0]}x{size[1]}"]
+    if time is not None:
+        parts.append(f"t={float(time):.3f}")
+    if frame is not None:
+        parts.append(f"f={int(frame)}")
+    if ops:
+        digest = hashlib.sha1(
+            json.dumps(ops, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        parts.append(f"ops={digest}")
+    return "|".join(parts)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _header(atlas_id):
+    return _MAGIC + bytes.fromhex(atlas_id)
+
+
+def _try_lock(fh):
+    """Take a non-blocking exclusive lock on the open file *fh*.  Returns
+    False if another process holds it.  The OS drops the lock when the
+    file is closed or the process dies."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class ThumbnailAtlas:
+    """Fixed-size RGB thumbnail tiles packed into one file.
+
+    Thread-safe; :meth:`get` and :meth:`put` may be called from thumbnail
+    worker threads.  Call :meth:`flush` to persist the index.
+
+    Parameters
+    ----------
+    filename : str
+        Atlas file; the index is ``filename + ".json"``.
+    size : tuple of int
+        ``(w, h)`` of every tile.
+    max_bytes : int
+        Size cap of the atlas file; reaching it triggers a compaction.
+
+    If another process already has the atlas open, :attr:`enabled` is
+    False and the atlas stores and returns nothing.
+    """
+
+    def __init__(self, filename, size, max_bytes=DEFAULT_MAX_BYTES):
+        self.filename = filename
+        self.index_filename = filename + ".json"
+        self.size = (int(size[0]), int(size[1]))
+        self._tile_bytes = self.size[0] * self.size[1] * 3
+        self.max_tiles = max(1, (int(max_bytes) - _HEADER_BYTES) // self._tile_bytes)
+        self._lock = threading.Lock()
+        self._entries = {}          # key -> [mtime_ns, slot, last_used]
+        self._next_slot = 0
+        self._clock = 0
+        self._atlas_id = uuid.uuid4().hex
+        self._dirty = False
+        self._fh = None
+        self._lock_fh = self._acquire_file_lock()
+        self.enabled = self._lock_fh is not None
+        if self.enabled:
+            self._load_index()
+
+    @classmethod
+    def for_project(cls, project_file, size):
+        """Return the atlas belonging to *project_file* (a ``.smp`` path),
+        or the shared default atlas if it is ``None``."""
+        if project_file:
+            base = os.path.splitext(project_file)[0]
+            return cls(base + ".thumbs.atlas", size)
+        return cls(os.path.join(DEFAULT_ATLAS_DIR, "thumbs.atlas"), size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -- public API --
+
+    def get(self, key, path):
+        """Return the cached tile for *key* as a PIL image, or ``None`` if it
+        is missing or older than *path*."""
+        with self._lock:
+            if not self.enabled:
+                return None
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != _mtime(path):
+                return None
+            try:
+                fh = self._open()
+                fh.seek(self._offset(entry[1]))
+                data = fh.read(self._tile_bytes)
+            except OSError:
+                return None
+            self._clock += 1
+            entry[2] = self._clock
+            self._dirty = True
+        if len(data) != self._tile_bytes:
+            return None
+        return Image.frombytes("RGB", self.size, data)
+
+    def put(self, key, path, img):
+        """Store PIL *img* (resized/padded to the atlas tile size)."""
+        if img.size != self.size or img.mode != "RGB":
+            tile = Image.new("RGB", self.size, (43, 43, 43))
+            img = img.convert("RGB")
+            img.thumbnail(self.size)
+            tile.paste(img, ((self.size[0] - img.width) // 2,
+                             (self.size[1] - img.height) // 2))
+            img = tile
+        data = img.tobytes()
+        mtime = _mtime(path)
+        with self._lock:
+            if not self.enabled:
+                return
+            if self._next_slot >= self.max_tiles:
+                self._compact()
+            slot = self._next_slot
+            try:
+                fh = self._open()
+                fh.seek(self._offset(slot))
+                fh.write(data)
+            except OSError:
+                return
+            self._next_slot += 1
+            self._clock += 1
+            self._entries[key] = [mtime, slot, self._clock]
+            self._dirty = True
+
+    def flush(self):
+        """Write pending tiles and the index to disk."""
+        with self._lock:
+            if not self.enabled:
+                return
+            if self._fh is not None:
+                try:
+                    self._fh.flush()
+                except OSError:
+                    pass
+            if self._dirty:
+                self._write_index()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if self._lock_fh is not None:
+                self._lock_fh.close()
+                self._lock_fh = None
+            self.enabled = False
+
+    # -- internal --
+
+    def _offset(self, slot):
+        return _HEADER_BYTES + slot * self._tile_bytes
+
+    def _acquire_file_lock(self):
+        """Return the locked ``.lock`` file of this atlas, or ``None`` if it
+        cannot be created or another process holds it."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.filename)),
+                        exist_ok=True)
+            fh = open(self.filename + ".lock", "a+b")
+        except OSError:
+            return None
+        if not _try_lock(fh):
+            fh.close()
+            return None
+        return fh
+
+    def _open(self):
+        """Return the atlas file, starting a new one if it is missing or
+        belongs to another index."""
+        if self._fh is None:
+            fh = None
+            try:
+                fh = open(self.filename, "r+b")
+                if fh.read(_HEADER_BYTES) != _header(self._atlas_id):
+                    fh.close()
+                    fh = None
+            except OSError:
+                pass
+            if fh is None:
+                fh = open(self.filename, "w+b")
+                fh.write(_header(self._atlas_id))
+            self._fh = fh
+        return self._fh
+
+    def _write_index(self):
+        data = {
+            "version": ATLAS_VERSION,
+            "id": self._atlas_id,
+            "size": list(self.size),
+            "entries": self._entries,
+        }
+        tmp = self.index_filename + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self.index_filename)
+            self._dirty = False
+        except OSError:
+            pass
+
+    def _compact(self):
+        """Rewrite the atlas with only the most recently used tiles.
+
+        The kept tiles are copied into a new file under a new id, which
+        replaces the atlas with ``os.replace``; the index is written right
+        after.  Called with the lock held.
+        """
+        keep = int(self.max_tiles * _KEEP_FRACTION)
+        ranked = sorted(self._entries.items(), key=lambda kv: kv[1][2],
+                        reverse=True)[:keep]
+        atlas_id = uuid.uuid4().hex
+        entries = {}
+        tmp = self.filename + ".tmp"
+        try:
+            src = self._open()
+            with open(tmp, "wb") as out:
+                out.write(_header(atlas_id))
+                for key, (mtime, slot, used) in ranked:
+                    src.seek(self._offset(slot))
+                    data = src.read(self._tile_bytes)
+                    if len(data) != self._tile_bytes:
+                        continue
+                    out.write(data)
+                    entries[key] = [mtime, len(entries), used]
+            self._fh.close()
+            self._fh = None
+            os.replace(tmp, self.filename)
+        except OSError:
+            entries = {}    # start over; the next _open() writes a new file
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+        self._entries = entries
+        self._next_slot = len(entries)
+        self._atlas_id = atlas_id
+        self._write_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_filename, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if (data.get("version") != ATLAS_VERSION
+                    or tuple(data.get("size", ())) != self.size):
+                return  # incompatible atlas; start over and overwrite it
+            atlas_id = data["id"]
+            with open(self.filename, "rb") as fh:
+                if fh.read(_HEADER_BYTES) != _header(atlas_id):
+                    return  # tiles and index do not belong together
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self._atlas_id = atlas_id
+        self._entries = {k: list(v) for k, v in data.get("entries", {}).items()}
+        if self._entries:
+            self._next_slot = max(e[1] for e in self._entries.values()) + 1
+            self._clock = max(e[2] for e in self._entries.values())
+        if self._next_slot > self.max_tiles:
+            with self._lock:
+                self._compact()
@@ -7,12 +7,19 @@ is delegated to the ffmpeg / ffprobe binaries via the ffmpeg_utils
 module in this package.
 """
 
-import json
+import glob
 import math
 import os
+import shutil
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from .ffmpeg_utils import run_ffmpeg, run_ffprobe, check_ffmpeg, FFmpegNotFoundError
+from .ffmpeg_utils import (
+    run_ffmpeg, run_ffprobe, get_capabilities, propagate_tracking,
+    FFmpegPipe, FFmpegNotFoundError,
+)
+from .probe_cache import probe, probe_keyframes
 
 
 # ---------------------------------------------------------------------------
@@ -20,11 +27,25 @@ from .ffmpeg_utils import run_ffmpeg, run_ffprobe, check_ffmpeg, FFmpegNotFoundE
 # ---------------------------------------------------------------------------
 
 def _ensure_ffmpeg():
-    """Raise FFmpegNotFoundError if ffmpeg is not available."""
-    if not check_ffmpeg()["available"]:
+    """Raise FFmpegNotFoundError if ffmpeg is not available.
+
+    Consults the capability registry, which is resolved once per process,
+    so calling this once per operation costs nothing after the first call.
+    """
+    if not get_capabilities().available:
         raise FFmpegNotFoundError("ffmpeg was not found on this system.")
 
 
+def _run_checked(args, action, progress_callback=None, **kwargs):
+    """Run ffmpeg with *args* and raise ``RuntimeError`` naming *action*
+    (e.g. ``"Muting in.mp4"``) with ffmpeg's log if it fails.  Keyword
+    arguments go to :func:`ffmpeg_utils.run_ffmpeg`; returns its result."""
+    result = run_ffmpeg(args, progress_callback=progress_callback, **kwargs)
+    if result.returncode != 0:
+        raise RuntimeError(f"{action} failed:\n{result.stderr}")
+    return result
+
+
 def _safe_float(value, default=0.0):
     """Convert *value* to float, returning *default* on failure."""
     try:
@@ -48,20 +69,13 @@ def _safe_int(value, default=0):
 def get_video_info(filepath):
     """Return a dict describing the video at *filepath*.
 
-    Keys: duration, width, height, fps, codec, audio_codec, bitrate,
-    file_size, format_name.
+    Keys: duration, width, height, fps, codec, pix_fmt, audio_codec,
+    bitrate, file_size, format_name.  The probe is cached per file version
+    (see :mod:`probe_cache`).
     """
     _ensure_ffmpeg()
 
-    args = [
-        "-v", "quiet",
-        "-print_format", "json",
-        "-show_format",
-        "-show_streams",
-        filepath,
-    ]
-    output = run_ffprobe(args)
-    data = json.loads(output)
+    data = probe(filepath)
 
     fmt = data.get("format", {})
     streams = data.get("streams", [])
@@ -90,6 +104,7 @@ def get_video_info(filepath):
         "height": _safe_int(video_stream.get("height")) if video_stream else 0,
         "fps": fps,
         "codec": video_stream.get("codec_name", "") if video_stream else "",
+        "pix_fmt": video_stream.get("pix_fmt", "") if video_stream else "",
         "audio_codec": audio_stream.get("codec_name", "") if audio_stream else "",
         "bitrate": _safe_int(fmt.get("bit_rate")),
         "file_size": _safe_int(fmt.get("size")),
@@ -102,21 +117,80 @@ def get_metadata(filepath):
     """Return all metadata tags from *filepath* as a dict."""
     _ensure_ffmpeg()
 
-    args = [
-        "-v", "quiet",
-        "-print_format", "json",
-        "-show_format",
-        filepath,
-    ]
-    output = run_ffprobe(args)
-    data = json.loads(output)
-    return data.get("format", {}).get("tags", {})
+    return dict(probe(filepath).get("format", {}).get("tags", {}))
+
+
+def count_keyframes(filepath):
+    """Return the number of keyframes in the first video stream.
+
+    Only packet flags are read (no decoding), so this costs one demux pass;
+    the result is cached per file version (see :mod:`probe_cache`).
+    """
+    _ensure_ffmpeg()
+
+    return probe_keyframes(filepath)
+
+
+def default_probe_workers():
+    """Return the default number of concurrent ffprobe processes.
+
+    Probing is mostly waiting on disk, so this exceeds the core count.
+    """
+    return max(2, min(16, (os.cpu_count() or 1) * 2))
+
+
+def iter_probe_videos(filepaths, max_workers=None, keyframes=True):
+    """Probe many videos concurrently, yielding ``(path, info)`` for each
+    as soon as it has been probed, so one slow file does not hold back
+    the rest.
+
+    *info* is the :func:`get_video_info` dict (plus ``keyframes`` if
+    requested), or ``None`` if the file could not be probed.
+    """
+    _ensure_ffmpeg()
+
+    def _probe(path):
+        try:
+            info = get_video_info(path)
+            if keyframes:
+                info["keyframes"] = count_keyframes(path)
+            return info
+        except Exception:
+            return None
+
+    paths = list(dict.fromkeys(filepaths))
+    if not paths:
+        return
+    workers = max(1, min(len(paths), max_workers or default_probe_workers()))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_probe, path): path for path in paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def probe_videos(filepaths, max_workers=None, keyframes=True):
+    """Probe many videos concurrently.
+
+    Returns a dict mapping each path to its :func:`get_video_info` dict
+    (plus ``keyframes`` if requested), or to ``None`` if it could not be
+    probed.
+    """
+    results = dict(iter_probe_videos(filepaths, max_workers, keyframes))
+    return {path: results[path] for path in dict.fromkeys(filepaths)}
 
 
 # ---------------------------------------------------------------------------
 # Merge / Split / Trim
 # ---------------------------------------------------------------------------
 
+def _write_concat_list(list_path, files):
+    """Write a concat-demuxer list naming *files* to *list_path*."""
+    with open(list_path, "w", encoding="utf-8") as fh:
+        for path in files:
+            safe = path.replace("'", "'\\''")
+            fh.write(f"file '{safe}'\n")
+
+
 def merge_videos(input_files, output_file, progress_callback=None):
     """Concatenate *input_files* (list of paths) into *output_file*.
 
@@ -126,11 +200,9 @@ def merge_videos(input_files, output_file, progress_callback=None):
     _ensure_ffmpeg()
 
     fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="smm_concat_")
+    os.close(fd)
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as fh:
-            for path in input_files:
-                safe = path.replace("'", "'\\''")
-                fh.write(f"file '{safe}'\n")
+        _write_concat_list(list_path, input_files)
 
         args = [
             "-f", "concat",
@@ -139,7 +211,8 @@ def merge_videos(input_files, output_file, progress_callback=None):
             "-c", "copy",
             output_file,
         ]
-        run_ffmpeg(args, progress_callback=progress_callback)
+        _run_checked(args, f"Merging into {output_file}",
+                     progress_callback=progress_callback)
     finally:
         if os.path.exists(list_path):
             os.remove(list_path)
@@ -151,7 +224,9 @@ def split_video(input_file, output_dir, split_points, progress_callback=None):
     """Split *input_file* at each time in *split_points* (seconds).
 
     Segments are written to *output_dir* with names like
-    ``basename_001.ext``, ``basename_002.ext``, etc.
+    ``basename_001.ext``, ``basename_002.ext``, etc.  The input is read
+    once; since streams are copied, each cut lands on the first keyframe
+    at or after its split point.
 
     Returns a list of output file paths.
     """
@@ -160,52 +235,251 @@ def split_video(input_file, output_dir, split_points, progress_callback=None):
     os.makedirs(output_dir, exist_ok=True)
 
     base, ext = os.path.splitext(os.path.basename(input_file))
-    sorted_points = sorted(split_points)
+    points = sorted(float(p) for p in split_points if float(p) > 0)
 
-    # Build segment boundaries: [0, p1, p2, ..., end]
-    boundaries = [0.0] + [float(p) for p in sorted_points]
-    # We do not know the duration yet -- use None to mean "until end".
-    segments = []
-    for i in range(len(boundaries)):
-        start = boundaries[i]
-        end = boundaries[i + 1] if i + 1 < len(boundaries) else None
-        segments.append((start, end))
-
-    output_paths = []
-    for idx, (start, end) in enumerate(segments, start=1):
-        out_name = f"{base}_{idx:03d}{ext}"
-        out_path = os.path.join(output_dir, out_name)
-
-        args = ["-i", input_file, "-ss", str(start)]
-        if end is not None:
-            args += ["-to", str(end)]
-        args += ["-c", "copy", out_path]
-
-        run_ffmpeg(args, progress_callback=progress_callback)
-        output_paths.append(out_path)
-
-    return output_paths
+    # One pass over the input with the segment muxer; progress is reported
+    # against the duration of the whole file.
+    pattern = os.path.join(output_dir, f"{base}_%03d{ext}")
+    return _segment_copy(input_file, pattern, points, start_number=1,
+                         progress_callback=progress_callback)
 
 
 def trim_video(input_file, output_file, start_time, end_time,
-               progress_callback=None):
+               progress_callback=None, accurate=True):
     """Trim *input_file* between *start_time* and *end_time* (seconds).
 
-    Uses ``-c copy`` for speed.  Returns *output_file*.
+    The input is seeked directly to *start_time*, so nothing before the
+    cut is read.  With *accurate* (the default) the cut is frame-exact:
+    the whole GOPs inside the range are stream-copied and only the partial
+    GOPs at either end are re-encoded (a "smart cut").  With
+    ``accurate=False`` everything is stream-copied and the start snaps to
+    the preceding keyframe.  Returns *output_file*.
     """
     _ensure_ffmpeg()
 
+    start_time = max(0.0, float(start_time))
+    end_time = float(end_time)
+    if end_time <= start_time:
+        raise ValueError("Trim end must be after its start.")
+
+    if accurate:
+        _smart_cut(input_file, output_file, start_time, end_time,
+                   progress_callback)
+        return output_file
+
     args = [
+        "-ss", f"{start_time:.6f}",
         "-i", input_file,
-        "-ss", str(start_time),
-        "-to", str(end_time),
+        "-t", f"{end_time - start_time:.6f}",
         "-c", "copy",
         output_file,
     ]
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Trimming {input_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
+# Encoders (in order of preference) used to re-encode the partial GOPs of a
+# smart cut, by source codec.
+_SMART_CUT_ENCODERS = {
+    "h264": ("libx264", "libopenh264"),
+    "hevc": ("libx265",),
+    "mpeg2video": ("mpeg2video",),
+    "mpeg4": ("mpeg4",),
+    "vp8": ("libvpx",),
+    "vp9": ("libvpx-vp9",),
+    "av1": ("libsvtav1", "libaom-av1"),
+}
+
+# ffprobe profile names -> ``-profile:v`` values of encoders whose profile
+# is not implied by the pixel format.  A source profile missing here cannot
+# be reproduced, so such trims fall back to a full re-encode.
+_SMART_CUT_PROFILES = {
+    "libx264": {"Constrained Baseline": "baseline", "Baseline": "baseline",
+                "Main": "main", "High": "high", "High 10": "high10",
+                "High 4:2:2": "high422", "High 4:4:4 Predictive": "high444"},
+    "libopenh264": {"Constrained Baseline": "constrained_baseline",
+                    "Main": "main", "High": "high"},
+    "libx265": {"Main": "main", "Main 10": "main10",
+                "Main Still Picture": "mainstillpicture"},
+    "mpeg2video": {"4:2:2": "0", "High": "1", "Main": "4", "Simple": "5"},
+    "mpeg4": {"Simple Profile": "0", "Advanced Simple Profile": "15"},
+}
+
+# Encoders whose profile follows from the pixel format alone.
+_PROFILE_FROM_PIX_FMT = ("libvpx", "libvpx-vp9", "libsvtav1", "libaom-av1")
+
+# Codecs whose intermediate pieces go in MPEG-TS so every piece carries its
+# own in-band parameter sets through the concat.
+_ANNEXB_CODECS = ("h264", "hevc", "mpeg2video")
+
+# Seek offset (seconds) that keeps input seeking from landing one keyframe
+# early because of rounding in ffprobe's timestamps.
+_KEYFRAME_EPSILON = 0.001
+
+
+def _keyframe_times(input_file, start_time, end_time):
+    """Return the sorted keyframe times of the first video stream between
+    *start_time* and *end_time*, reading only that interval."""
+    output = run_ffprobe([
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-read_intervals", f"{start_time:.6f}%{end_time:.6f}",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        input_file,
+    ])
+    times = []
+    for line in output.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) >= 2 and "K" in parts[1] and parts[0] not in ("", "N/A"):
+            t = _safe_float(parts[0], None)
+            if t is not None and start_time <= t <= end_time:
+                times.append(t)
+    return sorted(set(times))
+
+
+def _stream_bitrate(stream):
+    """Return the bitrate of *stream* in bit/s, or 0 if unknown.  Matroska
+    stores it as a ``BPS`` tag instead of ``bit_rate``."""
+    rate = _safe_int(stream.get("bit_rate"))
+    if not rate:
+        tags = stream.get("tags") or {}
+        rate = _safe_int(tags.get("BPS") or tags.get("BPS-eng"))
+    return rate
+
+
+def _level_args(encoder, level):
+    """Encoder arguments for the ffprobe *level* of the source stream."""
+    if encoder == "libx264":
+        return ["-level:v", "1b" if level == 9 else f"{level / 10:g}"]
+    if encoder == "libx265":
+        return ["-x265-params", f"level-idc={level / 30:g}"]
+    if encoder in ("mpeg2video", "mpeg4"):
+        return ["-level:v", str(level)]
+    return []
+
+
+def _smart_cut_encode_args(input_file, encoder, caps):
+    """Return arguments that make *encoder* produce pieces matching the
+    first video stream of *input_file* (pixel format, profile, level and
+    stream bitrate), so they can be joined to stream-copied GOPs.
+
+    Returns ``None`` if any of them cannot be matched.
+    """
+    stream = next((s for s in probe(input_file).get("streams", [])
+                   if s.get("codec_type") == "video"), None)
+    if stream is None:
+        return None
+    pix_fmt = stream.get("pix_fmt")
+    bitrate = _stream_bitrate(stream)
+    if not pix_fmt or not bitrate:
+        return None
+    supported = caps.encoder_pix_fmts(encoder)
+    if supported and pix_fmt not in supported:
+        return None
+    args = ["-c:v", encoder, "-pix_fmt", pix_fmt, "-b:v", str(bitrate)]
+    if encoder in _SMART_CUT_PROFILES:
+        profile = _SMART_CUT_PROFILES[encoder].get(stream.get("profile"))
+        if profile is None:
+            return None
+        args += ["-profile:v", profile]
+    elif encoder not in _PROFILE_FROM_PIX_FMT:
+        return None
+    level = _safe_int(stream.get("level"))
+    if level > 0:
+        args += _level_args(encoder, level)
+    return args
+
+
+def _smart_cut(input_file, output_file, start_time, end_time,
+               progress_callback=None):
+    """Frame-accurate trim that re-encodes only the partial GOPs at the
+    ends of the range and stream-copies everything between.
+
+    The re-encoded pieces must match the source stream (see
+    :func:`_smart_cut_encode_args`); when they cannot, the whole range is
+    re-encoded instead."""
+    info = get_video_info(input_file)
+    caps = get_capabilities()
+    encoder = caps.first_encoder(*_SMART_CUT_ENCODERS.get(info["codec"], ()))
+    encode_args = (_smart_cut_encode_args(input_file, encoder, caps)
+                   if encoder else None)
+    if encode_args is not None:
+        keyframes = _keyframe_times(input_file, start_time, end_time)
+    else:
+        keyframes = []
+        encoder = encoder or caps.first_encoder("libx264", "mpeg4") or "libx264"
+        encode_args = ["-c:v", encoder]
+        supported = caps.encoder_pix_fmts(encoder)
+        if info["pix_fmt"] and (not supported or info["pix_fmt"] in supported):
+            encode_args += ["-pix_fmt", info["pix_fmt"]]
+
+    duration = end_time - start_time
+    if len(keyframes) < 2:
+        # No whole GOP inside the range, or the source cannot be matched:
+        # re-encode it, audio copied.
+        args = ["-ss", f"{start_time:.6f}", "-i", input_file,
+                "-t", f"{duration:.6f}"] + encode_args + ["-c:a", "copy",
+                                                          output_file]
+        _run_checked(args, f"Trimming {input_file}",
+                     progress_callback=progress_callback)
+        return
+
+    first_key, last_key = keyframes[0], keyframes[-1]
+    ext = ".ts" if info["codec"] in _ANNEXB_CODECS else ".mkv"
+    workdir = tempfile.mkdtemp(prefix=".smm_trim_",
+                               dir=os.path.dirname(os.path.abspath(output_file)))
+    done = [0.0]
+
+    def _step(args, span):
+        def _cb(percent):
+            if progress_callback is not None:
+                progress_callback(min(100.0, (done[0] + span * percent / 100.0)
+                                      / duration * 100.0))
+        _run_checked(args, f"Trimming {input_file}", progress_callback=_cb)
+        done[0] += span
+
+    try:
+        pieces = []
+        # Head: partial GOP before the first keyframe, re-encoded.
+        if first_key - start_time > _KEYFRAME_EPSILON:
+            head = os.path.join(workdir, "head" + ext)
+            _step(["-ss", f"{start_time:.6f}", "-i", input_file,
+                   "-t", f"{first_key - start_time:.6f}", "-map", "0:v:0"]
+                  + encode_args + ["-y", head], first_key - start_time)
+            pieces.append(head)
+
+        # Middle: whole GOPs, stream-copied.
+        middle = os.path.join(workdir, "middle" + ext)
+        _step(["-ss", f"{first_key + _KEYFRAME_EPSILON:.6f}", "-i", input_file,
+               "-t", f"{last_key - first_key:.6f}", "-map", "0:v:0",
+               "-c", "copy", "-y", middle], last_key - first_key)
+        pieces.append(middle)
+
+        # Tail: from the last keyframe to the cut, re-encoded.
+        if end_time - last_key > _KEYFRAME_EPSILON:
+            tail = os.path.join(workdir, "tail" + ext)
+            _step(["-ss", f"{last_key:.6f}", "-i", input_file,
+                   "-t", f"{end_time - last_key:.6f}", "-map", "0:v:0"]
+                  + encode_args + ["-y", tail], end_time - last_key)
+            pieces.append(tail)
+
+        # Join the video pieces and copy the audio for the same range.
+        list_path = os.path.join(workdir, "concat.txt")
+        _write_concat_list(list_path, pieces)
+        args = ["-f", "concat", "-safe", "0", "-i", list_path,
+                "-ss", f"{start_time:.6f}", "-t", f"{duration:.6f}",
+                "-i", input_file,
+                "-map", "0:v:0", "-map", "1:a:0?",
+                "-c", "copy", "-y", output_file]
+        _run_checked(args, f"Trimming {input_file}")
+        if progress_callback is not None:
+            progress_callback(100.0)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
 # ---------------------------------------------------------------------------
 # Audio operations
 # ---------------------------------------------------------------------------
@@ -220,7 +494,8 @@ def mute_audio(input_file, output_file, progress_callback=None):
         "-an",
         output_file,
     ]
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Muting {input_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
@@ -234,7 +509,8 @@ def extract_audio(input_file, output_file, progress_callback=None):
         "-acodec", "copy",
         output_file,
     ]
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Extracting audio from {input_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
@@ -268,7 +544,8 @@ def add_audio(video_file, audio_file, output_file, replace=True,
         ]
     args.append(output_file)
 
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Adding audio to {video_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
@@ -277,11 +554,12 @@ def add_audio(video_file, audio_file, output_file, replace=True,
 # ---------------------------------------------------------------------------
 
 def change_speed(input_file, output_file, speed_factor,
-                 progress_callback=None):
+                 progress_callback=None, segments=None):
     """Change playback speed of *input_file* by *speed_factor*.
 
-    A factor of 2.0 doubles the speed; 0.5 halves it.
-    Returns *output_file*.
+    A factor of 2.0 doubles the speed; 0.5 halves it.  With *segments*
+    > 1 the video is encoded in that many parallel chunks (see
+    :func:`_encode_in_segments`).  Returns *output_file*.
     """
     _ensure_ffmpeg()
 
@@ -301,33 +579,227 @@ def change_speed(input_file, output_file, speed_factor,
     atempo_filters.append(f"atempo={remaining}")
     audio_filter = ",".join(atempo_filters)
 
+    if segments and segments > 1:
+        return _encode_in_segments(
+            input_file, output_file, segments,
+            video_args=["-filter:v", video_filter],
+            audio_args=["-filter:a", audio_filter],
+            retimed=True, progress_callback=progress_callback)
+
     args = [
         "-i", input_file,
         "-filter:v", video_filter,
         "-filter:a", audio_filter,
         output_file,
     ]
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Changing the speed of {input_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
 def convert_format(input_file, output_file, codec=None, bitrate=None,
-                   progress_callback=None):
+                   progress_callback=None, segments=None):
     """Convert *input_file* to a different format / codec.
 
-    The target format is inferred from the *output_file* extension.
-    Returns *output_file*.
+    The target format is inferred from the *output_file* extension.  With
+    *segments* > 1 the video is encoded in that many parallel chunks (see
+    :func:`_encode_in_segments`).  Returns *output_file*.
     """
     _ensure_ffmpeg()
 
-    args = ["-i", input_file]
+    video_args = []
     if codec:
-        args += ["-c:v", codec]
+        video_args += ["-c:v", codec]
     if bitrate:
-        args += ["-b:v", str(bitrate)]
-    args.append(output_file)
+        video_args += ["-b:v", str(bitrate)]
+
+    if segments and segments > 1:
+        return _encode_in_segments(input_file, output_file, segments,
+                                   video_args=video_args,
+                                   progress_callback=progress_callback)
+
+    args = ["-i", input_file] + video_args + [output_file]
+    _run_checked(args, f"Converting {input_file}",
+                 progress_callback=progress_callback)
+    return output_file
+
+
+# ---------------------------------------------------------------------------
+# Parallel segment encoding
+# ---------------------------------------------------------------------------
+
+# Inputs shorter than this many seconds per segment are encoded in one pass.
+_MIN_SEGMENT_SECONDS = 10.0
+
+# Segment length (seconds) that puts a whole input in one segment.
+_WHOLE_FILE_SEGMENT = 10 ** 9
+
+
+def _count_video_frames(path):
+    """Return the number of video packets (frames) in *path*."""
+    output = run_ffprobe([
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-count_packets",
+        "-show_entries", "stream=nb_read_packets",
+        "-of", "csv=p=0",
+        path,
+    ])
+    return _safe_int(output.strip().split(",")[0])
+
+
+def _segment_copy(input_file, pattern, split_times, extra_args=(),
+                  start_number=0, progress_callback=None):
+    """Cut *input_file* at *split_times* (seconds) in one stream-copy pass.
+
+    Uses ffmpeg's segment muxer, which reads the input once and starts each
+    segment at the first keyframe at or after its split time.  With no
+    *split_times* the whole input is copied to one segment.  *pattern*
+    is a ``%03d``-style output pattern (existing files are overwritten);
+    *extra_args* go before the output options (e.g. stream maps).
+    Returns the segment paths in order.
+    """
+    directory = os.path.dirname(pattern) or "."
+    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix=".segments_",
+                                     dir=directory)
+    os.close(fd)
+    try:
+        args = ["-i", input_file] + list(extra_args) + [
+            "-c", "copy",
+            "-f", "segment",
+            "-reset_timestamps", "1",
+            "-segment_start_number", str(start_number),
+            "-segment_list", list_path,
+            "-segment_list_type", "flat",
+        ]
+        if split_times:
+            args += ["-segment_times",
+                     ",".join(f"{t:.6f}" for t in split_times)]
+        else:
+            # Without split times the muxer falls back to 2 s segments;
+            # ask for one segment longer than any input instead.
+            args += ["-segment_time", str(_WHOLE_FILE_SEGMENT)]
+        args += ["-y", pattern]
+        _run_checked(args, f"Splitting {input_file}",
+                     progress_callback=progress_callback)
+
+        with open(list_path, "r", encoding="utf-8") as fh:
+            names = [line.strip() for line in fh if line.strip()]
+    finally:
+        try:
+            os.remove(list_path)
+        except OSError:
+            pass
+    return [os.path.join(directory, os.path.basename(name)) for name in names]
+
+
+def _encode_in_segments(input_file, output_file, segments, video_args,
+                        audio_args=(), retimed=False, progress_callback=None):
+    """Encode *input_file* as *segments* chunks in parallel, then join them.
+
+    1. The video stream is cut at keyframes into chunks with a single
+       stream-copy pass (:func:`_segment_copy`).
+    2. Every chunk is encoded with *video_args* on its own ffmpeg process,
+       while the audio track is encoded once, whole, with *audio_args* so
+       no codec priming gaps appear at chunk boundaries.
+    3. The encoded chunks are joined losslessly with the concat demuxer
+       and muxed with the audio.
+
+    The frame counts are verified at every step: the chunks must add up to
+    the source, each encoded chunk must match its source chunk (unless
+    *retimed*, where filters may legitimately drop frames), and the joined
+    output must match the encoded chunks.  A mismatch raises
+    ``RuntimeError``.  Streams other than the first video and audio
+    stream are not carried over.
+    """
+    info = get_video_info(input_file)
+    duration = info["duration"]
+    segments = int(min(segments, duration // _MIN_SEGMENT_SECONDS))
+    if segments <= 1:
+        args = ["-i", input_file] + list(video_args) + list(audio_args) + [output_file]
+        _run_checked(args, f"Encoding {input_file}",
+                     progress_callback=progress_callback)
+        return output_file
+
+    out_ext = os.path.splitext(output_file)[1] or ".mkv"
+    src_ext = os.path.splitext(input_file)[1] or ".mkv"
+    workdir = tempfile.mkdtemp(prefix=".smm_segments_",
+                               dir=os.path.dirname(os.path.abspath(output_file)))
+
+    lock = threading.Lock()
+    progress = {}       # task name -> percent
+
+    def _report(name, weight):
+        def _cb(percent):
+            if progress_callback is None:
+                return
+            with lock:
+                progress[name] = percent * weight
+                total = sum(progress.values())
+            progress_callback(min(total, 100.0))
+        return _cb
+
+    try:
+        # 1. Lossless keyframe split (10% of the progress bar).
+        split_times = [duration * i / segments for i in range(1, segments)]
+        parts = _segment_copy(
+            input_file, os.path.join(workdir, f"src_%04d{src_ext}"), split_times,
+            extra_args=["-map", "0:v:0"],
+            progress_callback=_report("split", 0.10))
+        source_frames = _count_video_frames(input_file)
+        part_frames = [_count_video_frames(p) for p in parts]
+        if sum(part_frames) != source_frames:
+            raise RuntimeError(
+                f"Segment verification failed: chunks hold {sum(part_frames)} "
+                f"frames, source has {source_frames}.")
+
+        # 2. Encode chunks and the audio track concurrently (80%).
+        weight = 0.80 / (len(parts) + (1 if info["audio_codec"] else 0))
+        tasks = []
+        encoded = []
+        for i, part in enumerate(parts):
+            out = os.path.join(workdir, f"enc_{i:04d}{out_ext}")
+            encoded.append(out)
+            tasks.append((["-i", part] + list(video_args) + ["-an", "-y", out],
+                          _report(f"enc{i}", weight)))
+        audio_path = None
+        if info["audio_codec"]:
+            audio_path = os.path.join(workdir, f"audio{out_ext}")
+            tasks.append((["-i", input_file, "-vn"] + list(audio_args)
+                          + ["-y", audio_path], _report("audio", weight)))
+
+        def _run(task):
+            args, cb = task
+            _run_checked(args, "Segment encode", progress_callback=cb)
+
+        with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+            for _ in pool.map(propagate_tracking(_run), tasks):
+                pass
+
+        encoded_frames = [_count_video_frames(p) for p in encoded]
+        if not retimed and encoded_frames != part_frames:
+            raise RuntimeError(
+                "Segment verification failed: encoded chunk frame counts "
+                f"{encoded_frames} differ from source chunks {part_frames}.")
+
+        # 3. Lossless join + audio mux (10%).
+        list_path = os.path.join(workdir, "concat.txt")
+        _write_concat_list(list_path, encoded)
+        args = ["-f", "concat", "-safe", "0", "-i", list_path]
+        if audio_path:
+            args += ["-i", audio_path, "-map", "0:v:0", "-map", "1:a:0"]
+        args += ["-c", "copy", "-y", output_file]
+        _run_checked(args, "Joining segments",
+                     progress_callback=_report("join", 0.10))
+
+        output_frames = _count_video_frames(output_file)
+        if output_frames != sum(encoded_frames):
+            raise RuntimeError(
+                f"Segment verification failed: output has {output_frames} "
+                f"frames, encoded chunks hold {sum(encoded_frames)}.")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
 
-    run_ffmpeg(args, progress_callback=progress_callback)
     return output_file
 
 
@@ -355,15 +827,167 @@ def extract_frames(input_file, output_dir, fps=None, format="png",
         args += ["-vf", f"fps={fps}"]
     args += [pattern]
 
-    run_ffmpeg(args, progress_callback=progress_callback)
+    # The image muxer numbers files from 1, so the final frame count from
+    # the progress channel names every file written.
+    last = {}
+    _run_checked(args, f"Extracting frames from {input_file}",
+                 progress_callback=progress_callback,
+                 stats_callback=last.update)
+    count = last.get("frame")
+    if count is None:
+        return sorted(
+            os.path.join(output_dir, f)
+            for f in os.listdir(output_dir)
+            if f.startswith(base + "_") and f.endswith(f".{format}")
+        )
+    return [pattern % i for i in range(1, count + 1)
+            if os.path.isfile(pattern % i)]
+
 
-    # Collect the files that were written.
-    extracted = sorted(
-        os.path.join(output_dir, f)
-        for f in os.listdir(output_dir)
-        if f.startswith(base + "_") and f.endswith(f".{format}")
-    )
-    return extracted
+# ---------------------------------------------------------------------------
+# Frame streaming
+# ---------------------------------------------------------------------------
+
+# Raw pixel formats iter_frames can produce, and their channel counts.
+FRAME_PIX_FMTS = {"rgb24": 3, "bgr24": 3, "rgba": 4, "gray": 1}
+
+
+def _display_size(filepath):
+    """Return the ``(width, height)`` ffmpeg decodes *filepath* to, taking
+    rotation metadata (which ffmpeg applies automatically) into account."""
+    streams = probe(filepath).get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise ValueError(f"No video stream in {filepath}")
+    width, height = _safe_int(video.get("width")), _safe_int(video.get("height"))
+    rotation = _safe_float(video.get("tags", {}).get("rotate"))
+    for side_data in video.get("side_data_list", []):
+        if "rotation" in side_data:
+            rotation = _safe_float(side_data["rotation"])
+    if int(round(rotation)) % 180 != 0:
+        width, height = height, width
+    return width, height
+
+
+def _read_into(stream, view):
+    """Fill memoryview *view* from *stream*; return the bytes read (fewer
+    only at end of stream)."""
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def iter_frames(input_file, fps=None, width=None, height=None,
+                start_time=None, end_time=None, batch_size=None,
+                pix_fmt="rgb24"):
+    """Decode *input_file* and yield its frames as NumPy uint8 arrays.
+
+    ffmpeg decodes to ``-f rawvideo`` on a pipe; each read fills a fresh
+    buffer that the yielded array views directly, so no pixel data is
+    copied and no images touch the disk.
+
+    Parameters
+    ----------
+    fps : float, optional
+        Sample frames at this rate (default: every frame).
+    width, height : int, optional
+        Scale frames to this size; if only one is given the other keeps
+        the aspect ratio.
+    start_time, end_time : float, optional
+        Range in seconds (input-side seek, so earlier data is skipped).
+    batch_size : int, optional
+        Yield ``(n, H, W, C)`` batches of up to this many frames instead
+        of single ``(H, W, C)`` frames.
+    pix_fmt : str
+        One of :data:`FRAME_PIX_FMTS`; ``"gray"`` frames are ``(H, W)``.
+
+    Raises ``RuntimeError`` if ffmpeg fails.  Closing the generator early
+    stops ffmpeg.
+    """
+    import numpy as np
+
+    _ensure_ffmpeg()
+    if pix_fmt not in FRAME_PIX_FMTS:
+        raise ValueError(f"Unsupported pixel format {pix_fmt!r} "
+                         f"(expected one of {', '.join(FRAME_PIX_FMTS)})")
+
+    src_w, src_h = _display_size(input_file)
+    if width and not height:
+        height = max(1, round(src_h * width / src_w))
+    elif height and not width:
+        width = max(1, round(src_w * height / src_h))
+    out_w, out_h = (int(width), int(height)) if width else (src_w, src_h)
+
+    filters = []
+    if fps is not None:
+        filters.append(f"fps={fps}")
+    if (out_w, out_h) != (src_w, src_h):
+        filters.append(f"scale={out_w}:{out_h}")
+
+    args = []
+    if start_time:
+        args += ["-ss", f"{float(start_time):.6f}"]
+    args += ["-i", input_file]
+    if end_time is not None:
+        args += ["-t", f"{float(end_time) - float(start_time or 0):.6f}"]
+    args += ["-map", "0:v:0"]
+    if filters:
+        args += ["-vf", ",".join(filters)]
+    args += ["-f", "rawvideo", "-pix_fmt", pix_fmt, "pipe:1"]
+
+    channels = FRAME_PIX_FMTS[pix_fmt]
+    frame_shape = (out_h, out_w) if channels == 1 else (out_h, out_w, channels)
+    frame_bytes = out_w * out_h * channels
+    per_read = max(1, int(batch_size or 1))
+
+    pipe = FFmpegPipe(args)
+    try:
+        while True:
+            buf = bytearray(frame_bytes * per_read)
+            got = _read_into(pipe.stdout, memoryview(buf))
+            n = got // frame_bytes
+            if n:
+                frames = np.frombuffer(buf, dtype=np.uint8, count=n * frame_bytes)
+                frames = frames.reshape((n,) + frame_shape)
+                yield frames if batch_size else frames[0]
+            if got < len(buf):
+                break
+        pipe.finish()
+    finally:
+        pipe.close()
+
+
+def save_frames_npy(input_file, output_file, progress_callback=None,
+                    **frame_options):
+    """Write the frames of *input_file* to one ``.npy`` stack.
+
+    *frame_options* are passed to :func:`iter_frames`.  The result can be
+    opened with ``np.load(output_file, mmap_mode="r")``.  Returns the
+    stack's shape.
+    """
+    from .frame_stack import NpyStackWriter
+
+    frame_options.setdefault("batch_size", 16)
+    expected = None
+    if progress_callback is not None:
+        info = get_video_info(input_file)
+        start = frame_options.get("start_time") or 0.0
+        end = frame_options.get("end_time") or info["duration"]
+        rate = frame_options.get("fps") or info["fps"]
+        expected = max(1.0, (end - start) * rate)
+
+    with NpyStackWriter(output_file) as writer:
+        for batch in iter_frames(input_file, **frame_options):
+            writer.write_batch(batch)
+            if expected:
+                progress_callback(min(100.0, writer.frames_written / expected * 100.0))
+    if progress_callback is not None:
+        progress_callback(100.0)
+    return writer.shape
 
 
 # ---------------------------------------------------------------------------
@@ -385,7 +1009,8 @@ def strip_metadata(input_file, output_file, progress_callback=None):
         "-c", "copy",               # Stream copy (fast)
         "-y", output_file,
     ]
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Stripping metadata from {input_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
@@ -409,7 +1034,8 @@ def strip_metadata_deep(input_file, output_file, progress_callback=None):
         "-c:a", "aac", "-b:a", "192k",
         "-y", output_file,
     ]
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Stripping metadata from {input_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
@@ -426,7 +1052,8 @@ def set_metadata(input_file, output_file, metadata_dict,
         args += ["-metadata", f"{key}={value}"]
     args += ["-c", "copy", output_file]
 
-    run_ffmpeg(args, progress_callback=progress_callback)
+    _run_checked(args, f"Writing metadata to {output_file}",
+                 progress_callback=progress_callback)
     return output_file
 
 
@@ -457,7 +1084,8 @@ def create_gif(input_file, output_file, fps=10, width=480,
             "-y",
             palette_path,
         ]
-        run_ffmpeg(args_palette, progress_callback=progress_callback)
+        _run_checked(args_palette, f"Creating {output_file}",
+                     progress_callback=progress_callback)
 
         # Pass 2 -- render GIF with palette.
         args_gif = [
@@ -466,9 +1094,79 @@ def create_gif(input_file, output_file, fps=10, width=480,
             "-lavfi", f"{filters} [x]; [x][1:v] paletteuse",
             output_file,
         ]
-        run_ffmpeg(args_gif, progress_callback=progress_callback)
+        _run_checked(args_gif, f"Creating {output_file}",
+                     progress_callback=progress_callback)
     finally:
         if os.path.exists(palette_path):
             os.remove(palette_path)
 
     return output_file
+
+
+# ---------------------------------------------------------------------------
+# Image sequences
+# ---------------------------------------------------------------------------
+
+IMAGE_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.bmp", "*.tif", "*.tiff")
+
+
+def collect_image_files(input_path, pattern=None):
+    """Return the sorted image files for *input_path*.
+
+    *input_path* is a directory (optionally filtered by glob *pattern*) or
+    a text file listing one image path per line (``#`` starts a comment).
+    Raises ``FileNotFoundError`` if *input_path* does not exist.
+    """
+    if os.path.isdir(input_path):
+        if pattern:
+            return sorted(glob.glob(os.path.join(input_path, pattern)))
+        image_files = []
+        for ext in IMAGE_PATTERNS:
+            image_files.extend(glob.glob(os.path.join(input_path, ext)))
+        return sorted(image_files)
+    if os.path.isfile(input_path):
+        with open(input_path, "r", encoding="utf-8") as fh:
+            return [
+                line.strip() for line in fh
+                if line.strip() and not line.startswith("#")
+            ]
+    raise FileNotFoundError(f"Input path does not exist: {input_path}")
+
+
+def create_video_from_images(image_files, output_file, fps=30, codec="libx264",
+                             progress_callback=None):
+    """Encode *image_files* into *output_file* at *fps* with ffmpeg.
+
+    The images are fed through the concat demuxer with a per-file
+    duration.  Returns *output_file*.
+    """
+    _ensure_ffmpeg()
+
+    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="smm_cli_")
+    frame_duration = 1.0 / fps
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for img in image_files:
+                safe = os.path.abspath(img).replace("'", "'\\''")
+                fh.write(f"file '{safe}'\n")
+                fh.write(f"duration {frame_duration}\n")
+            # Repeat last file so the last frame is shown for its full duration
+            if image_files:
+                safe = os.path.abspath(image_files[-1]).replace("'", "'\\''")
+                fh.write(f"file '{safe}'\n")
+
+        args = [
+            "-f", "concat",
+            "-safe", "0",
+            "-i", list_path,
+        ]
+        if codec:
+            args += ["-c:v", codec]
+        args += ["-pix_fmt", "yuv420p", "-y", output_file]
+        _run_checked(args, f"Creating {output_file}",
+                     progress_callback=progress_callback)
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
+
+    return output_file
@@ -0,0 +1,94 @@
+import io
+import json
+import subprocess
+
+import pytest
+
+from simmovimaker import batch
+
+
+def _ok(job, cb):
+    cb(100.0)
+    return subprocess.CompletedProcess(["ffmpeg"], 0, "", "")
+
+
+def _ffmpeg_failure(job, cb):
+    return subprocess.CompletedProcess(["ffmpeg"], 1, "",
+                                       "frame=1\nout.mp4: File exists")
+
+
+@pytest.fixture
+def ops(monkeypatch):
+    monkeypatch.setitem(batch.OPERATIONS, "ok", _ok)
+    monkeypatch.setitem(batch.OPERATIONS, "broken", _ffmpeg_failure)
+
+
+def _records(out):
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_load_manifest_csv_converts_fields(tmp_path):
+    manifest = tmp_path / "jobs.csv"
+    manifest.write_text("id,op,input,output,start,end,fast,after\n"
+                        "a,trim,in.mp4,out.mp4,1.5,4,yes,\n"
+                        "b,gif,out.mp4,out.gif,,,,a\n")
+    jobs = batch.load_manifest(str(manifest))
+    assert jobs[0] == {"id": "a", "op": "trim", "input": "in.mp4",
+                       "output": "out.mp4", "start": 1.5, "end": 4.0,
+                       "fast": True}
+    assert jobs[1]["after"] == ["a"]
+
+
+def test_load_manifest_json_object(tmp_path):
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(json.dumps({"jobs": [{"op": "mute", "input": "x"}]}))
+    assert batch.load_manifest(str(manifest)) == [{"op": "mute", "input": "x"}]
+
+
+def test_job_key_is_stable_without_id():
+    job = {"op": "mute", "input": "a.mp4", "output": "b.mp4"}
+    assert batch.job_key(job) == batch.job_key(dict(reversed(list(job.items()))))
+    assert batch.job_key({"id": "x", "op": "mute"}) == "x"
+
+
+def test_failed_ffmpeg_run_is_reported_as_failed(ops, tmp_path):
+    state = tmp_path / "state.jsonl"
+    out = io.StringIO()
+    counts = batch.run_batch([{"id": "good", "op": "ok"},
+                              {"id": "bad", "op": "broken"},
+                              {"id": "child", "op": "ok", "after": ["bad"]}],
+                             state_file=str(state), out=out)
+    assert counts["done"] == 1
+    assert counts["failed"] == 1
+    assert counts["cancelled"] == 1
+    final = {r["id"]: r for r in _records(out) if r["status"] != "running"}
+    assert "File exists" in final["bad"]["error"]
+    assert batch._load_state(str(state)) == {"good"}
+
+
+def test_resume_skips_only_done_jobs(ops, tmp_path):
+    state = tmp_path / "state.jsonl"
+    jobs = [{"id": "good", "op": "ok"}, {"id": "bad", "op": "broken"}]
+    batch.run_batch(jobs, state_file=str(state), out=io.StringIO())
+
+    out = io.StringIO()
+    counts = batch.run_batch(jobs, state_file=str(state), resume=True, out=out)
+    assert counts["skipped"] == 1
+    assert counts["failed"] == 1
+    assert {"id": "good", "op": "ok", "status": "skipped"} in _records(out)
+
+
+@pytest.mark.parametrize("after, message", [
+    (["missing"], "is not in"),
+    (["later"], "appears later in"),
+])
+def test_bad_after_reference_is_rejected(ops, after, message):
+    jobs = [{"id": "first", "op": "ok", "after": after},
+            {"id": "later", "op": "ok"}]
+    with pytest.raises(ValueError, match=message):
+        batch.run_batch(jobs, out=io.StringIO())
+
+
+def test_unknown_operation_is_rejected():
+    with pytest.raises(ValueError, match="Unknown operation"):
+        batch.run_batch([{"op": "explode"}], out=io.StringIO())
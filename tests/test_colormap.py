@@ -0,0 +1,47 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from simmovimaker.colormap import Colormap, _sample
+
+
+def _expected(name, values, vmin, vmax):
+    positions = np.clip((np.asarray(values, np.float64) - vmin) / (vmax - vmin), 0, 1)
+    return _sample(name, positions.reshape(-1)).reshape(np.shape(values) + (3,))
+
+
+@pytest.mark.parametrize("dtype, values, vmin, vmax", [
+    (np.uint16, [[0, 1000, 2000], [3000, 4000, 65535]], 1000.0, 3000.0),
+    (np.int16, [[-32768, -500, 0], [250, 500, 32767]], -500.0, 500.0),
+])
+def test_16_bit_frames_index_the_full_table(dtype, values, vmin, vmax):
+    frame = np.array(values, dtype=dtype)
+    rgb = Colormap("viridis", vmin, vmax).apply(frame)
+    assert rgb.shape == frame.shape + (3,)
+    assert rgb.dtype == np.uint8
+    np.testing.assert_array_equal(rgb, _expected("viridis", values, vmin, vmax))
+
+
+def test_int16_ends_of_range_map_to_ends_of_map():
+    frame = np.array([[-32768, 32767]], dtype=np.int16)
+    rgb = Colormap("gray").apply(frame)
+    np.testing.assert_array_equal(rgb[0, 0], [0, 0, 0])
+    np.testing.assert_array_equal(rgb[0, 1], [255, 255, 255])
+
+
+def test_bgr_reverses_channels():
+    frame = np.array([[0, 65535]], dtype=np.uint16)
+    cmap = Colormap("viridis", 0, 65535)
+    np.testing.assert_array_equal(cmap.apply(frame, bgr=True),
+                                  cmap.apply(frame)[..., ::-1])
+
+
+def test_fit_uses_percentiles_of_all_frames():
+    frames = np.arange(2 * 10 * 10, dtype=np.uint16).reshape(2, 10, 10)
+    cmap = Colormap("gray").fit(frames, percentiles=(0, 100))
+    assert (cmap.vmin, cmap.vmax) == (0.0, 199.0)
+
+
+def test_unknown_name_is_rejected():
+    with pytest.raises(ValueError):
+        Colormap("no-such-map-xyz")
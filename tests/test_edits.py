@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("cv2")
+
+from simmovimaker import edits
+
+
+def test_set_raw_op_goes_first_and_replaces_raw_op():
+    entry = {"path": "a.png", "type": "image"}
+    edits.add_ops(entry, [{"op": "grayscale"}])
+    assert edits.set_raw_op(entry, {"op": "normalize", "low": 1, "high": 9}) is None
+    assert [op["op"] for op in entry["ops"]] == ["normalize", "grayscale"]
+
+    replaced = edits.set_raw_op(entry, {"op": "colormap", "cmap": "gray"})
+    assert replaced["op"] == "normalize"
+    assert [op["op"] for op in entry["ops"]] == ["colormap", "grayscale"]
@@ -0,0 +1,23 @@
+import pytest
+
+from simmovimaker.encoder import _quality_args, resolve_codec
+
+
+@pytest.mark.parametrize("codec, expected", [
+    ("H264", "H264"), ("h264", "H264"), ("libx264", "H264"),
+    ("VP9", "VP9"), ("libvpx-vp9", "VP9"),
+    ("mjpeg", "MJPG"), ("XVID", "XVID"), ("mpeg4", "XVID"),
+])
+def test_resolve_codec_accepts_both_spellings(codec, expected):
+    assert resolve_codec(codec) == expected
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError, match="Unknown codec 'prores'"):
+        resolve_codec("prores")
+    with pytest.raises(ValueError):
+        _quality_args("prores", 80)
+
+
+def test_ffmpeg_name_selects_the_same_encoder():
+    assert _quality_args("libx264", 80) == _quality_args("H264", 80)
@@ -0,0 +1,85 @@
+from simmovimaker import ffmpeg_utils
+from simmovimaker.ffmpeg_utils import _parse_filters, _parse_hwaccels, _parse_table
+
+# Captured from ffmpeg 6.1 with -hide_banner (trimmed).
+ENCODERS = """\
+Encoders:
+ V..... = Video
+ A..... = Audio
+ S..... = Subtitle
+ .F.... = Frame-level multithreading
+ ..S... = Slice-level multithreading
+ ...X.. = Codec is experimental
+ ....B. = Supports draw_horiz_band
+ .....D = Supports direct rendering method 1
+ ------
+ V....D a64multi             Multicolor charset for Commodore 64 (codec a64_multi)
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ V..... libsvtav1            SVT-AV1(Scalable Video Technology for AV1) encoder (codec av1)
+ A....D aac                  AAC (Advanced Audio Coding)
+ S..... srt                  SubRip subtitle
+"""
+
+FILTERS = """\
+Filters:
+  T.. = Timeline support
+  .S. = Slice threading
+  ..C = Command support
+  A = Audio input/output
+  V = Video input/output
+  N = Dynamic number and/or type of input/output
+  | = Source or sink filter
+ ... abench            A->A       Benchmark part of a filtergraph.
+ ..C acompressor       A->A       Audio compressor.
+ TSC scale             V->V       Scale the input video size and/or convert the image format.
+ ... concat            N->N       Concatenate audio and video streams.
+ ... nullsrc           |->V       Null video source, return unprocessed video frames.
+ ... palettegen        V->V       Find the optimal palette for a given stream.
+"""
+
+HWACCELS = """\
+Hardware acceleration methods:
+vdpau
+cuda
+vaapi
+qsv
+
+"""
+
+
+def test_parse_encoders():
+    assert _parse_table(ENCODERS) == {"a64multi", "libx264", "h264_nvenc",
+                                      "libsvtav1", "aac", "srt"}
+
+
+def test_parse_filters_skips_the_legend():
+    assert _parse_filters(FILTERS) == {"abench", "acompressor", "scale",
+                                       "concat", "nullsrc", "palettegen"}
+
+
+def test_parse_hwaccels():
+    assert _parse_hwaccels(HWACCELS) == ["vdpau", "cuda", "vaapi", "qsv"]
+
+
+def test_parsers_tolerate_missing_output():
+    assert _parse_table("") == set()
+    assert _parse_filters("") == set()
+    assert _parse_hwaccels("") == []
+
+
+def test_capabilities_are_refreshed_after_the_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ffmpeg_utils.time, "monotonic", lambda: clock[0])
+    for finder in ("find_ffmpeg", "find_ffprobe", "find_ffplay"):
+        monkeypatch.setattr(ffmpeg_utils, finder, lambda: None)
+    monkeypatch.setattr(ffmpeg_utils, "_capabilities", None)
+
+    first = ffmpeg_utils.get_capabilities()
+    clock[0] += ffmpeg_utils.CAPABILITIES_TTL - 1
+    assert ffmpeg_utils.get_capabilities() is first
+    clock[0] += 2
+    second = ffmpeg_utils.get_capabilities()
+    assert second is not first
+    assert ffmpeg_utils.get_capabilities() is second
+    assert ffmpeg_utils.get_capabilities(refresh=True) is not second
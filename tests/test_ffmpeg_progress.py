@@ -0,0 +1,78 @@
+import pytest
+
+from simmovimaker import ffmpeg_utils
+from simmovimaker.ffmpeg_utils import _parse_clock, _parse_number, _progress_stats
+
+BLOCK = {
+    "frame": "240", "fps": "59.94", "stream_0_0_q": "28.0",
+    "bitrate": "1534.2kbits/s", "total_size": "1536048",
+    "out_time_us": "8008000", "out_time_ms": "8008000",
+    "out_time": "00:00:08.008000", "dup_frames": "0", "drop_frames": "0",
+    "speed": "2.41x", "progress": "continue",
+}
+
+
+def test_progress_block_is_normalised():
+    assert _progress_stats(BLOCK) == {
+        "frame": 240, "fps": 59.94, "speed": 2.41, "out_time": 8.008,
+        "bitrate": 1534.2, "total_size": 1536048, "done": False,
+    }
+
+
+def test_unknown_values_become_none():
+    stats = _progress_stats({"frame": "0", "fps": "0.00", "bitrate": "N/A",
+                             "total_size": "N/A", "out_time_us": "N/A",
+                             "out_time": "N/A", "speed": "N/A",
+                             "progress": "end"})
+    assert stats["bitrate"] is None
+    assert stats["total_size"] is None
+    assert stats["out_time"] is None
+    assert stats["speed"] is None
+    assert stats["done"] is True
+
+
+def test_out_time_falls_back_to_clock():
+    assert _progress_stats({"out_time": "01:02:03.500000"})["out_time"] == 3723.5
+
+
+@pytest.mark.parametrize("value, suffix, expected", [
+    ("29.97", "", 29.97), (" 1.5x ", "x", 1.5), ("N/A", "x", None),
+    ("812.3kbits/s", "kbits/s", 812.3), ("", "", None),
+])
+def test_parse_number(value, suffix, expected):
+    assert _parse_number(value, suffix) == expected
+
+
+def test_parse_clock_rejects_malformed_values():
+    assert _parse_clock("00:00:01.250000") == 1.25
+    assert _parse_clock("1.25") is None
+    assert _parse_clock(None) is None
+
+
+class _FakeProcess:
+    def __init__(self, stdout, stderr=b""):
+        self.stdout = iter(stdout.splitlines(keepends=True))
+        self.stderr = iter(stderr.splitlines(keepends=True))
+        self.returncode = 0
+
+    def wait(self):
+        return self.returncode
+
+
+def test_run_ffmpeg_reports_each_progress_block(monkeypatch):
+    output = (b"frame=10\nout_time_us=1000000\nspeed=1.0x\nprogress=continue\n"
+              b"not a key value line\n"
+              b"frame=20\nout_time_us=4000000\nspeed=2.0x\nprogress=end\n")
+    monkeypatch.setattr(ffmpeg_utils, "find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(ffmpeg_utils, "_estimate_duration", lambda args: 4.0)
+    monkeypatch.setattr(ffmpeg_utils, "_start_process",
+                        lambda cmd, **kw: _FakeProcess(output, b"warning\n"))
+    percents, stats = [], []
+    result = ffmpeg_utils.run_ffmpeg(["-i", "in.mp4", "out.mp4"],
+                                     progress_callback=percents.append,
+                                     stats_callback=stats.append)
+    assert percents == [25.0, 100.0]
+    assert [s["frame"] for s in stats] == [10, 20]
+    assert [s["done"] for s in stats] == [False, True]
+    assert result.returncode == 0
+    assert result.stderr == "warning"
@@ -0,0 +1,81 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from simmovimaker import filters
+from simmovimaker.filters import FilterChain
+
+
+def _stub_chunks(monkeypatch, delays=None):
+    """Replace the worker with one that "writes" every path in its chunk
+    after a per-chunk delay, and the process pool with threads."""
+    processed = []
+
+    def fake_chunk(jobs):
+        path, specs, index = jobs[0]
+        if delays:
+            time.sleep(delays[index])
+        processed.extend(job[0] for job in jobs)
+        return [job[0] for job in jobs], None
+
+    monkeypatch.setattr(filters, "_process_chunk", fake_chunk)
+    monkeypatch.setattr(filters, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return processed
+
+
+def _jobs(n):
+    return [(f"f{i}.png", [{"op": "grayscale"}], i) for i in range(n)]
+
+
+def test_progress_is_reported_in_order(monkeypatch):
+    # Later chunks finish first.
+    _stub_chunks(monkeypatch, delays=[0.03, 0.02, 0.01, 0.0, 0.0, 0.0])
+    progress = []
+    written = []
+    count = filters.process_jobs(
+        _jobs(6), workers=3, chunk_size=1, written_paths=written,
+        progress_callback=lambda done, total: progress.append((done, total)))
+    assert count == 6
+    assert progress == [(i, 6) for i in range(1, 7)]
+    assert written == [f"f{i}.png" for i in range(6)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancel_stops_between_chunks(monkeypatch, workers):
+    processed = _stub_chunks(monkeypatch)
+    progress = []
+    written = []
+    count = filters.process_jobs(
+        _jobs(20), workers=workers, chunk_size=2, written_paths=written,
+        progress_callback=lambda done, total: progress.append(done),
+        cancel_check=lambda: bool(progress))
+    # Chunks already running finish; nothing new starts after the cancel.
+    assert 2 <= count <= 2 * workers * 2
+    assert count < 20
+    assert sorted(written) == sorted(processed)
+    assert len(written) == count
+
+
+def test_filter_chain_round_trips_through_json(tmp_path):
+    chain = FilterChain([{"op": "resize", "width": 64, "height": 48},
+                         {"op": "text", "text": "t", "x": 1, "y": 2,
+                          "color": [255, 0, 0]},
+                         {"op": "grayscale"}])
+    path = str(tmp_path / "chain.json")
+    chain.save(path)
+    loaded = FilterChain.load(path)
+    assert loaded.specs == chain.specs
+    assert loaded.describe() == "resize -> text -> grayscale"
+
+
+def test_filter_chain_load_rejects_unknown_op(tmp_path):
+    path = tmp_path / "chain.json"
+    path.write_text(json.dumps({"version": 1,
+                                "filters": [{"op": "grayscale"},
+                                            {"op": "sharpen"}]}))
+    with pytest.raises(ValueError, match="sharpen"):
+        FilterChain.load(str(path))
@@ -0,0 +1,122 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from simmovimaker import frame_cache
+from simmovimaker.frame_cache import FrameCache
+
+
+def _block(nbytes):
+    return np.zeros(nbytes, dtype=np.uint8)
+
+
+def test_evicts_least_recently_used_over_budget():
+    cache = FrameCache(max_bytes=300)
+    cache.put("a", _block(100))
+    cache.put("b", _block(100))
+    cache.put("c", _block(100))
+    assert cache.get("a") is not None       # a is now the most recent
+    cache.put("d", _block(100))
+    assert "b" not in cache
+    assert all(k in cache for k in "acd")
+    assert cache.current_bytes == 300
+
+
+def test_replacing_a_key_updates_the_byte_count():
+    cache = FrameCache(max_bytes=1000)
+    cache.put("a", _block(400))
+    cache.put("a", _block(100))
+    assert len(cache) == 1
+    assert cache.current_bytes == 100
+
+
+def test_value_larger_than_budget_is_not_cached():
+    cache = FrameCache(max_bytes=100)
+    cache.put("small", _block(50))
+    cache.put("huge", _block(500))
+    assert "huge" not in cache
+    assert "small" in cache
+    assert cache.current_bytes == 50
+
+
+def test_invalidate_drops_entries_of_one_path():
+    cache = FrameCache()
+    cache.put((("a.png", 1), "thumb"), _block(10))
+    cache.put((("a.png", 2), "render"), _block(10))
+    cache.put((("b.png", 1), "thumb"), _block(10))
+    cache.invalidate("a.png")
+    assert len(cache) == 1
+    assert cache.current_bytes == 10
+
+
+def test_load_image_uses_an_empty_cache_and_keys_on_resample(tmp_path):
+    path = str(tmp_path / "img.png")
+    Image.new("RGB", (40, 20), (255, 0, 0)).save(path)
+    cache = FrameCache()
+    frame_cache.load_image(path, size=(10, 10), cache=cache,
+                           resample=Image.NEAREST)
+    assert len(cache) == 1
+    frame_cache.load_image(path, size=(10, 10), cache=cache,
+                           resample=Image.BILINEAR)
+    assert len(cache) == 2
+    assert cache.misses == 2
+
+
+@pytest.mark.parametrize("source, target, factor", [
+    ((4000, 3000), (500, 375), 8),
+    ((4000, 3000), (100, 100), 8),      # capped at 8
+    ((1000, 800), (400, 300), 2),
+    ((1000, 800), (300, 401), 1),       # height would fall short at 2
+    ((100, 100), (60, 60), 1),
+])
+def test_reduction_factor_still_covers_target(source, target, factor):
+    assert frame_cache._reduction_factor(source, target) == factor
+
+
+def _covers(img, size):
+    return img.size[0] >= size[0] and img.size[1] >= size[1]
+
+
+def test_jpeg_is_decoded_with_draft(tmp_path):
+    path = str(tmp_path / "img.jpg")
+    Image.new("RGB", (800, 600), (10, 200, 30)).save(path)
+    img, source_size = frame_cache._decode_reduced(path, (190, 140))
+    assert source_size == (800, 600)
+    assert img.size == (200, 150)       # DCT-scaled to 1/4
+    assert _covers(img, (190, 140))
+
+
+def test_other_formats_use_cv2_reduced_read(tmp_path):
+    pytest.importorskip("cv2")
+    path = str(tmp_path / "img.png")
+    Image.new("RGB", (800, 600), (10, 200, 30)).save(path)
+    img, source_size = frame_cache._decode_reduced(path, (190, 140))
+    assert source_size == (800, 600)
+    assert img.size == (200, 150)       # IMREAD_REDUCED_COLOR_4
+    assert _covers(img, (190, 140))
+
+
+def _save_tiff(path, sizes):
+    pages = [Image.new("RGB", s, (i * 40, 0, 0)) for i, s in enumerate(sizes)]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+
+
+def test_tiff_pyramid_page_is_the_smallest_that_covers(tmp_path):
+    path = str(tmp_path / "pyramid.tif")
+    _save_tiff(path, [(800, 600), (400, 300), (200, 150), (100, 75)])
+    with Image.open(path) as img:
+        assert frame_cache._tiff_pyramid_page(img, (150, 100)) == 2
+        assert frame_cache._tiff_pyramid_page(img, (900, 700)) is None
+        assert img.tell() == 0
+    img, source_size = frame_cache._decode_reduced(path, (150, 100))
+    assert source_size == (800, 600)
+    assert img.size == (200, 150)
+    assert _covers(img, (150, 100))
+
+
+def test_tiff_stack_pages_are_not_pyramid_levels(tmp_path):
+    path = str(tmp_path / "stack.tif")
+    _save_tiff(path, [(80, 60), (80, 60), (80, 60)])
+    with Image.open(path) as img:
+        assert frame_cache._tiff_pyramid_page(img, (20, 15)) is None
@@ -0,0 +1,88 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from simmovimaker import frame_stack
+
+
+def test_non_uint8_stack_shares_one_display_range(tmp_path):
+    path = str(tmp_path / "stack.npy")
+    stack = np.zeros((3, 4, 5), dtype=np.uint16)
+    stack[0], stack[1], stack[2] = 100, 200, 300
+    stack[2, 0, 0] = 400
+    np.save(path, stack)
+
+    assert frame_stack.stack_range(path) == (100.0, 400.0)
+    values = [int(frame_stack.read_frame(path, i)[1, 1, 0]) for i in range(3)]
+    assert values == [0, 85, 170]
+
+
+def test_raw_frames_keep_dtype_and_swap_to_bgr(tmp_path):
+    path = str(tmp_path / "rgb.npy")
+    stack = np.zeros((1, 2, 2, 3), dtype=np.float32)
+    stack[0, :, :, 0] = 1.5     # red
+    np.save(path, stack)
+    frame = frame_stack.read_frame(path, 0, raw=True)
+    assert frame.dtype == np.float32
+    assert frame[0, 0].tolist() == [0.0, 0.0, 1.5]
+
+
+@pytest.mark.parametrize("dtype, frame_shape", [
+    (np.uint8, (6, 7, 3)),
+    (np.uint16, (5, 4)),
+    (np.float32, (3, 2, 1)),
+])
+def test_writer_header_round_trips(tmp_path, dtype, frame_shape):
+    path = str(tmp_path / "out.npy")
+    frames = np.arange(5 * int(np.prod(frame_shape))).astype(dtype)
+    frames = frames.reshape((5,) + frame_shape)
+    with frame_stack.NpyStackWriter(path, dtype=dtype) as writer:
+        writer.write(frames[0])
+        writer.write_batch(frames[1:4])
+        writer.write(frames[4])
+        assert writer.shape == (5,) + frame_shape
+
+    with open(path, "rb") as fh:
+        assert len(fh.read(frame_stack._HEADER_BYTES)) == frame_stack._HEADER_BYTES
+    loaded = np.load(path, mmap_mode="r")
+    assert loaded.dtype == np.dtype(dtype)
+    np.testing.assert_array_equal(loaded, frames)
+    assert loaded.offset == frame_stack._HEADER_BYTES
+
+
+def test_empty_writer_is_a_valid_npy(tmp_path):
+    path = str(tmp_path / "empty.npy")
+    frame_stack.NpyStackWriter(path, frame_shape=(2, 3)).close()
+    assert np.load(path).shape == (0, 2, 3)
+
+
+def test_writer_rejects_mismatched_frames(tmp_path):
+    with frame_stack.NpyStackWriter(str(tmp_path / "x.npy")) as writer:
+        writer.write(np.zeros((2, 2), np.uint8))
+        with pytest.raises(ValueError, match="does not match"):
+            writer.write(np.zeros((3, 2), np.uint8))
+
+
+def test_header_length_is_fixed():
+    header = frame_stack._npy_header(np.uint16, (100000, 2048, 2048, 3))
+    assert len(header) == frame_stack._HEADER_BYTES
+    assert header.endswith(b"\n")
+
+
+def test_single_rgb_image_is_one_frame(tmp_path):
+    path = str(tmp_path / "image.npy")
+    image = np.zeros((6, 5, 3), dtype=np.uint8)
+    image[:, :, 0] = 200        # red
+    np.save(path, image)
+
+    assert frame_stack.stack_length(path) == 1
+    assert frame_stack.frame_size(path) == (5, 6)
+    assert frame_stack.read_frame(path, 0)[0, 0].tolist() == [0, 0, 200]
+    assert frame_stack.stack_entries(path) == [
+        {"path": path, "type": "stack", "frame": 0}]
+
+
+def test_greyscale_stack_is_not_mistaken_for_an_image(tmp_path):
+    path = str(tmp_path / "stack.npy")
+    np.save(path, np.zeros((4, 6, 5), dtype=np.uint8))
+    assert frame_stack.stack_length(path) == 4
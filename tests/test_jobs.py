@@ -0,0 +1,80 @@
+import sys
+import threading
+
+from simmovimaker import jobs
+from simmovimaker.ffmpeg_utils import _start_process
+
+
+def test_concurrency_cap_is_respected():
+    manager = jobs.JobManager(max_concurrent=2)
+    lock = threading.Lock()
+    release = threading.Event()
+    running = [0]
+    peak = [0]
+
+    def work(cb):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(5)
+        with lock:
+            running[0] -= 1
+
+    submitted = [manager.submit(f"job {i}", work) for i in range(5)]
+    assert sum(j.state == jobs.RUNNING for j in submitted) == 2
+    release.set()
+    assert manager.wait(5)
+    assert peak[0] == 2
+    assert all(j.state == jobs.DONE for j in submitted)
+
+
+def test_dependents_of_failed_or_cancelled_jobs_are_cancelled():
+    manager = jobs.JobManager(max_concurrent=1)
+    gate = threading.Event()
+    ran = []
+
+    def boom(cb):
+        gate.wait(5)
+        raise RuntimeError("ffmpeg failed")
+
+    failing = manager.submit("failing", boom)
+    queued = manager.submit("queued", lambda cb: ran.append("queued"))
+    after_failing = manager.submit("after failing", lambda cb: ran.append(1),
+                                   depends_on=[failing])
+    after_queued = manager.submit("after queued", lambda cb: ran.append(2),
+                                  depends_on=[queued])
+    chained = manager.submit("chained", lambda cb: ran.append(3),
+                             depends_on=[after_queued])
+    manager.cancel(queued)
+    gate.set()
+    assert manager.wait(5)
+
+    assert failing.state == jobs.FAILED
+    assert queued.state == jobs.CANCELLED
+    assert after_failing.state == jobs.CANCELLED
+    assert after_queued.state == jobs.CANCELLED
+    assert chained.state == jobs.CANCELLED
+    assert ran == []
+
+
+def test_cancelling_a_running_job_kills_its_process():
+    manager = jobs.JobManager(max_concurrent=1)
+    started = threading.Event()
+    processes = []
+
+    def work(cb):
+        process = _start_process(
+            [sys.executable, "-c", "import time; time.sleep(30)"])
+        processes.append(process)
+        started.set()
+        process.wait()
+        if process.returncode != 0:
+            raise RuntimeError("ffmpeg exited with an error")
+
+    job = manager.submit("long encode", work)
+    assert started.wait(5)
+    manager.cancel(job)
+    assert manager.wait(10)
+    assert processes[0].returncode is not None
+    assert processes[0].returncode != 0
+    assert job.state == jobs.CANCELLED
@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from simmovimaker import prefetch
+
+
+class _Frame:
+    def __init__(self, item, nbytes=100):
+        self.item = item
+        self.nbytes = nbytes
+
+
+class _Reader:
+    """Stub reader with uneven delays that counts reads started."""
+
+    def __init__(self, nbytes=100):
+        self.nbytes = nbytes
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, item):
+        with self.lock:
+            self.started += 1
+        time.sleep((item * 7 % 5) * 0.002)
+        return _Frame(item, self.nbytes)
+
+
+def _max_ahead(reader, gen):
+    """Consume *gen*, returning the items seen and the most reads started
+    but not yet handed to the consumer."""
+    seen, ahead = [], 0
+    for index, item, frame in gen:
+        assert frame.item == item
+        seen.append(item)
+        with reader.lock:
+            ahead = max(ahead, reader.started - (index + 1))
+    return seen, ahead
+
+
+def test_frames_are_yielded_in_input_order():
+    reader = _Reader()
+    items = list(range(40))
+    seen, _ = _max_ahead(reader, prefetch.prefetch_frames(
+        items, reader=reader, workers=4))
+    assert seen == items
+
+
+def test_read_ahead_is_bounded_by_depth():
+    reader = _Reader()
+    seen, ahead = _max_ahead(reader, prefetch.prefetch_frames(
+        range(30), reader=reader, workers=4, depth=3, max_bytes=None))
+    assert len(seen) == 30
+    assert ahead <= 3
+
+
+def test_read_ahead_is_bounded_by_max_bytes():
+    # 250 bytes hold two 100-byte frames, well under depth=16.
+    reader = _Reader(nbytes=100)
+    seen, ahead = _max_ahead(reader, prefetch.prefetch_frames(
+        range(30), reader=reader, workers=2, depth=16, max_bytes=250))
+    assert len(seen) == 30
+    assert ahead <= 2
+
+
+def test_closing_early_shuts_the_pool_down(monkeypatch):
+    pools = []
+
+    class _Pool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.closed = False
+            pools.append(self)
+
+        def shutdown(self, *args, **kwargs):
+            self.closed = True
+            super().shutdown(*args, **kwargs)
+
+    monkeypatch.setattr(prefetch, "ThreadPoolExecutor", _Pool)
+    reader = _Reader()
+    gen = prefetch.prefetch_frames(range(100), reader=reader, workers=2,
+                                   depth=4)
+    next(gen)
+    next(gen)
+    gen.close()
+    assert pools[0].closed
+    assert reader.started < 100
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from simmovimaker import probe_cache
+
+
+@pytest.fixture
+def ffprobe(monkeypatch):
+    """Replace ffprobe with a fake that records its calls."""
+    calls = []
+
+    def _run(args):
+        calls.append(args)
+        if "packet=flags" in args:
+            return "K_\n__\n__\nK_\n"
+        return json.dumps({"format": {"duration": "2.0"}})
+
+    monkeypatch.setattr(probe_cache, "run_ffprobe", _run)
+    return calls
+
+
+def test_keyframe_count_is_cached_with_probe_result(ffprobe, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"x")
+    cache = probe_cache.ProbeCache()
+    assert cache.keyframes(str(video)) == 2
+    assert cache.keyframes(str(video)) == 2
+    assert sum("packet=flags" in args for args in ffprobe) == 1
+    assert len(ffprobe) == 2
+
+
+def test_changed_file_is_probed_again(ffprobe, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"x")
+    cache = probe_cache.ProbeCache()
+    cache.get(str(video))
+    cache.get(str(video))
+    assert len(ffprobe) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    video.write_bytes(b"longer")       # new size -> new key
+    cache.get(str(video))
+    assert len(ffprobe) == 2
+
+
+def test_invalidate_forgets_every_version(ffprobe, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"x")
+    cache = probe_cache.ProbeCache()
+    cache.get(str(video))
+    cache.invalidate(str(video))
+    assert len(cache) == 0
+    cache.get(str(video))
+    assert len(ffprobe) == 2
+
+
+def test_missing_file_is_not_cached(ffprobe, tmp_path):
+    cache = probe_cache.ProbeCache()
+    cache.get(str(tmp_path / "missing.mp4"))
+    assert len(cache) == 0
+
+
+def test_store_round_trip_keeps_keys(ffprobe, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"x")
+    store = str(tmp_path / "probe.json")
+    cache = probe_cache.ProbeCache(store=store)
+    cache.get(str(video))
+    cache.flush()
+
+    reloaded = probe_cache.ProbeCache(store=store)
+    assert reloaded.get(str(video)) == {"format": {"duration": "2.0"}}
+    assert len(ffprobe) == 1
+
+    video.write_bytes(b"changed")
+    reloaded.get(str(video))
+    assert len(ffprobe) == 2
+
+
+def test_lru_keeps_most_recent_entries(ffprobe, tmp_path):
+    cache = probe_cache.ProbeCache(max_entries=2)
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.mp4"
+        path.write_bytes(b"x")
+        paths.append(str(path))
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])         # a is now the most recent
+    cache.get(paths[2])         # evicts b
+    assert len(cache) == 2
+    cache.get(paths[0])
+    assert len(ffprobe) == 3
@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from simmovimaker.stats import IntensityStats, compute_stats
+
+
+@pytest.mark.parametrize("dtype, low, high", [
+    (np.uint8, 0, 256),
+    (np.uint16, 0, 65536),
+    (np.int16, -32768, 32768),
+])
+def test_exact_percentiles_match_numpy(dtype, low, high):
+    rng = np.random.default_rng(1)
+    frames = rng.integers(low, high, size=(6, 40, 30)).astype(dtype)
+    stats = IntensityStats()
+    for frame in frames:
+        stats.add(frame)
+    assert stats.exact
+    q = [0, 0.5, 1, 37.5, 50, 99, 100]
+    expected = np.percentile(frames, q, method="lower")
+    np.testing.assert_array_equal(stats.percentile(q), expected)
+    assert stats.min == frames.min()
+    assert stats.max == frames.max()
+
+
+def test_merge_equals_single_pass():
+    rng = np.random.default_rng(2)
+    frames = rng.integers(0, 4096, size=(8, 16, 16)).astype(np.uint16)
+    whole = IntensityStats()
+    for frame in frames:
+        whole.add(frame)
+    left, right = IntensityStats(), IntensityStats()
+    for frame in frames[:3]:
+        left.add(frame)
+    for frame in frames[3:]:
+        right.add(frame)
+    merged = left.merge(right)
+    assert merged.frames == whole.frames == 8
+    assert merged.count == whole.count
+    np.testing.assert_array_equal(merged.histogram, whole.histogram)
+    assert merged.mean == pytest.approx(frames.mean())
+    assert merged.std == pytest.approx(frames.std())
+
+
+def test_mixed_dtypes_fall_back_to_samples():
+    stats = IntensityStats()
+    stats.add(np.full((4, 4), 10, np.uint8))
+    stats.add(np.full((4, 4), 1000, np.uint16))
+    assert not stats.exact
+    assert stats.count == 32
+    assert (stats.min, stats.max) == (10, 1000)
+    assert 10 <= stats.percentile(50) <= 1000
+
+
+def test_float_frames_ignore_non_finite_values():
+    frame = np.array([[np.nan, 1.0], [np.inf, 3.0]], dtype=np.float32)
+    stats = IntensityStats().add(frame)
+    assert stats.count == 2
+    assert (stats.min, stats.max) == (1.0, 3.0)
+
+
+def test_compute_stats_matches_serial_and_can_be_cancelled():
+    frames = np.arange(20 * 9, dtype=np.uint8).reshape(20, 3, 3)
+    stats = compute_stats(frames, workers=3, chunk_frames=4)
+    assert stats.frames == 20
+    assert stats.percentile(50) == np.percentile(frames, 50, method="lower")
+    assert compute_stats(frames, workers=1, chunk_frames=4,
+                         cancel_check=lambda: True) is None
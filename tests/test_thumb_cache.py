@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from simmovimaker import thumb_cache
+from simmovimaker.thumb_cache import ThumbnailAtlas
+
+SIZE = (4, 3)
+TILE = SIZE[0] * SIZE[1] * 3
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "src.png"
+    path.write_bytes(b"x")
+    return str(path)
+
+
+def _tile(value):
+    return Image.new("RGB", SIZE, (value, value, value))
+
+
+def _value(img):
+    return img.getpixel((0, 0))[0]
+
+
+def test_round_trip_through_disk(tmp_path, source):
+    filename = str(tmp_path / "t.atlas")
+    atlas = ThumbnailAtlas(filename, SIZE)
+    atlas.put("a", source, _tile(10))
+    atlas.put("b", source, _tile(20))
+    atlas.close()
+
+    reopened = ThumbnailAtlas(filename, SIZE)
+    assert _value(reopened.get("a", source)) == 10
+    assert _value(reopened.get("b", source)) == 20
+    reopened.close()
+
+
+def test_changed_source_is_not_served(tmp_path, source):
+    atlas = ThumbnailAtlas(str(tmp_path / "t.atlas"), SIZE)
+    atlas.put("a", source, _tile(10))
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert atlas.get("a", source) is None
+    atlas.close()
+
+
+def test_cap_compacts_keeping_recently_used(tmp_path, source):
+    filename = str(tmp_path / "t.atlas")
+    atlas = ThumbnailAtlas(filename, SIZE,
+                           max_bytes=thumb_cache._HEADER_BYTES + 4 * TILE)
+    assert atlas.max_tiles == 4
+    for i in range(4):
+        atlas.put(f"k{i}", source, _tile(i))
+    atlas.get("k0", source)                 # k0 becomes most recent
+    atlas.put("k4", source, _tile(4))       # full: compact to 3 tiles, add k4
+    assert len(atlas) == 4
+    assert atlas.get("k1", source) is None
+    assert _value(atlas.get("k0", source)) == 0
+    assert _value(atlas.get("k4", source)) == 4
+    atlas.close()
+    assert os.path.getsize(filename) <= thumb_cache._HEADER_BYTES + 4 * TILE
+
+    reopened = ThumbnailAtlas(filename, SIZE)
+    assert _value(reopened.get("k3", source)) == 3
+    reopened.close()
+
+
+def test_regenerated_tile_does_not_overwrite_saved_slot(tmp_path, source):
+    atlas = ThumbnailAtlas(str(tmp_path / "t.atlas"), SIZE)
+    atlas.put("a", source, _tile(10))
+    atlas.put("a", source, _tile(30))
+    assert atlas._entries["a"][1] == 1
+    assert _value(atlas.get("a", source)) == 30
+    atlas.close()
+
+
+def test_index_of_another_atlas_file_is_ignored(tmp_path, source):
+    filename = str(tmp_path / "t.atlas")
+    atlas = ThumbnailAtlas(filename, SIZE)
+    atlas.put("a", source, _tile(10))
+    atlas.close()
+    with open(filename, "r+b") as fh:       # as if replaced without its index
+        fh.seek(len(thumb_cache._MAGIC))
+        fh.write(b"\0" * 16)
+    reopened = ThumbnailAtlas(filename, SIZE)
+    assert reopened.get("a", source) is None
+    reopened.close()
+
+
+def test_second_instance_is_disabled(tmp_path, source):
+    filename = str(tmp_path / "t.atlas")
+    first = ThumbnailAtlas(filename, SIZE)
+    second = ThumbnailAtlas(filename, SIZE)
+    assert first.enabled and not second.enabled
+    second.put("a", source, _tile(10))
+    assert second.get("a", source) is None
+    second.close()
+    first.close()
@@ -0,0 +1,175 @@
+import io
+import os
+import subprocess
+
+import pytest
+
+from simmovimaker import batch, video_ops
+from simmovimaker.ffmpeg_utils import _parse_encoder_pix_fmts
+
+
+class _Caps:
+    def __init__(self, pix_fmts=()):
+        self._pix_fmts = set(pix_fmts)
+
+    def encoder_pix_fmts(self, name):
+        return self._pix_fmts
+
+
+def _source(monkeypatch, **stream):
+    stream.setdefault("codec_type", "video")
+    monkeypatch.setattr(video_ops, "probe",
+                        lambda path: {"streams": [{"codec_type": "audio",
+                                                   "bit_rate": "128000"},
+                                                  stream],
+                                      "format": {"bit_rate": "9000000"}})
+
+
+def test_smart_cut_matches_profile_level_and_stream_bitrate(monkeypatch):
+    _source(monkeypatch, pix_fmt="yuv420p", profile="High", level=41,
+            bit_rate="4000000")
+    args = video_ops._smart_cut_encode_args("in.mp4", "libx264",
+                                            _Caps({"yuv420p", "yuv444p"}))
+    assert args == ["-c:v", "libx264", "-pix_fmt", "yuv420p",
+                    "-b:v", "4000000", "-profile:v", "high", "-level:v", "4.1"]
+
+
+def test_smart_cut_reads_matroska_bps_tag(monkeypatch):
+    _source(monkeypatch, pix_fmt="yuv420p10le", profile="Main 10", level=123,
+            tags={"BPS-eng": "2500000"})
+    args = video_ops._smart_cut_encode_args("in.mkv", "libx265", _Caps())
+    assert args[args.index("-b:v") + 1] == "2500000"
+    assert args[-2:] == ["-x265-params", "level-idc=4.1"]
+
+
+@pytest.mark.parametrize("stream, caps", [
+    ({"pix_fmt": "yuv422p", "profile": "High 4:2:2", "bit_rate": "1"},
+     _Caps({"yuv420p"})),                                   # pix_fmt
+    ({"pix_fmt": "yuv420p", "profile": "Extended", "bit_rate": "1"},
+     _Caps()),                                              # profile
+    ({"pix_fmt": "yuv420p", "profile": "High"}, _Caps()),   # bitrate
+])
+def test_smart_cut_gives_up_when_source_cannot_be_matched(monkeypatch, stream, caps):
+    _source(monkeypatch, **stream)
+    assert video_ops._smart_cut_encode_args("in.mp4", "libx264", caps) is None
+
+
+def test_parse_encoder_pix_fmts():
+    output = ("Encoder libx264 [libx264 H.264 / AVC]:\n"
+              "    General capabilities: dr1 delay threads\n"
+              "    Supported pixel formats: yuv420p yuvj420p nv12\n")
+    assert _parse_encoder_pix_fmts(output) == {"yuv420p", "yuvj420p", "nv12"}
+    assert _parse_encoder_pix_fmts("") == set()
+
+
+def _failing_ffmpeg(monkeypatch):
+    monkeypatch.setattr(video_ops, "_ensure_ffmpeg", lambda: None)
+    monkeypatch.setattr(
+        video_ops, "run_ffmpeg",
+        lambda args, progress_callback=None, **kw: subprocess.CompletedProcess(
+            ["ffmpeg"] + args, 1, "", "out.mp4: Permission denied"))
+
+
+def test_failed_ffmpeg_run_raises(monkeypatch):
+    _failing_ffmpeg(monkeypatch)
+    with pytest.raises(RuntimeError, match="Muting in.mp4 failed"):
+        video_ops.mute_audio("in.mp4", "out.mp4")
+    with pytest.raises(RuntimeError, match="Permission denied"):
+        video_ops.convert_format("in.mp4", "out.mkv")
+
+
+def test_failed_video_op_is_reported_by_batch(monkeypatch):
+    _failing_ffmpeg(monkeypatch)
+    out = io.StringIO()
+    counts = batch.run_batch([{"id": "m", "op": "mute", "input": "in.mp4",
+                               "output": "out.mp4"}], out=out)
+    assert counts["failed"] == 1
+    assert "Permission denied" in out.getvalue()
+
+
+def _capture_split_args(monkeypatch, calls):
+    monkeypatch.setattr(video_ops, "_ensure_ffmpeg", lambda: None)
+
+    def fake_run(args, progress_callback=None, **kw):
+        calls.append(args)
+        list_path = args[args.index("-segment_list") + 1]
+        with open(list_path, "w", encoding="utf-8") as fh:
+            fh.write("in_001.mp4\n")
+        return subprocess.CompletedProcess(["ffmpeg"] + args, 0, "", "")
+
+    monkeypatch.setattr(video_ops, "run_ffmpeg", fake_run)
+
+
+@pytest.mark.parametrize("points", [[], [0, -3.5]])
+def test_split_without_positive_points_copies_whole_input(monkeypatch,
+                                                          tmp_path, points):
+    calls = []
+    _capture_split_args(monkeypatch, calls)
+    paths = video_ops.split_video("in.mp4", str(tmp_path), points)
+    args = calls[0]
+    assert "-segment_times" not in args
+    assert float(args[args.index("-segment_time") + 1]) >= 10 ** 9
+    assert paths == [str(tmp_path / "in_001.mp4")]
+
+
+def test_split_passes_sorted_positive_points(monkeypatch, tmp_path):
+    calls = []
+    _capture_split_args(monkeypatch, calls)
+    video_ops.split_video("in.mp4", str(tmp_path), [30, 0, 12.5])
+    args = calls[0]
+    assert args[args.index("-segment_times") + 1] == "12.500000,30.000000"
+    assert "-segment_time" not in args
+
+
+def _fake_segment_encoder(monkeypatch, short_chunk=None):
+    """Stub ffmpeg/ffprobe for a 40 s, 100-frame input split into four
+    25-frame chunks; encoded chunk *short_chunk* loses a frame."""
+    monkeypatch.setattr(video_ops, "get_video_info",
+                        lambda path: {"duration": 40.0, "audio_codec": None})
+
+    def fake_run(args, progress_callback=None, **kw):
+        if "-segment_list" in args:
+            pattern = args[-1]
+            names = [pattern % i for i in range(4)]
+            for name in names:
+                open(name, "wb").close()
+            with open(args[args.index("-segment_list") + 1], "w") as fh:
+                fh.write("\n".join(names) + "\n")
+        else:
+            open(args[-1], "wb").close()
+        return subprocess.CompletedProcess(["ffmpeg"] + args, 0, "", "")
+
+    def fake_count(path):
+        name = os.path.basename(path)
+        if name.startswith("src_"):
+            return 25
+        if name.startswith("enc_"):
+            short = short_chunk is not None and name.startswith(
+                f"enc_{short_chunk:04d}")
+            return 24 if short else 25
+        return 100
+
+    monkeypatch.setattr(video_ops, "run_ffmpeg", fake_run)
+    monkeypatch.setattr(video_ops, "_count_video_frames", fake_count)
+
+
+def _workdirs(directory):
+    return [p for p in os.listdir(directory) if p.startswith(".smm_segments_")]
+
+
+def test_encode_in_segments_joins_and_removes_chunks(monkeypatch, tmp_path):
+    _fake_segment_encoder(monkeypatch)
+    output = str(tmp_path / "out.mp4")
+    assert video_ops._encode_in_segments("in.mp4", output, 4,
+                                         ["-c:v", "libx264"]) == output
+    assert os.path.exists(output)
+    assert _workdirs(tmp_path) == []
+
+
+def test_encode_in_segments_rejects_frame_count_mismatch(monkeypatch,
+                                                         tmp_path):
+    _fake_segment_encoder(monkeypatch, short_chunk=2)
+    with pytest.raises(RuntimeError, match="differ from source chunks"):
+        video_ops._encode_in_segments("in.mp4", str(tmp_path / "out.mp4"), 4,
+                                      ["-c:v", "libx264"])
+    assert _workdirs(tmp_path) == []